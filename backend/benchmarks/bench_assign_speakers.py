@@ -0,0 +1,117 @@
+"""
+Benchmark the vectorized speaker assignment against the original per-word pandas loop.
+
+Usage (from the backend directory):
+    python benchmarks/bench_assign_speakers.py [--sizes 10000 100000 1000000] [--legacy-limit 5000]
+
+The legacy implementation is O(words x turns) with a heavy pandas constant, so above
+--legacy-limit words it is timed on a prefix of the transcript and extrapolated linearly.
+"""
+import argparse
+import copy
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.speaker_assignment import assign_speakers_vectorized  # noqa: E402
+
+WORDS_PER_SEGMENT = 12
+WORD_DURATION = 0.35
+
+
+def legacy_assign_speakers(diarize_df, transcript_result, fill_nearest=False):
+    """The pandas implementation that shipped before the interval engine"""
+    for seg in transcript_result["segments"]:
+        diarize_df["intersection"] = np.minimum(diarize_df["end"], seg["end"]) - np.maximum(diarize_df["start"], seg["start"])
+        dia_tmp = diarize_df if fill_nearest else diarize_df[diarize_df["intersection"] > 0]
+        if len(dia_tmp) > 0:
+            seg["speaker"] = dia_tmp.groupby("speaker")["intersection"].sum().sort_values(ascending=False).index[0]
+
+        for word in seg["words"]:
+            diarize_df["intersection"] = np.minimum(diarize_df["end"], word["end"]) - np.maximum(diarize_df["start"], word["start"])
+            dia_tmp = diarize_df if fill_nearest else diarize_df[diarize_df["intersection"] > 0]
+            if len(dia_tmp) > 0:
+                word["speaker"] = dia_tmp.groupby("speaker")["intersection"].sum().sort_values(ascending=False).index[0]
+    return transcript_result
+
+
+def make_synthetic_data(n_words, n_speakers=4, seed=0):
+    """Build a transcript with n_words words and a diarization frame covering it with gaps"""
+    rng = np.random.default_rng(seed)
+    word_starts = np.cumsum(rng.uniform(0.05, 0.25, n_words) + WORD_DURATION) - WORD_DURATION
+    word_ends = word_starts + rng.uniform(0.1, WORD_DURATION, n_words)
+
+    segments = []
+    for lo in range(0, n_words, WORDS_PER_SEGMENT):
+        hi = min(lo + WORDS_PER_SEGMENT, n_words)
+        words = [{"start": float(word_starts[i]), "end": float(word_ends[i]), "word": f" w{i}"} for i in range(lo, hi)]
+        segments.append({"start": words[0]["start"], "end": words[-1]["end"], "text": "", "words": words})
+
+    total = float(word_ends[-1])
+    turn_bounds = np.cumsum(rng.uniform(2.0, 15.0, int(total / 2.0) + 2))
+    turn_bounds = turn_bounds[turn_bounds < total + 15.0]
+    turns = []
+    prev = 0.0
+    for bound in turn_bounds:
+        # Leave small gaps and occasional overlaps between turns
+        start = max(prev + rng.uniform(-0.3, 0.5), 0.0)
+        turns.append({"start": start, "end": float(bound), "speaker": f"SPEAKER_{rng.integers(n_speakers):02d}"})
+        prev = float(bound)
+    return pd.DataFrame(turns), {"segments": segments}
+
+
+def _prefix(transcript, n_words):
+    segments = []
+    count = 0
+    for seg in transcript["segments"]:
+        if count >= n_words:
+            break
+        segments.append(seg)
+        count += len(seg["words"])
+    return {"segments": segments}, count
+
+
+def _speakers(transcript):
+    out = []
+    for seg in transcript["segments"]:
+        out.append(seg.get("speaker"))
+        out.extend(word.get("speaker") for word in seg["words"])
+    return out
+
+
+def run(sizes, legacy_limit):
+    print(f"{'words':>10} {'turns':>7} {'mode':>12} {'legacy (s)':>14} {'vectorized (s)':>15} {'speedup':>9} {'match':>6}")
+    for n_words in sizes:
+        diarize_df, transcript = make_synthetic_data(n_words)
+        for fill_nearest in (False, True):
+            sample, sample_words = _prefix(transcript, min(n_words, legacy_limit))
+            legacy_input = copy.deepcopy(sample)
+            started = time.perf_counter()
+            legacy_out = legacy_assign_speakers(diarize_df.copy(), legacy_input, fill_nearest=fill_nearest)
+            legacy_time = (time.perf_counter() - started) * (n_words / sample_words)
+
+            vector_input = copy.deepcopy(transcript)
+            started = time.perf_counter()
+            vector_out = assign_speakers_vectorized(diarize_df, vector_input, fill_nearest=fill_nearest)
+            vector_time = time.perf_counter() - started
+
+            vector_prefix, _ = _prefix(vector_out, sample_words)
+            match = _speakers(legacy_out) == _speakers(vector_prefix)
+            estimated = "~" if sample_words < n_words else " "
+            mode = "fill_nearest" if fill_nearest else "overlap"
+            print(f"{n_words:>10} {len(diarize_df):>7} {mode:>12} {estimated}{legacy_time:>13.2f} "
+                  f"{vector_time:>15.3f} {legacy_time / vector_time:>8.0f}x {str(match):>6}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--legacy-limit", type=int, default=5_000,
+                        help="Largest transcript (in words) timed with the legacy implementation")
+    args = parser.parse_args()
+    run(args.sizes, args.legacy_limit)
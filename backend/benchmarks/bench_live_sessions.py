@@ -0,0 +1,105 @@
+"""
+Benchmark concurrent live transcription sessions fed from WAV files (no microphone).
+
+Usage (from the backend directory):
+    python benchmarks/bench_live_sessions.py path/to/16k.wav [--sessions 1 2 4 8] [--workers 4] [--model small]
+    python benchmarks/bench_live_sessions.py path/to/16k.wav --url ws://localhost:8000/ws/live-transcribe --sessions 4
+
+By default every session is a LiveSession over one shared LiveModelPool in
+this process, the same pipeline /ws/live-transcribe runs, with each file
+played back in real time. With --url the file is streamed as s16le to a
+running server instead, one WebSocket per session.
+
+Reports, per session count, the commit latency (audio arrival to final
+event) p50/p90 across sessions, the worst session's p90, and how long
+decodes queued for a pool slot.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.livetranscribe import LiveModelPool, LiveSession, LiveSettings, WavFileSource  # noqa: E402
+from services.ring_buffer import BACKPRESSURE  # noqa: E402
+
+
+def local_sessions(wav_path: str, sessions: int, pool: LiveModelPool, settings: LiveSettings):
+    source = WavFileSource(wav_path, realtime=True)
+    live = [LiveSession(pool, settings, on_event=lambda event: None, overflow_policy=BACKPRESSURE).start()
+            for _ in range(sessions)]
+    feeders = [threading.Thread(target=source.stream, args=(s.sink, s.stop_event, settings.sample_rate))
+               for s in live]
+    for feeder in feeders:
+        feeder.start()
+    for feeder in feeders:
+        feeder.join()
+    return [s.stop()["decoder"] for s in live]
+
+
+async def _remote_session(url: str, pcm: bytes, sample_rate: int):
+    import websockets
+
+    block = sample_rate // 10 * 2  # 100 ms of s16le
+    async with websockets.connect(url) as ws:
+        await ws.recv()  # session
+        started = time.monotonic()
+        for i in range(0, len(pcm), block):
+            await ws.send(pcm[i:i + block])
+            await asyncio.sleep(max(started + (i + block) / 2 / sample_rate - time.monotonic(), 0))
+        await ws.send(json.dumps({"type": "stop"}))
+        while True:
+            message = json.loads(await ws.recv())
+            if message["type"] == "done":
+                return message["stats"]["decoder"]
+
+
+def remote_sessions(wav_path: str, sessions: int, url: str):
+    samples, sample_rate = sf.read(wav_path, dtype="int16")
+    pcm = samples.reshape(len(samples), -1).mean(axis=1).astype("<i2").tobytes()
+
+    async def run_all():
+        return await asyncio.gather(*[_remote_session(url, pcm, sample_rate) for _ in range(sessions)])
+
+    return asyncio.run(run_all())
+
+
+def run(wav_path: str, session_counts, workers: int, model_size: str, url: str = None):
+    duration = sf.info(wav_path).duration
+    settings = LiveSettings()
+    pool = None
+    if url is None:
+        pool = LiveModelPool.load(model_size, device="cpu", workers=workers)
+        pool.transcribe(np.zeros(settings.sample_rate, dtype=np.float32))  # warm up
+    print(f"Audio: {duration:.1f} s, {'server ' + url if url else f'model {model_size}, {workers} pool workers'}")
+    print(f"{'sessions':>8} {'p50 (s)':>8} {'p90 (s)':>8} {'worst p90':>10} {'decodes':>8} {'queued (s)':>11}")
+
+    for sessions in session_counts:
+        waited_before = pool.wait_sec if pool else 0.0
+        if url is None:
+            stats = local_sessions(wav_path, sessions, pool, settings)
+        else:
+            stats = remote_sessions(wav_path, sessions, url)
+        p50 = np.median([s["latency_p50_sec"] for s in stats if s["latency_p50_sec"] is not None])
+        p90s = [s["latency_p90_sec"] for s in stats if s["latency_p90_sec"] is not None]
+        queued = pool.wait_sec - waited_before if pool else float("nan")
+        print(f"{sessions:>8} {p50:>8.2f} {np.median(p90s):>8.2f} {max(p90s):>10.2f} "
+              f"{sum(s['decodes'] for s in stats):>8} {queued:>11.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("wav_path")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--workers", type=int, default=4, help="Parallel decodes on the shared model (max_workers)")
+    parser.add_argument("--model", default="small")
+    parser.add_argument("--url", default=None, help="Stream to a running server's /ws/live-transcribe instead")
+    args = parser.parse_args()
+    run(args.wav_path, args.sessions, args.workers, args.model, args.url)
@@ -0,0 +1,68 @@
+"""
+Benchmark long-form chunked transcription against a single sequential Whisper pass.
+
+Usage (from the backend directory):
+    python benchmarks/bench_longform.py path/to/media [--workers 1 2 4 8] [--model small] [--beam 5]
+
+Reports the real-time factor (processing time / audio duration, lower is
+faster) for the sequential baseline and for each worker count, plus how many
+words the stitched transcript differs from the baseline by. Model load time is
+excluded: every pool is warmed on a short clip before it is timed.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.audio_buffer import decode_audio  # noqa: E402
+from services.longform_transcribe import LongformTranscriber  # noqa: E402
+
+
+def sequential(audio, model_size: str, beam_size: int):
+    from faster_whisper import WhisperModel
+    model = WhisperModel(model_size, device="cpu")
+    started = time.perf_counter()
+    segments, _ = model.transcribe(audio.samples, beam_size=beam_size, word_timestamps=True)
+    words = [w.word for s in segments for w in (s.words or [])]
+    return words, time.perf_counter() - started
+
+
+def longform(audio, model_size: str, beam_size: int, workers: int):
+    transcriber = LongformTranscriber(model_size, workers=workers, beam_size=beam_size)
+    try:
+        transcriber.warm()
+
+        started = time.perf_counter()
+        words = [w["word"] for s in transcriber.iter_transcribe(audio) for w in s["words"]]
+        return words, time.perf_counter() - started, transcriber.threads_per_worker
+    finally:
+        transcriber.shutdown()
+
+
+def run(media_path: str, worker_counts, model_size: str, beam_size: int):
+    audio = decode_audio(media_path)
+    duration = audio.duration_sec
+    print(f"Audio: {duration / 60:.1f} min, model {model_size}, beam {beam_size}, {os.cpu_count()} cores")
+    print(f"{'mode':>16} {'time (s)':>10} {'RTF':>8} {'speedup':>8} {'words':>7} {'word diff':>10}")
+
+    baseline_words, baseline_time = sequential(audio, model_size, beam_size)
+    print(f"{'sequential':>16} {baseline_time:>10.1f} {baseline_time / duration:>8.3f} {1.0:>7.1f}x "
+          f"{len(baseline_words):>7} {0:>10}")
+
+    for workers in worker_counts:
+        words, elapsed, threads = longform(audio, model_size, beam_size, workers)
+        label = f"{workers}w x {threads}t"
+        print(f"{label:>16} {elapsed:>10.1f} {elapsed / duration:>8.3f} {baseline_time / elapsed:>7.1f}x "
+              f"{len(words):>7} {len(words) - len(baseline_words):>+10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("media", help="Any ffmpeg-readable audio or video file; 10+ minutes is representative")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--model", default="small")
+    parser.add_argument("--beam", type=int, default=5)
+    args = parser.parse_args()
+    run(args.media, args.workers, args.model, args.beam)
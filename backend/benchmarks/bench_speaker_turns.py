@@ -0,0 +1,133 @@
+"""
+Benchmark extract_speaker_segments against the original per-segment plus per-word merge.
+
+Usage (from the backend directory):
+    python benchmarks/bench_speaker_turns.py [--sizes 10000 100000 1000000] [--legacy-limit 100000]
+
+Both sides are timed end to end, SpeakerSegment objects included, with the
+cyclic GC left on as it is in the server. "build" is build_speaker_turns
+alone. The legacy merge added each segment and its words, so "legacy
+covered" shows how much audio it counted twice. Above --legacy-limit words
+the legacy implementation is timed on a prefix and extrapolated linearly.
+Turn coverage itself is checked in tests/test_speaker_turns.py.
+"""
+import argparse
+import gc
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.speaker_segmentation import SpeakerSegment, SpeakerSegmentationService  # noqa: E402
+from services.speaker_turns import build_speaker_turns  # noqa: E402
+
+WORDS_PER_SEGMENT = 12
+WORD_DURATION = 0.35
+
+
+def legacy_extract_speaker_segments(transcript_data):
+    """extract_speaker_segments() as it shipped before speaker_turns"""
+    speaker_segments = {}
+    for segment in transcript_data.get("segments", []):
+        segment_start = segment.get("start", 0)
+        segment_end = segment.get("end", 0)
+        segment_text = segment.get("text", "").strip()
+        segment_speaker = segment.get("speaker")
+        if segment_speaker:
+            if segment_speaker not in speaker_segments:
+                speaker_segments[segment_speaker] = []
+            speaker_segments[segment_speaker].append(SpeakerSegment(
+                speaker_id=segment_speaker, start_time=segment_start, end_time=segment_end,
+                text=segment_text, words=segment.get("words", [])))
+        for word in segment.get("words", []):
+            word_speaker = word.get("speaker")
+            if word_speaker:
+                if word_speaker not in speaker_segments:
+                    speaker_segments[word_speaker] = []
+                word_start = word.get("start", segment_start)
+                word_end = word.get("end", segment_end)
+                word_text = word.get("word", "").strip()
+                if (speaker_segments[word_speaker] and
+                        speaker_segments[word_speaker][-1].end_time >= word_start - 0.1):
+                    last_segment = speaker_segments[word_speaker][-1]
+                    last_segment.end_time = word_end
+                    last_segment.text += " " + word_text
+                else:
+                    speaker_segments[word_speaker].append(SpeakerSegment(
+                        speaker_id=word_speaker, start_time=word_start, end_time=word_end, text=word_text))
+    for speaker_id in speaker_segments:
+        speaker_segments[speaker_id].sort(key=lambda x: x.start_time)
+    return speaker_segments
+
+
+def make_synthetic_transcript(n_words, n_speakers=4, seed=0):
+    """Labelled transcript: segment speaker is the majority of its words, like assign_speakers output"""
+    rng = np.random.default_rng(seed)
+    # Mostly back-to-back words, as Whisper times them, with occasional pauses
+    starts = np.cumsum(rng.uniform(0.0, 0.15, n_words) + WORD_DURATION) - WORD_DURATION
+    ends = starts + WORD_DURATION
+    # Speakers change every few words to a few dozen
+    change = rng.random(n_words) < 0.05
+    speakers = np.cumsum(change) % n_speakers
+
+    segments = []
+    for lo in range(0, n_words, WORDS_PER_SEGMENT):
+        hi = min(lo + WORDS_PER_SEGMENT, n_words)
+        words = [{"start": float(starts[i]), "end": float(ends[i]), "word": f" w{i}",
+                  "speaker": f"SPEAKER_{speakers[i]:02d}"} for i in range(lo, hi)]
+        majority = np.bincount(speakers[lo:hi]).argmax()
+        segments.append({"start": words[0]["start"], "end": words[-1]["end"], "text": "",
+                         "speaker": f"SPEAKER_{majority:02d}", "words": words})
+    return {"segments": segments}
+
+
+def _timed(fn, *args, repeat=3):
+    """Best wall time of a few runs, starting each from a clean heap"""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - started)
+        del result
+    return best
+
+
+def run(sizes, legacy_limit):
+    logging.disable(logging.INFO)
+    service = SpeakerSegmentationService(assets_dir=tempfile.mkdtemp())
+    print(f"{'words':>10} {'turns':>8} {'legacy (s)':>11} {'new (s)':>8} {'build (s)':>10} {'speedup':>8} "
+          f"{'speech (s)':>11} {'legacy covered':>15}")
+    for n_words in sizes:
+        transcript = make_synthetic_transcript(n_words)
+        new_time = _timed(service.extract_speaker_segments, transcript)
+        build_time = _timed(build_speaker_turns, transcript["segments"])
+
+        n_segments = min(n_words, legacy_limit) // WORDS_PER_SEGMENT or 1
+        sample = {"segments": transcript["segments"][:n_segments]}
+        sample_words = sum(len(s["words"]) for s in sample["segments"])
+        legacy_time = _timed(legacy_extract_speaker_segments, sample) * (n_words / sample_words)
+
+        # Coverage on the same prefix: what each implementation counts as speech
+        turns = service.speaker_turns
+        sample_turns = build_speaker_turns(sample["segments"])
+        speech = float(np.sum(sample_turns.end - sample_turns.start))
+        legacy = legacy_extract_speaker_segments(sample)
+        legacy_covered = sum(seg.end_time - seg.start_time for segments in legacy.values() for seg in segments)
+        estimated = "~" if sample_words < n_words else " "
+        print(f"{n_words:>10} {len(turns):>8} {estimated}{legacy_time:>10.2f} {new_time:>8.3f} {build_time:>10.3f} "
+              f"{legacy_time / new_time:>7.1f}x {speech:>11.0f} {legacy_covered / speech:>14.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--legacy-limit", type=int, default=100_000,
+                        help="Largest transcript (in words) timed with the legacy implementation")
+    args = parser.parse_args()
+    run(args.sizes, args.legacy_limit)
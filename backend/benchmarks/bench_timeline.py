@@ -0,0 +1,113 @@
+"""
+Benchmark the NumPy timeline assembler against the pydub slicing/concatenation it replaced.
+
+Usage (from the backend directory):
+    python benchmarks/bench_timeline.py [--hours 2] [--edits 500] [--legacy-edits 20]
+
+The legacy overlay strategy copies the whole track for every edit, so it is timed
+on the first --legacy-edits edits and extrapolated linearly to --edits.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from pydub import AudioSegment
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.timeline import AudioTimeline, TimelineEdit  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+def make_track(hours: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.integers(-8000, 8000, int(hours * 3600 * SAMPLE_RATE), dtype=np.int16)
+
+
+def make_edits(duration_sec: float, n_edits: int, seed: int = 1):
+    """Non-overlapping edited spans of 1-8 s with clips 0.5x-1.5x the span length"""
+    rng = np.random.default_rng(seed)
+    slot = duration_sec / n_edits
+    edits = []
+    for i in range(n_edits):
+        span = rng.uniform(1.0, min(8.0, slot * 0.9))
+        start = i * slot + rng.uniform(0, slot - span)
+        clip_len = int(span * rng.uniform(0.5, 1.5) * SAMPLE_RATE)
+        clip = rng.integers(-8000, 8000, clip_len, dtype=np.int16)
+        edits.append(TimelineEdit(round(start, 3), round(start + span, 3), clip))
+    return edits
+
+
+def to_segment(samples: np.ndarray) -> AudioSegment:
+    return AudioSegment(samples.tobytes(), frame_rate=SAMPLE_RATE, sample_width=2, channels=1)
+
+
+def legacy_overlay(original: AudioSegment, edits):
+    final_audio = original
+    for edit in edits:
+        cloned_audio = to_segment(edit.samples)
+        start_ms, end_ms = int(edit.start_time * 1000), int(edit.end_time * 1000)
+        silence = AudioSegment.silent(duration=end_ms - start_ms, frame_rate=SAMPLE_RATE)
+        final_audio = final_audio[:start_ms] + silence + final_audio[end_ms:]
+        final_audio = final_audio.overlay(cloned_audio, position=start_ms)
+    return final_audio
+
+
+def legacy_segments(original: AudioSegment, edits):
+    pieces = []
+    last_end = 0.0
+    for edit in edits:
+        if edit.start_time > last_end:
+            pieces.append(original[int(last_end * 1000):int(edit.start_time * 1000)])
+        pieces.append(to_segment(edit.samples))
+        last_end = edit.end_time
+    if last_end < len(original) / 1000.0:
+        pieces.append(original[int(last_end * 1000):])
+
+    final_audio = AudioSegment.empty()
+    for piece in pieces:
+        final_audio += piece
+    return final_audio
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def run(hours: float, n_edits: int, legacy_edits: int):
+    samples = make_track(hours)
+    edits = make_edits(len(samples) / SAMPLE_RATE, n_edits)
+    timeline = AudioTimeline(samples, SAMPLE_RATE)
+    original = to_segment(samples)
+    legacy_subset = edits[:legacy_edits]
+    scale = n_edits / len(legacy_subset)
+
+    print(f"Track: {hours:.1f} h ({len(samples) * 2 / 1e6:.0f} MB int16), {n_edits} edits")
+    print(f"{'strategy':>10} {'legacy (s)':>14} {'numpy (s)':>10} {'speedup':>9}")
+
+    _, legacy_time = timed(legacy_overlay, original, legacy_subset)
+    _, numpy_time = timed(timeline.render_overlay, edits)
+    legacy_time *= scale
+    print(f"{'overlay':>10} ~{legacy_time:>13.2f} {numpy_time:>10.3f} {legacy_time / numpy_time:>8.0f}x")
+
+    legacy_out, legacy_time = timed(legacy_segments, original, edits)
+    numpy_out, numpy_time = timed(timeline.render_segments, edits)
+    print(f"{'segments':>10} {legacy_time:>14.2f} {numpy_time:>10.3f} {legacy_time / numpy_time:>8.0f}x")
+
+    legacy_samples = np.frombuffer(legacy_out.raw_data, dtype=np.int16)
+    print(f"segments output identical to pydub: {np.array_equal(legacy_samples, numpy_out)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=2.0)
+    parser.add_argument("--edits", type=int, default=500)
+    parser.add_argument("--legacy-edits", type=int, default=20,
+                        help="Edits timed with the legacy overlay strategy before extrapolating")
+    args = parser.parse_args()
+    run(args.hours, args.edits, args.legacy_edits)
@@ -0,0 +1,97 @@
+"""
+Benchmark the TranscriptStats engine against the original generate_statistics().
+
+Usage (from the backend directory):
+    python benchmarks/bench_transcript_stats.py [--sizes 1000 10000 100000] [--speakers 6]
+
+Sizes are transcript segments, with one diarization turn per segment. The
+legacy column splits every segment's text and masks the turn DataFrame once
+per speaker. "build" computes every metric (including overlap, turn counts,
+words per minute and silence) from scratch. "edit" is the editor's refresh
+after one segment changed. Word counts and talk times are checked against
+the legacy output.
+"""
+import argparse
+import copy
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.transcript_stats import TranscriptStats  # noqa: E402
+from services.turn_index import TurnIndex  # noqa: E402
+
+
+def legacy_generate_statistics(combined_data, diarize_df):
+    """generate_statistics() as it shipped with the DataFrame turns"""
+    speakers = set()
+    total_words = 0
+    speaker_word_counts = {}
+    for segment in combined_data:
+        speaker = segment.get('speaker', 'Unknown')
+        speakers.add(speaker)
+        words = len(segment.get('text', '').split())
+        total_words += words
+        speaker_word_counts[speaker] = speaker_word_counts.get(speaker, 0) + words
+    speaker_times = {}
+    for speaker in speakers:
+        speaker_segments = diarize_df[diarize_df['speaker'] == speaker]
+        speaker_times[speaker] = float((speaker_segments['end'] - speaker_segments['start']).sum())
+    return {"total_words": total_words, "speaker_word_counts": speaker_word_counts,
+            "speaker_speaking_times": speaker_times}
+
+
+def make_synthetic_analysis(n_segments, n_speakers, seed=0):
+    rng = np.random.default_rng(seed)
+    starts = np.cumsum(rng.uniform(0.5, 6.0, n_segments))
+    ends = starts + rng.uniform(1.0, 8.0, n_segments)
+    speakers = [f"SPEAKER_{i:02d}" for i in rng.integers(0, n_speakers, n_segments)]
+    n_words = rng.integers(1, 30, n_segments)
+    segments = [{"start": float(s), "end": float(e), "speaker": speaker, "text": " word" * int(n)}
+                for s, e, speaker, n in zip(starts, ends, speakers, n_words)]
+    return segments, starts, ends, speakers
+
+
+def run(sizes, n_speakers):
+    print(f"{'segments':>9} {'legacy (ms)':>12} {'build (ms)':>11} {'edit (ms)':>10}")
+    for n_segments in sizes:
+        segments, starts, ends, speakers = make_synthetic_analysis(n_segments, n_speakers)
+        df = pd.DataFrame({"start": starts, "end": ends, "speaker": speakers})
+        turns = TurnIndex.from_arrays(starts, ends, speakers)
+
+        started = time.perf_counter()
+        legacy = legacy_generate_statistics(segments, df)
+        legacy_sec = time.perf_counter() - started
+
+        started = time.perf_counter()
+        stats = TranscriptStats(turns, segments)
+        result = stats.to_dict()
+        build_sec = time.perf_counter() - started
+
+        assert result["total_words"] == legacy["total_words"]
+        assert result["speaker_word_counts"] == legacy["speaker_word_counts"]
+        for speaker, seconds in legacy["speaker_speaking_times"].items():
+            assert abs(result["speaker_speaking_times"][speaker] - seconds) < 1e-6 * max(seconds, 1.0), speaker
+
+        edited = copy.copy(segments)
+        edited[n_segments // 2] = {**edited[n_segments // 2], "text": "an edited line", "speaker": speakers[0]}
+        started = time.perf_counter()
+        changed = stats.update(edited)
+        edited_result = stats.to_dict()
+        edit_sec = time.perf_counter() - started
+        assert changed == 1
+        assert edited_result["speaker_word_counts"] == legacy_generate_statistics(edited, df)["speaker_word_counts"]
+
+        print(f"{n_segments:>9} {legacy_sec * 1e3:>12.1f} {build_sec * 1e3:>11.1f} {edit_sec * 1e3:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--speakers", type=int, default=6)
+    args = parser.parse_args()
+    run(args.sizes, args.speakers)
@@ -0,0 +1,78 @@
+"""
+Benchmark the columnar transcript store against the indented transcript.json it replaced.
+
+Usage (from the backend directory):
+    python benchmarks/bench_transcript_store.py [--sizes 10000 100000 1000000] [--range 50]
+
+Transcripts are synthetic, with 10 ms word timestamps (as faster-whisper
+rounds them) and speaker labels like assign_speakers output. For every size,
+the store is checked to round-trip to the same dict. The timings cover:
+writing; opening and reading --range segments from the middle, as the
+editor's transcript endpoint does; reading every segment without words, as
+TTS diffing and statistics do; and a full JSON export. Each is compared with
+writing or parsing the whole JSON file.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.transcript_store import TranscriptStore, write_transcript_store  # noqa: E402
+from benchmarks.bench_speaker_turns import make_synthetic_transcript  # noqa: E402
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def run(sizes, range_len):
+    print(f"{'words':>9} {'json MB':>8} {'store MB':>9} {'json write':>11} {'store write':>12} {'json load':>10} "
+          f"{'range':>7} {'no words':>9} {'export':>7}")
+    for n_words in sizes:
+        transcript = make_synthetic_transcript(n_words)
+        for segment in transcript["segments"]:
+            segment["text"] = "".join(word["word"] for word in segment["words"])
+            # faster-whisper rounds timestamps to 10 ms
+            for item in [segment] + segment["words"]:
+                item["start"], item["end"] = round(item["start"], 2), round(item["end"], 2)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path, store_path = os.path.join(tmp, "transcript.json"), os.path.join(tmp, "transcript.bin")
+
+            def write_json():
+                with open(json_path, "w", encoding="utf-8") as f:
+                    json.dump(transcript, f, indent=2)
+
+            def load_json():
+                with open(json_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+
+            _, json_write = timed(write_json)
+            _, store_write = timed(lambda: write_transcript_store(transcript, store_path))
+            _, json_load = timed(load_json)
+
+            middle = len(transcript["segments"]) // 2
+            window, range_sec = timed(lambda: TranscriptStore(store_path).segments(middle, middle + range_len))
+            assert window == transcript["segments"][middle:middle + range_len]
+            _, no_words_sec = timed(lambda: TranscriptStore(store_path).segments(words=False))
+            exported, export_sec = timed(lambda: json.dumps(TranscriptStore(store_path).to_dict()))
+            assert json.loads(exported) == transcript
+
+            json_mb, store_mb = os.path.getsize(json_path) / 2 ** 20, os.path.getsize(store_path) / 2 ** 20
+
+        print(f"{n_words:>9} {json_mb:>8.1f} {store_mb:>9.1f} {json_write:>10.3f}s {store_write:>11.3f}s "
+              f"{json_load:>9.3f}s {range_sec:>6.4f}s {no_words_sec:>8.3f}s {export_sec:>6.3f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--range", type=int, default=50, help="Segments read by the random-access timing")
+    args = parser.parse_args()
+    run(args.sizes, args.range)
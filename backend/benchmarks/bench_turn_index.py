@@ -0,0 +1,113 @@
+"""
+Benchmark the columnar TurnIndex against the pandas DataFrame it replaced.
+
+Usage (from the backend directory):
+    python benchmarks/bench_turn_index.py [--sizes 1000 10000 100000] [--queries 10000] [--speakers 8]
+
+For every size, the script first checks TurnIndex point and range queries,
+per-speaker durations and the .npz round trip against brute force. It then
+times: per-speaker speaking time (a boolean mask per speaker, as
+generate_statistics did, vs one bincount), point queries (a full-column scan
+vs two binary searches), and saving/loading (CSV vs .npz).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.turn_index import TurnIndex  # noqa: E402
+
+
+def make_synthetic_turns(n_turns, n_speakers, seed=0):
+    """Back-to-back turns with some overlap between speakers, like pyannote output"""
+    rng = np.random.default_rng(seed)
+    starts = np.cumsum(rng.uniform(0.2, 4.0, n_turns))
+    ends = starts + rng.uniform(0.5, 6.0, n_turns)
+    speakers = np.array([f"SPEAKER_{i:02d}" for i in rng.integers(0, n_speakers, n_turns)])
+    return starts, ends, speakers
+
+
+def check_index(index, df, probes):
+    start, end = df["start"].to_numpy(), df["end"].to_numpy()
+    for t in probes[:200]:
+        expected = np.sort(start[(start <= t) & (end > t)])
+        assert np.array_equal(expected, index.start[index.at(t)]), t
+        expected = np.sort(start[(start < t + 3.0) & (end > t)])
+        assert np.array_equal(expected, index.start[index.overlapping(t, t + 3.0)]), t
+    pandas_times = df.assign(d=df["end"] - df["start"]).groupby("speaker")["d"].sum()
+    for label, total in index.durations().items():
+        assert abs(total - pandas_times[label]) < 1e-6 * max(total, 1.0), label
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "turns.npz")
+        index.save(path)
+        loaded = TurnIndex.load(path)
+    assert loaded.labels == index.labels
+    assert all(np.array_equal(getattr(loaded, a), getattr(index, a)) for a in ("start", "end", "speaker"))
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(sizes, n_queries, n_speakers):
+    print(f"{'turns':>8} {'stats pd (ms)':>14} {'stats idx':>10} {'points pd (ms)':>15} {'points idx':>11} "
+          f"{'csv save+load':>14} {'npz save+load':>14}")
+    for n_turns in sizes:
+        starts, ends, speakers = make_synthetic_turns(n_turns, n_speakers)
+        df = pd.DataFrame({"start": starts, "end": ends, "speaker": speakers})
+        index = TurnIndex.from_arrays(starts, ends, speakers)
+        probes = np.random.default_rng(1).uniform(0, ends.max(), n_queries)
+        check_index(index, df, probes)
+
+        def pandas_stats():
+            for speaker in df["speaker"].unique():
+                rows = df[df["speaker"] == speaker]
+                float((rows["end"] - rows["start"]).sum())
+
+        start_col, end_col = df["start"].to_numpy(), df["end"].to_numpy()
+
+        def pandas_points():
+            for t in probes:
+                np.flatnonzero((start_col <= t) & (end_col > t))
+
+        def index_points():
+            for t in probes:
+                index.at(t)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path, npz_path = os.path.join(tmp, "d.csv"), os.path.join(tmp, "d.npz")
+
+            def csv_round_trip():
+                df.to_csv(csv_path, index=False)
+                pd.read_csv(csv_path, dtype={"speaker": str})
+
+            def npz_round_trip():
+                index.save(npz_path)
+                TurnIndex.load(npz_path)
+
+            csv_sec, npz_sec = timed(csv_round_trip), timed(npz_round_trip)
+
+        print(f"{n_turns:>8} {timed(pandas_stats) * 1e3:>14.2f} {timed(index.durations) * 1e3:>10.3f} "
+              f"{timed(pandas_points, 1) * 1e3:>15.1f} {timed(index_points, 1) * 1e3:>11.1f} "
+              f"{csv_sec * 1e3:>14.2f} {npz_sec * 1e3:>14.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=10_000, help="Point queries per size")
+    parser.add_argument("--speakers", type=int, default=8)
+    args = parser.parse_args()
+    run(args.sizes, args.queries, args.speakers)
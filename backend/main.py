@@ -1,30 +1,78 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from concurrent.futures import ThreadPoolExecutor
-import tempfile
+from fastapi.concurrency import run_in_threadpool
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
 import os
 import shutil
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Optional
 
 import google.generativeai as genai
 from pydantic import BaseModel
-from pydub import AudioSegment
+import soundfile as sf
 
 from services.tts_service import run_voice_cloning_service
-from services.transcribe import extract_audio_from_video, transcribe, diarize, assign_speakers, save_to_json, OUTPUT_DIR
+from services.transcribe import extract_audio_from_video, iter_transcribe, diarize, save_to_json, analysis_version, config, \
+    TRANSCRIPTION_PROFILES, DEFAULT_TRANSCRIPTION_PROFILE, WHISPER_DEVICE, SPEAKER_REFERENCE_POLICY, get_profile, get_longform_transcriber, shutdown_longform
+from services.livetranscribe import LiveModelPool, LiveSession, LiveSettings, PCM_ENCODINGS, decode_pcm
+from services.ring_buffer import BACKPRESSURE
+from services.streaming_decoder import AsyncTranscriptEvents
 from services.speaker_segmentation import SpeakerSegmentationService
+from services.stage_graph import StageGraph
+from services.turn_index import TurnIndex
+from services.transcript_stats import TranscriptStats
+from services.transcript_store import TranscriptStore, load_transcript, write_transcript_store
+from services.model_registry import model_registry
+from services.speaker_assignment import SpeakerIntervalIndex, label_transcript
+from services.transcription_profiles import TranscriptionProfile
+from services.media_store import MediaStore, hash_file
+from services.workspace import Workspace, WorkspaceManager
+from services.analysis_cache import AnalysisCache, CachedAnalysis, make_cache_key
+from services.jobs import JobManager, JobQueueFull, JobCancelled, ANALYSIS_STAGES, STAGE_DONE, STAGE_RUNNING, FINISHED_STATES, SUCCEEDED, CANCELLED
 from fastapi.middleware.cors import CORSMiddleware
 
 try:
     import fal_client
 except ImportError:  # fal-client is optional; only needed for lip sync
     fal_client = None
+
+logger = logging.getLogger(__name__)
+
 MEDIA_DIR = os.path.join(os.getcwd(), "assests", "users_segements")
-VIDEO_CACHE_PATH = os.path.join(os.getcwd(), "assests", "video", "uploaded_video.mp4")
+VIDEO_STORE_DIR = os.path.join(os.getcwd(), "assests", "video")
+ANALYSIS_CACHE_DIR = os.path.join(os.getcwd(), "assests", "analysis_cache")
+WORKSPACES_DIR = os.path.join(os.getcwd(), "assests", "workspaces")
 os.makedirs(MEDIA_DIR, exist_ok=True)
-os.makedirs(os.path.dirname(VIDEO_CACHE_PATH), exist_ok=True)
-LAST_VIDEO_PATH = None
+
+# Uploaded videos are kept under the hash of their bytes for lip sync/output reuse
+media_store = MediaStore(
+    VIDEO_STORE_DIR,
+    max_size_bytes=int(config.get("max_video_store_mb", 20480)) * 1024 * 1024,
+)
+
+
+def _release_workspace_media(workspace: Workspace):
+    if workspace.video_path:
+        media_store.release(workspace.video_path)
+
+
+# Every analysis gets its own session directory so concurrent users never share files
+workspace_manager = WorkspaceManager(
+    WORKSPACES_DIR,
+    idle_ttl_sec=float(config.get("workspace_idle_ttl_minutes", 120)) * 60,
+    on_remove=_release_workspace_media,
+)
+
+# Finished analyses keyed by media hash + model/config versions, so re-uploads skip the models
+analysis_cache = AnalysisCache(
+    ANALYSIS_CACHE_DIR,
+    max_size_bytes=int(config.get("max_analysis_cache_mb", 10240)) * 1024 * 1024,
+)
 
 # Apply CORS
 app = FastAPI()
@@ -37,170 +85,643 @@ app.add_middleware(
 )
 
 app.mount("/media", StaticFiles(directory=MEDIA_DIR), name="media")
+app.mount("/sessions", StaticFiles(directory=WORKSPACES_DIR), name="sessions")
+
+# Heavy analyses run here, off the event loop, with a cap on running + queued jobs
+job_manager = JobManager(
+    max_workers=config.get("max_concurrent_jobs", 2),
+    max_pending=config.get("max_queued_jobs", 8),
+)
 
+# Live WebSocket sessions share one Whisper model that runs max_workers decodes at a time
+LIVE_SETTINGS = LiveSettings.from_config(config)
+LIVE_MAX_SESSIONS = config.get("live_max_sessions", 8)
+LIVE_WRITE_TIMEOUT = config.get("live_write_timeout_seconds", 5.0)
+live_sessions: Dict[str, Optional[LiveSession]] = {}
+model_registry.register(
+    "whisper-live",
+    lambda: LiveModelPool.load(config.get("model_size", "small"), device=WHISPER_DEVICE,
+                               compute_type=config.get("compute_type", "int8"),
+                               workers=config.get("max_workers", 4)),
+    thread_safe=True,
+)
 
-def process_video_analysis(video_path: str) -> Dict[str, Any]:
-    try:
-        audio_path = "assests/audio/extracted_audio.wav"
-        os.makedirs(os.path.dirname(audio_path), exist_ok=True)
-        extract_audio_from_video(video_path, audio_path)
 
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            transcribe_future = executor.submit(transcribe, audio_path)
-            diarize_future = executor.submit(diarize, audio_path)
+@app.on_event("startup")
+async def warm_models():
+    """Load Whisper, pyannote and xTTS once so the first request doesn't pay for it."""
+    if config.get("preload_models", True):
+        await run_in_threadpool(model_registry.warm)
+        longform = get_longform_transcriber(get_profile())
+        if longform is not None:
+            await run_in_threadpool(longform.warm)
 
-            transcript = transcribe_future.result()
-            diarize_df, audio = diarize_future.result()
 
-        transcript = assign_speakers(diarize_df, transcript, fill_nearest=False)
+@app.get("/models")
+def model_stats():
+    return model_registry.stats()
 
-        transcript_file_path = os.path.join(OUTPUT_DIR, "transcript.json")
-        save_to_json(transcript, transcript_file_path)
 
-        segmenter = SpeakerSegmentationService()
+@app.get("/live-sessions")
+def live_session_stats():
+    """Decode pool usage and per-session buffer, VAD and decoder stats for open live sessions."""
+    sessions = {session_id: session for session_id, session in list(live_sessions.items()) if session is not None}
+    return {
+        "max_sessions": LIVE_MAX_SESSIONS,
+        "open_sessions": len(live_sessions),
+        "pool": next(iter(sessions.values())).model.stats() if sessions else None,
+        "sessions": {session_id: session.stats() for session_id, session in sessions.items()},
+    }
 
-        audio_paths = segmenter.process_speaker_segmentation(transcript_file_path)
 
-        statistics = generate_statistics(transcript.get("segments", []), diarize_df)
-    
-        
+@app.get("/transcription-profiles")
+def transcription_profiles():
+    return {
+        "default": DEFAULT_TRANSCRIPTION_PROFILE,
+        "profiles": {name: profile.to_dict() for name, profile in TRANSCRIPTION_PROFILES.items()},
+    }
+
+
+def _no_progress(stage: str, status: str = "running"):
+    pass
+
+
+def _no_emit(event: str, payload: Dict[str, Any]):
+    pass
+
+
+def _speaker_labels(segments, start: int = 0) -> Dict[str, Any]:
+    return {
+        "labels": [
+            {
+                "index": start + i,
+                "speaker": seg.get("speaker"),
+                "word_speakers": [word.get("speaker") for word in seg["words"]],
+            }
+            for i, seg in enumerate(segments)
+        ]
+    }
+
+
+def _restore_cached_analysis(cached: CachedAnalysis, workspace: Workspace, progress: Callable[..., None],
+                             emit: Callable[[str, Dict[str, Any]], None]) -> Dict[str, Any]:
+    """Put a cached analysis back where the edit/TTS path expects to find it"""
+    shutil.copyfile(cached.audio_path, workspace.audio_path)
+    write_transcript_store(cached.transcript, workspace.transcript_path)
+    cached.turns.save(workspace.turns_path)
+
+    for speaker_id, clip_path in cached.speaker_audio.items():
+        shutil.copyfile(clip_path, os.path.join(workspace.speaker_audio_dir, f"{speaker_id}.wav"))
+
+    # Recomputed rather than read back, so entries cached before a metric was added still report it
+    workspace.stats = TranscriptStats(cached.turns, cached.transcript.get("segments", []),
+                                      duration_sec=sf.info(cached.audio_path).duration)
+
+    for stage in ANALYSIS_STAGES:
+        progress(stage, STAGE_DONE)
+    for index, segment in enumerate(cached.transcript.get("segments", [])):
+        emit("segment", {"index": index, "segment": segment})
+
+    return {
+        "transcription": cached.transcript,
+        "statistics": workspace.stats.to_dict(),
+        "status": "success"
+    }
+
+
+def process_video_analysis(video_path: str, progress: Callable[..., None] = _no_progress,
+                           media_sha256: Optional[str] = None, workspace: Optional[Workspace] = None,
+                           emit: Callable[[str, Dict[str, Any]], None] = _no_emit,
+                           profile: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run (or restore from cache) the full analysis of a video in a session workspace.
+
+    emit(event, payload) receives "segment" events as Whisper yields each segment and
+    "speakers" events with labels for already-emitted segments once diarization finishes.
+    """
+    if workspace is None:
+        workspace = workspace_manager.create()
+    workspace.video_path = video_path
+
+    with workspace_manager.use(workspace), workspace.lock:
+        try:
+            result = _run_video_analysis(video_path, workspace, progress, media_sha256, emit, get_profile(profile))
+        finally:
+            # A session can sit idle for hours; later edits read the saved WAV instead of keeping the decode in RAM.
+            # A memory-mapped buffer costs no RAM of its own, so it stays
+            if workspace.audio is not None and not workspace.audio.memory_mapped:
+                workspace.audio = None
+    result["session_id"] = workspace.id
+    return result
+
+
+def _analysis_graph(audio_path: str, video_path: str, workspace: Workspace, progress: Callable[..., None],
+                    emit: Callable[[str, Dict[str, Any]], None], profile: TranscriptionProfile) -> StageGraph:
+    """
+    The analysis as a stage graph, so no stage waits longer than its inputs require.
+
+    diarize and transcribe both start once the audio is decoded. Whisper
+    segments stream out while pyannote runs and are labelled as soon as its
+    turns exist, so "assign" only labels what streamed before that. Reference
+    clips come straight from the diarization turns, so "segment" writes every
+    speaker's clip (in parallel) while transcription is still going.
+    """
+    graph = StageGraph(max_workers=3)
+
+    def report(stage: str, status: str = STAGE_RUNNING):
+        # Every progress report is also where a stage stops if the job was cancelled or a sibling stage failed
+        graph.check()
+        progress(stage, status)
+
+    def extract(_):
+        # One ffmpeg decode feeds every stage; the WAV copy is for the cache and later edits
+        report("extract")
+        workspace.audio = extract_audio_from_video(video_path, audio_path, spill_path=workspace.audio_pcm_path)
+        report("extract", STAGE_DONE)
+        return workspace.audio
+
+    def run_diarize(inputs):
+        report("diarize")
+        turns, _ = diarize(inputs["extract"])
+        turns.save(workspace.turns_path)
+        report("diarize", STAGE_DONE)
+        return turns
+
+    def transcribe(inputs):
+        report("transcribe")
+        diarize_future = graph.future("diarize")
+        segments = []
+        speaker_index = None
+        started = time.perf_counter()
+        for segment in iter_transcribe(inputs["extract"], profile.name):
+            if speaker_index is None and diarize_future.done():
+                speaker_index = SpeakerIntervalIndex.from_turn_index(diarize_future.result())
+                label_transcript(speaker_index, {"segments": segments})
+                emit("speakers", _speaker_labels(segments))
+            if speaker_index is not None:
+                label_transcript(speaker_index, {"segments": [segment]})
+
+            emit("segment", {"index": len(segments), "segment": segment})
+            segments.append(segment)
+            # Heartbeat and cancellation point between segments
+            report("transcribe")
+        transcribe_sec = time.perf_counter() - started
+        report("transcribe", STAGE_DONE)
+        return {"segments": segments}, transcribe_sec, speaker_index is not None
+
+    def assign(inputs):
+        report("assign")
+        transcript, _, labelled = inputs["transcribe"]
+        turns = inputs["diarize"]
+        if not labelled:
+            # Diarization outlasted Whisper: label everything that streamed in one pass
+            label_transcript(SpeakerIntervalIndex.from_turn_index(turns), transcript)
+            emit("speakers", _speaker_labels(transcript["segments"]))
+        write_transcript_store(transcript, workspace.transcript_path)
+        workspace.stats = TranscriptStats(turns, transcript["segments"], duration_sec=inputs["extract"].duration_sec)
+        statistics = workspace.stats.to_dict()
+        report("assign", STAGE_DONE)
+        return transcript, statistics
+
+    def segment(inputs):
+        report("segment")
+        segmenter = SpeakerSegmentationService(assets_dir=workspace.root, audio=inputs["extract"],
+                                               reference_policy=SPEAKER_REFERENCE_POLICY)
+        audio_paths = segmenter.process_diarization_turns(inputs["diarize"])
+        report("segment", STAGE_DONE)
+        return audio_paths
+
+    graph.add("extract", extract)
+    graph.add("diarize", run_diarize, after=["extract"])
+    graph.add("transcribe", transcribe, after=["extract"])
+    graph.add("assign", assign, after=["extract", "transcribe", "diarize"])
+    graph.add("segment", segment, after=["extract", "diarize"])
+    return graph
+
+
+def _profile_report(profile: TranscriptionProfile, transcribe_sec: Optional[float] = None,
+                    audio_sec: Optional[float] = None) -> Dict[str, Any]:
+    """Profile settings plus measured real-time factor (decode time / audio duration; None on cache hits)"""
+    rtf = transcribe_sec / audio_sec if transcribe_sec is not None and audio_sec else None
+    return {**profile.to_dict(), "transcribe_sec": transcribe_sec, "audio_sec": audio_sec, "rtf": rtf}
+
+
+def _run_video_analysis(video_path: str, workspace: Workspace, progress: Callable[..., None],
+                        media_sha256: Optional[str], emit: Callable[[str, Dict[str, Any]], None],
+                        profile: TranscriptionProfile) -> Dict[str, Any]:
+    try:
+        audio_path = workspace.audio_path
+
+        cache_key = make_cache_key(media_sha256 or hash_file(video_path), analysis_version(profile.name))
+        cached = analysis_cache.get(cache_key)
+        if cached is not None:
+            result = _restore_cached_analysis(cached, workspace, progress, emit)
+            result["cache"] = {"hit": True, "key": cache_key, **analysis_cache.stats()}
+            result["transcription_profile"] = _profile_report(profile)
+            return result
+
+        graph = _analysis_graph(audio_path, video_path, workspace, progress, emit, profile)
+        results = graph.run()
+        audio = results["extract"]
+        turns = results["diarize"]
+        transcript, statistics = results["assign"]
+        _, transcribe_sec, _ = results["transcribe"]
+        audio_paths = results["segment"]
+        pipeline = graph.report()
+        print(f"[Analysis] {pipeline['wall_sec']:.1f}s wall, critical path "
+              f"{' -> '.join(pipeline['critical_path'])} ({pipeline['critical_path_sec']:.1f}s)")
+
+        analysis_cache.put(cache_key, audio_path, transcript, turns, statistics, audio_paths)
+
         return {
             "transcription": transcript,
             "statistics": statistics,
-            "status": "success"
+            "status": "success",
+            "cache": {"hit": False, "key": cache_key, **analysis_cache.stats()},
+            "transcription_profile": _profile_report(profile, transcribe_sec, audio.duration_sec),
+            "diarization": turns.report,
+            "pipeline": pipeline,
         }
     
+    except JobCancelled:
+        raise
     except Exception as e:
         return {
             "error": str(e),
             "status": "failed"
         }
 
-def generate_statistics(combined_data, diarize_df) -> Dict[str, Any]:
-    """Generate statistics from the analysis results."""
+async def _save_upload(file: UploadFile) -> str:
+    # Validate file type
+    if not file.filename.lower().endswith(('.mp4', '.avi', '.mov', '.mkv')):
+        raise HTTPException(status_code=400, detail="Invalid file format. Please upload a video file.")
+
+    # Stream the upload to disk chunk by chunk; the stored file is analysed in place and comes back pinned
+    return await media_store.ingest_upload(file)
+
+
+def _submit_analysis(video_path: str, media_sha256: Optional[str] = None,
+                     emit: Callable[[str, Dict[str, Any]], None] = _no_emit, profile: Optional[str] = None):
+    """Queue an analysis; the caller's media_store pin on video_path passes to the session workspace"""
     try:
-        speakers = set()
-        total_words = 0
-        speaker_word_counts = {}
-        
-        for segment in combined_data:
-            if not isinstance(segment, dict):
-                print(f"Warning: Skipping non-dictionary segment: {segment}")
-                continue
-
-            speaker = segment.get('speaker', 'Unknown')
-            speakers.add(speaker)
-            words = len(segment.get('text', '').split())
-            total_words += words
-            speaker_word_counts[speaker] = speaker_word_counts.get(speaker, 0) + words
-        
-        # Calculate speaking time per speaker from the diarization data.
-        speaker_times = {}
-        for speaker in speakers:
-            speaker_segments = diarize_df[diarize_df['speaker'] == speaker]
-            total_time = (speaker_segments['end'] - speaker_segments['start']).sum()
-            speaker_times[speaker] = float(total_time)
-        
-        return {
-            "total_speakers": len(speakers),
-            "total_words": total_words,
-            "speaker_word_counts": speaker_word_counts,
-            "speaker_speaking_times": speaker_times,
-            "speakers_list": list(speakers)
-        }
-    
-    except Exception as e:
-        return {"error": f"Statistics generation failed: {str(e)}"}
+        profile = get_profile(profile).name
+    except ValueError as e:
+        media_store.release(video_path)
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Pinned from submission, not just while the job runs, so a queued job's workspace can't expire first
+    workspace = workspace_manager.create(pinned=True)
+    # The video stays in the store for as long as the workspace exists (lip sync reads it after the job)
+    workspace.video_path = video_path
+    try:
+        job = job_manager.submit(process_video_analysis, video_path, media_sha256=media_sha256,
+                                 workspace=workspace, emit=emit, profile=profile,
+                                 kind="analyze-video", stages=ANALYSIS_STAGES)
+    except JobQueueFull as e:
+        workspace_manager.release(workspace)
+        raise HTTPException(status_code=429, detail=str(e))
+    job.future.add_done_callback(lambda _: workspace_manager.release(workspace))
+    return job, workspace
+
+
+async def _wait_for_analysis(job) -> JSONResponse:
+    """Await a job without blocking the event loop and answer like the old synchronous endpoint"""
+    try:
+        result = await asyncio.wrap_future(job.future)
+    except asyncio.CancelledError:
+        if not job.future.cancelled():
+            # The client went away mid-analysis; stop the job at its next stage
+            job_manager.cancel(job.id)
+            raise
+        result = None
+    if job.status == CANCELLED:
+        raise HTTPException(status_code=409, detail=f"Job {job.id} was cancelled")
+    return JSONResponse(content=result)
+
 
 @app.post("/analyze-video/")
-async def analyze_video(file: UploadFile = File(...)):
+async def analyze_video(file: UploadFile = File(...), profile: Optional[str] = Form(None)):
     try:
-        # Validate file type
-        if not file.filename.lower().endswith(('.mp4', '.avi', '.mov', '.mkv')):
-            raise HTTPException(status_code=400, detail="Invalid file format. Please upload a video file.")
-        
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_video_path = temp_file.name
-
-        # Keep a copy of the uploaded video for lip sync/output reuse
-        try:
-            shutil.copyfile(temp_video_path, VIDEO_CACHE_PATH)
-            global LAST_VIDEO_PATH
-            LAST_VIDEO_PATH = VIDEO_CACHE_PATH
-        except Exception:
-            # Non-fatal; log in real setup
-            pass
-        
-        try:
-            # Process the video
-            result = process_video_analysis(temp_video_path)
-            
-            return JSONResponse(content=result)
-        
-        finally:
-            # Clean up temporary video file
-            if os.path.exists(temp_video_path):
-                os.remove(temp_video_path)
-    
+        stored = await _save_upload(file)
+        job, _ = _submit_analysis(stored.path, stored.sha256, profile=profile)
+        return await _wait_for_analysis(job)
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
-class TranscriptEdit(BaseModel):
-    segments: Any
-    lip_sync: bool = False
 
-@app.post("/edit-transcript/")
-async def edit_transcript(request: Request, transcript: TranscriptEdit):
+
+@app.websocket("/ws/live-transcribe")
+async def live_transcribe(websocket: WebSocket, sample_rate: int = LIVE_SETTINGS.sample_rate, encoding: str = "s16le"):
+    """
+    Live transcription of audio streamed by the client.
+
+    Binary messages carry mono PCM at sample_rate, as s16le (default) or f32le.
+    The text message {"type": "stop"} ends the stream. The server sends
+    "session", then in-order "partial"/"final" events as the decoder produces
+    them, and "done" (full text and session stats) after stop.
+
+    Each session has a backpressure buffer. A message is read only once the
+    previous one has been buffered, so a client that outruns the decoder is
+    slowed by the socket. Audio still refused after live_write_timeout_seconds
+    is dropped and reported in an "overflow" event.
+    """
+    await websocket.accept()
+    if sample_rate != LIVE_SETTINGS.sample_rate or encoding not in PCM_ENCODINGS:
+        await websocket.close(code=1003, reason=f"Expected {LIVE_SETTINGS.sample_rate} Hz audio as one of {sorted(PCM_ENCODINGS)}")
+        return
+    if len(live_sessions) >= LIVE_MAX_SESSIONS:
+        await websocket.close(code=1013, reason="Too many live sessions, try again later")
+        return
+
+    session_id = uuid.uuid4().hex
+    live_sessions[session_id] = None  # hold the slot while the model loads
+    events = AsyncTranscriptEvents()
+    session = None
+    sender = None
     try:
-        output_path = os.path.join(OUTPUT_DIR, "transcript-edited.json")
-        save_to_json({"segments": transcript.segments}, output_path)
+        pool = await run_in_threadpool(model_registry.get, "whisper-live")
+        session = LiveSession(pool, LIVE_SETTINGS, on_event=events, overflow_policy=BACKPRESSURE).start()
+        live_sessions[session_id] = session
+        await websocket.send_json({"type": "session", "session_id": session_id, "sample_rate": LIVE_SETTINGS.sample_rate})
+
+        async def send_events():
+            async for event in events:
+                await websocket.send_json(event.to_dict())
+
+        sender = asyncio.create_task(send_events())
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("bytes") is not None:
+                try:
+                    samples = decode_pcm(message["bytes"], encoding)
+                except ValueError:
+                    await websocket.close(code=1007, reason=f"Audio messages must hold whole {encoding} samples")
+                    return
+                rejected_before = session.audio_buffer.rejected_samples
+                await run_in_threadpool(session.write, samples, LIVE_WRITE_TIMEOUT)
+                rejected = session.audio_buffer.rejected_samples - rejected_before
+                if rejected:
+                    await websocket.send_json({"type": "overflow", "rejected_samples": rejected})
+            elif message.get("text") is not None:
+                try:
+                    command = json.loads(message["text"])
+                except json.JSONDecodeError:
+                    command = {}
+                if command.get("type") == "stop":
+                    break
+
+        stats = await run_in_threadpool(session.stop)
+        events.close()
+        await sender
+        await websocket.send_json({"type": "done", "session_id": session_id, "text": session.text, "stats": stats})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        live_sessions.pop(session_id, None)
+        if session is not None and not session.stop_event.is_set():
+            await run_in_threadpool(session.stop)
+        if sender is not None and not sender.done():
+            sender.cancel()
+
+
+@app.post("/jobs/analyze-video/", status_code=202)
+async def submit_analyze_video_job(file: UploadFile = File(...), profile: Optional[str] = Form(None)):
+    """Queue an analysis and return its job id right away; poll /jobs/{job_id} for progress."""
+    stored = await _save_upload(file)
+    job, workspace = _submit_analysis(stored.path, stored.sha256, profile=profile)
+    return {**job.to_dict(include_result=False), "session_id": workspace.id}
+
+
+def _sse(event: str, payload: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+@app.post("/analyze-video/stream")
+async def analyze_video_stream(file: UploadFile = File(...), profile: Optional[str] = Form(None)):
+    """
+    Analyse a video and stream results as Server-Sent Events.
+
+    Events: "session" (job and session ids), "segment" (one per Whisper segment, as
+    decoded), "speakers" (labels for segments sent before diarization finished),
+    then "done" with the same body /analyze-video/ returns, or "error".
+    """
+    stored = await _save_upload(file)
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    client_gone = threading.Event()
+
+    def emit(event: str, payload: Dict[str, Any]):
+        if client_gone.is_set():
+            raise JobCancelled("Streaming client disconnected")
+        # Serialize on the job thread: segments are labelled in place once diarization lands
+        loop.call_soon_threadsafe(events.put_nowait, _sse(event, payload))
+
+    job, workspace = _submit_analysis(stored.path, stored.sha256, emit=emit, profile=profile)
+
+    async def event_stream():
+        try:
+            yield _sse("session", {"job_id": job.id, "session_id": workspace.id})
+            while not (job.future.done() and events.empty()):
+                try:
+                    message = await asyncio.wait_for(events.get(), timeout=0.5)
+                except asyncio.TimeoutError:
+                    continue
+                yield message
+
+            if job.status == SUCCEEDED:
+                yield _sse("done", job.result)
+            else:
+                yield _sse("error", {"status": job.status, "error": job.error})
+        finally:
+            if not job.future.done():
+                client_gone.set()
+                job_manager.cancel(job.id)
 
-        final_audio_path = run_voice_cloning_service()
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
 
-        # Copy audio into served media directory
-        audio_filename = os.path.basename(final_audio_path)
-        served_audio_path = os.path.join(MEDIA_DIR, audio_filename)
-        shutil.copyfile(final_audio_path, served_audio_path)
 
-        # Duration metadata for sync
-        audio_duration = AudioSegment.from_file(served_audio_path).duration_seconds
+def _get_job_or_404(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
-        base_url = str(request.base_url).rstrip("/")
-        audio_url = f"{base_url}/media/{audio_filename}"
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    return _get_job_or_404(job_id).to_dict()
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """Server-Sent Events stream with one event per status or stage change."""
+    job = _get_job_or_404(job_id)
+
+    async def event_stream():
+        last_version = -1
+        while True:
+            if job.version != last_version:
+                last_version = job.version
+                finished = job.status in FINISHED_STATES
+                payload = job.to_dict(include_result=finished)
+                yield _sse("done" if finished else "progress", payload)
+                if finished:
+                    return
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict(include_result=False)
+
+
+class TranscriptEdit(BaseModel):
+    segments: Any
+    lip_sync: bool = False
+    session_id: Optional[str] = None
+
+
+def _resolve_workspace(session_id: Optional[str]) -> Workspace:
+    # Never guess the session: another user's workspace must not be reachable without its id
+    if not session_id:
+        raise HTTPException(status_code=400, detail="session_id is required; it is returned by the analysis")
+    workspace = workspace_manager.get(session_id)
+    if workspace is None:
+        raise HTTPException(status_code=404, detail="Session not found; analyze a video first")
+    return workspace
+
+
+def _refresh_statistics(workspace: Workspace, segments: Any) -> Dict[str, Any]:
+    """Statistics for an edited transcript; only segments whose speaker or text changed are recounted"""
+    if workspace.stats is None:
+        # After a restart or cache hit: turns come from the saved index, segment texts from the saved transcript
+        turns = TurnIndex.load(workspace.turns_path) if os.path.exists(workspace.turns_path) else TurnIndex.from_turns([])
+        duration = workspace.audio.duration_sec if workspace.audio is not None else sf.info(workspace.audio_path).duration
+        analysed = load_transcript(workspace.saved_transcript_path, words=False).get("segments", [])
+        workspace.stats = TranscriptStats(turns, analysed, duration_sec=duration)
+    workspace.stats.update(segments if isinstance(segments, list) else [])
+    return workspace.stats.to_dict()
+
+
+def _render_transcript_edit(workspace: Workspace, segments: Any, lip_sync: bool) -> Dict[str, Any]:
+    # Edits within one session rewrite the same files, so they are serialized per workspace
+    with workspace_manager.use(workspace), workspace.lock:
+        save_to_json({"segments": segments}, workspace.edited_transcript_path)
+
+        final_audio_path = run_voice_cloning_service(
+            assets_dir=workspace.root,
+            output_dir=workspace.tts_output_dir,
+            render_mode=config.get("tts_render_mode", "v2"),
+            debug=config.get("tts_debug", False),
+            audio=workspace.audio,
+        )
+
+        # Duration metadata for sync, from the WAV header rather than a full decode
+        audio_duration = sf.info(final_audio_path).duration
 
         lipsync_video_url = None
-        if transcript.lip_sync and LAST_VIDEO_PATH and fal_client and os.getenv("FAL_KEY"):
+        if lip_sync and workspace.video_path and fal_client and os.getenv("FAL_KEY"):
             try:
-                lipsync_video_url = run_lipsync(LAST_VIDEO_PATH, served_audio_path)
+                lipsync_video_url = run_lipsync(workspace.video_path, final_audio_path)
             except Exception:
                 lipsync_video_url = None
 
+        # Statistics come after the render and are best effort: a failure there must not lose the audio
+        try:
+            statistics = _refresh_statistics(workspace, segments)
+        except Exception as e:
+            logger.warning(f"[Edit] Statistics refresh failed for session {workspace.id}: {e}")
+            workspace.stats = None  # possibly half-updated; rebuilt from disk next time
+            statistics = None
+
+    return {
+        "audio_path": final_audio_path,
+        "audio_duration_sec": audio_duration,
+        "lipsync_video_url": lipsync_video_url,
+        "statistics": statistics,
+    }
+
+
+@app.post("/edit-transcript/")
+async def edit_transcript(request: Request, transcript: TranscriptEdit):
+    workspace = _resolve_workspace(transcript.session_id)
+    try:
+        rendered = await run_in_threadpool(_render_transcript_edit, workspace, transcript.segments, transcript.lip_sync)
+
+        # The rendered audio is served straight from the session workspace
+        relative_path = os.path.relpath(rendered["audio_path"], WORKSPACES_DIR).replace(os.sep, "/")
+        base_url = str(request.base_url).rstrip("/")
+        audio_url = f"{base_url}/sessions/{relative_path}"
+
         return {
             "audio_url": audio_url,
-            "audio_duration_sec": audio_duration,
-            "lipsync_video_url": lipsync_video_url,
+            "audio_duration_sec": rendered["audio_duration_sec"],
+            "lipsync_video_url": rendered["lipsync_video_url"],
+            "statistics": rendered["statistics"],
+            "session_id": workspace.id,
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save transcript: {str(e)}")
+
+
+@app.get("/transcript/{session_id}")
+def get_transcript(session_id: str, start: int = 0, stop: Optional[int] = None, words: bool = True):
+    """Segments [start, stop) of a session's transcript, read from its store without decoding the rest"""
+    workspace = workspace_manager.get(session_id)
+    path = workspace.saved_transcript_path if workspace is not None else None
+    if path is None or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Session not found or not analyzed yet")
+    if path == workspace.transcript_path:
+        store = TranscriptStore(path)
+        total, segments = len(store), store.segments(start, stop, words=words)
+    else:
+        # Sessions analysed before the store existed only have transcript.json, which is parsed whole
+        all_segments = load_transcript(path, words=words).get("segments", [])
+        total, segments = len(all_segments), all_segments[start:stop]
+    first = slice(start, stop).indices(total)[0]
+    return {"segments": segments, "total": total, "start": first}
+
+
+@app.post("/transcript-statistics/")
+async def transcript_statistics(transcript: TranscriptEdit):
+    """Refresh statistics for edited segments without rendering audio or re-running the analysis"""
+    workspace = _resolve_workspace(transcript.session_id)
+
+    def refresh():
+        with workspace_manager.use(workspace), workspace.lock:
+            return _refresh_statistics(workspace, transcript.segments)
+
+    try:
+        statistics = await run_in_threadpool(refresh)
+    except OSError as e:
+        raise HTTPException(status_code=409, detail=f"Session has no analysis to compute statistics from: {e}")
+    return {"statistics": statistics, "session_id": workspace.id}
+
+
 @app.post("/analyze-video-path/")
-async def analyze_video_from_path(video_path: str):
+async def analyze_video_from_path(video_path: str, profile: Optional[str] = None):
     try:
         if not os.path.exists(video_path):
             raise HTTPException(status_code=404, detail="Video file not found")
 
-        try:
-            shutil.copyfile(video_path, VIDEO_CACHE_PATH)
-            global LAST_VIDEO_PATH
-            LAST_VIDEO_PATH = VIDEO_CACHE_PATH
-        except Exception:
-            pass
-        
-        result = process_video_analysis(video_path)
-        
-        return JSONResponse(content=result)
+        # The file is already on local disk; reuse it in place rather than copying it.
+        # Pinned like an ingested upload, so the session releases it the same way
+        media_store.pin(video_path)
+        job, _ = _submit_analysis(video_path, profile=profile)
+        return await _wait_for_analysis(job)
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
 class SummarizeRequest(BaseModel):
@@ -264,6 +785,23 @@ def run_lipsync(video_path: str, audio_path: str) -> str:
         raise RuntimeError("Lip sync did not return a video URL.")
 
     return video_result["url"]
+@app.on_event("startup")
+async def collect_idle_workspaces():
+    """Periodically remove session workspaces nobody has touched for a while."""
+    async def collect_forever():
+        while True:
+            await run_in_threadpool(workspace_manager.collect_garbage)
+            await asyncio.sleep(600)
+
+    app.state.workspace_gc_task = asyncio.create_task(collect_forever())
+
+
+@app.on_event("shutdown")
+def stop_jobs():
+    job_manager.shutdown()
+    shutdown_longform()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="localhost", port=8000 )
\ No newline at end of file
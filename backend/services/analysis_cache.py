@@ -0,0 +1,158 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from services.turn_index import TurnIndex
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+AUDIO_FILE = "audio.wav"
+TRANSCRIPT_FILE = "transcript.json"
+DIARIZATION_FILE = "diarization.npz"
+STATISTICS_FILE = "statistics.json"
+SPEAKER_AUDIO_DIR = "speaker_audio"
+META_FILE = "meta.json"
+
+
+def make_cache_key(media_sha256: str, version: Dict[str, Any]) -> str:
+    """Key an analysis by the media bytes plus every model/config setting that affects its output"""
+    payload = json.dumps({"media": media_sha256, "version": version}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedAnalysis:
+    """Artifacts of a finished analysis as stored in the cache"""
+    key: str
+    entry_dir: str
+    transcript: Dict[str, Any]
+    turns: TurnIndex
+    statistics: Dict[str, Any]
+    speaker_audio: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def audio_path(self) -> str:
+        return os.path.join(self.entry_dir, AUDIO_FILE)
+
+
+class AnalysisCache:
+    """Persistent on-disk cache of full analysis results with size-bounded LRU eviction"""
+
+    def __init__(self, root_dir: str, max_size_bytes: Optional[int] = None):
+        self.root_dir = root_dir
+        self.max_size_bytes = max_size_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(root_dir, exist_ok=True)
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.root_dir, key)
+
+    def get(self, key: str) -> Optional[CachedAnalysis]:
+        entry_dir = self._entry_dir(key)
+        meta_path = os.path.join(entry_dir, META_FILE)
+        if not os.path.exists(meta_path):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        try:
+            with open(os.path.join(entry_dir, TRANSCRIPT_FILE), "r", encoding="utf-8") as f:
+                transcript = json.load(f)
+            with open(os.path.join(entry_dir, STATISTICS_FILE), "r", encoding="utf-8") as f:
+                statistics = json.load(f)
+            turns = TurnIndex.load(os.path.join(entry_dir, DIARIZATION_FILE))
+        except (OSError, ValueError) as e:
+            # A half-evicted or corrupt entry is just a miss
+            logger.warning(f"[Cache] Dropping unreadable entry {key}: {e}")
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        speaker_dir = os.path.join(entry_dir, SPEAKER_AUDIO_DIR)
+        speaker_audio = {}
+        if os.path.isdir(speaker_dir):
+            for name in sorted(os.listdir(speaker_dir)):
+                speaker_audio[os.path.splitext(name)[0]] = os.path.join(speaker_dir, name)
+
+        # Touch the entry so eviction treats it as recently used
+        os.utime(meta_path)
+        with self._lock:
+            self.hits += 1
+        logger.info(f"[Cache] Hit for {key}")
+        return CachedAnalysis(key, entry_dir, transcript, turns, statistics, speaker_audio)
+
+    def put(self, key: str, audio_path: str, transcript: Dict[str, Any], turns: TurnIndex,
+            statistics: Dict[str, Any], speaker_audio: Optional[Dict[str, str]] = None):
+        """Store an analysis; the entry is built aside and renamed into place atomically"""
+        entry_dir = self._entry_dir(key)
+        if os.path.exists(entry_dir):
+            return
+
+        staging_dir = os.path.join(self.root_dir, f".staging-{uuid.uuid4().hex}")
+        try:
+            os.makedirs(os.path.join(staging_dir, SPEAKER_AUDIO_DIR))
+            shutil.copyfile(audio_path, os.path.join(staging_dir, AUDIO_FILE))
+            with open(os.path.join(staging_dir, TRANSCRIPT_FILE), "w", encoding="utf-8") as f:
+                json.dump(transcript, f)
+            with open(os.path.join(staging_dir, STATISTICS_FILE), "w", encoding="utf-8") as f:
+                json.dump(statistics, f)
+            turns.save(os.path.join(staging_dir, DIARIZATION_FILE))
+            for speaker_id, path in (speaker_audio or {}).items():
+                shutil.copyfile(path, os.path.join(staging_dir, SPEAKER_AUDIO_DIR, f"{speaker_id}.wav"))
+            with open(os.path.join(staging_dir, META_FILE), "w", encoding="utf-8") as f:
+                json.dump({"key": key, "created_at": time.time()}, f)
+
+            os.rename(staging_dir, entry_dir)
+            logger.info(f"[Cache] Stored analysis {key}")
+        except OSError as e:
+            # Most likely a concurrent put of the same key won the rename
+            logger.warning(f"[Cache] Could not store analysis {key}: {e}")
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+        self.evict(keep_key=key)
+
+    @staticmethod
+    def _dir_size(path: str) -> int:
+        total = 0
+        for dirpath, _, filenames in os.walk(path):
+            for name in filenames:
+                total += os.path.getsize(os.path.join(dirpath, name))
+        return total
+
+    def evict(self, keep_key: Optional[str] = None):
+        """Drop least recently used entries until the cache fits in max_size_bytes"""
+        if not self.max_size_bytes:
+            return
+
+        entries = []
+        for key in os.listdir(self.root_dir):
+            meta_path = os.path.join(self.root_dir, key, META_FILE)
+            if key.startswith(".") or not os.path.exists(meta_path):
+                continue
+            entries.append((os.path.getmtime(meta_path), self._dir_size(self._entry_dir(key)), key))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total <= self.max_size_bytes:
+                break
+            if key == keep_key:
+                continue
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            total -= size
+            logger.info(f"[Cache] Evicted {key}")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
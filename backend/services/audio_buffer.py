@@ -0,0 +1,246 @@
+import os
+import json
+import logging
+import struct
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+import numpy as np
+import soundfile as sf
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 4  # float32
+DECODE_CHUNK_SIZE = 1024 * 1024
+# Samples converted to int16 at a time, so a spilled buffer is never loaded whole to write it out
+CONVERT_CHUNK_SAMPLES = 1024 * 1024
+# Longer audio is spilled to a memory-mapped file instead of held in RAM (~3.8 MB per minute)
+DEFAULT_MAX_IN_MEMORY_SEC = 30 * 60
+
+
+WAV_FORMAT_PCM = 1
+WAV_FORMAT_FLOAT = 3
+WAV_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class AudioDecodeError(RuntimeError):
+    """ffmpeg/ffprobe failed; the message carries its stderr"""
+
+
+@dataclass
+class AudioBuffer:
+    """
+    Decoded mono float32 PCM shared by every stage of one analysis/edit session.
+
+    samples is either an in-memory array or a copy-on-write memmap of a raw
+    .f32 file, so consumers can slice it without knowing which.
+    """
+    samples: np.ndarray
+    sample_rate: int = SAMPLE_RATE
+    path: Optional[str] = None  # backing raw PCM file when memory-mapped
+
+    @classmethod
+    def from_wav(cls, path: str) -> "AudioBuffer":
+        samples, sample_rate = sf.read(path, dtype="float32")
+        if samples.ndim > 1:
+            samples = samples.mean(axis=1, dtype=np.float32)
+        return cls(samples, sample_rate)
+
+    @property
+    def duration_sec(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+    @property
+    def memory_mapped(self) -> bool:
+        return isinstance(self.samples, np.memmap)
+
+    def read(self, start: int, stop: int) -> np.ndarray:
+        """Samples [start, stop) as float32; same interface as MappedWav.read"""
+        return self.samples[max(start, 0):max(stop, start, 0)]
+
+    def slice(self, start_sec: float, end_sec: float) -> np.ndarray:
+        start = max(int(start_sec * self.sample_rate), 0)
+        return self.samples[start:max(int(end_sec * self.sample_rate), start)]
+
+    def int16_chunks(self, chunk_size: int = CONVERT_CHUNK_SAMPLES) -> Iterator[np.ndarray]:
+        """The samples as int16, chunk_size at a time; temporaries never exceed one chunk"""
+        for start in range(0, len(self.samples), chunk_size):
+            scaled = np.clip(self.samples[start:start + chunk_size], -1.0, 1.0) * 32767.0
+            yield np.rint(scaled).astype(np.int16)
+
+    def to_int16(self) -> np.ndarray:
+        output = np.empty(len(self.samples), dtype=np.int16)
+        position = 0
+        for chunk in self.int16_chunks():
+            output[position:position + len(chunk)] = chunk
+            position += len(chunk)
+        return output
+
+    def write_wav(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Same int16 conversion as to_int16, so edits from the WAV and from memory match exactly
+        with sf.SoundFile(path, "w", samplerate=self.sample_rate, channels=1, subtype="PCM_16") as f:
+            for chunk in self.int16_chunks():
+                f.write(chunk)
+
+
+def _wav_data_layout(path: str):
+    """(format tag, channels, sample rate, bits per sample, data offset, data bytes) from a RIFF/WAVE header"""
+    with open(path, "rb") as f:
+        riff, _, wave = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave != b"WAVE":
+            return None
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return None
+            chunk_id, size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                body = f.read(size)
+                tag, channels, sample_rate, _, _, bits = struct.unpack("<HHIIHH", body[:16])
+                if tag == WAV_FORMAT_EXTENSIBLE and len(body) >= 26:
+                    tag = struct.unpack("<H", body[24:26])[0]  # first two bytes of the subformat GUID
+                fmt = (tag, channels, sample_rate, bits)
+                f.seek(size % 2, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                return (*fmt, f.tell(), size) if fmt else None
+            else:
+                f.seek(size + size % 2, os.SEEK_CUR)
+
+
+class MappedWav:
+    """
+    Random access to a WAV file's samples without loading it.
+
+    16-bit PCM and 32-bit float WAVs (what write_wav and ffmpeg produce) are
+    memory-mapped, so reading a range only touches the pages it covers. Any
+    other encoding falls back to a seek and read through soundfile. read()
+    returns mono float32 in [-1, 1], like AudioBuffer.read.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._mapped = None
+        layout = _wav_data_layout(path)
+        if layout is not None:
+            tag, channels, sample_rate, bits, offset, size = layout
+            dtype = {(WAV_FORMAT_PCM, 16): "<i2", (WAV_FORMAT_FLOAT, 32): "<f4"}.get((tag, bits))
+            if dtype is not None and channels > 0:
+                frames = min(size, os.path.getsize(path) - offset) // (np.dtype(dtype).itemsize * channels)
+                self._mapped = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(frames, channels))
+                self.sample_rate = sample_rate
+                self.frames = frames
+        if self._mapped is None:
+            info = sf.info(path)
+            self.sample_rate = info.samplerate
+            self.frames = info.frames
+
+    @property
+    def memory_mapped(self) -> bool:
+        return self._mapped is not None
+
+    @property
+    def duration_sec(self) -> float:
+        return self.frames / self.sample_rate
+
+    def read(self, start: int, stop: int) -> np.ndarray:
+        """Samples [start, stop) as mono float32"""
+        start = min(max(start, 0), self.frames)
+        stop = min(max(stop, start), self.frames)
+        if self._mapped is None:
+            with sf.SoundFile(self.path) as f:
+                f.seek(start)
+                samples = f.read(stop - start, dtype="float32", always_2d=True)
+        else:
+            samples = self._mapped[start:stop]
+            if samples.dtype == np.int16:
+                samples = samples.astype(np.float32) / 32768.0
+        return samples.mean(axis=1, dtype=np.float32) if samples.shape[1] > 1 else np.asarray(samples[:, 0], dtype=np.float32)
+
+
+def _run_checked(cmd, **kwargs) -> subprocess.CompletedProcess:
+    try:
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **kwargs)
+    except FileNotFoundError as e:
+        raise AudioDecodeError(f"{cmd[0]} not found on PATH") from e
+    if result.returncode != 0:
+        raise AudioDecodeError(f"{cmd[0]} exited with {result.returncode}: {result.stderr.decode(errors='replace').strip()}")
+    return result
+
+
+def probe_duration(media_path: str) -> Optional[float]:
+    """Container duration in seconds from ffprobe, or None if it doesn't report one"""
+    result = _run_checked([
+        "ffprobe", "-v", "error", "-show_entries", "format=duration",
+        "-of", "json", media_path,
+    ])
+    duration = json.loads(result.stdout or b"{}").get("format", {}).get("duration")
+    try:
+        return float(duration)
+    except (TypeError, ValueError):
+        return None
+
+
+def decode_audio(media_path: str, sample_rate: int = SAMPLE_RATE, spill_path: Optional[str] = None,
+                 max_in_memory_sec: float = DEFAULT_MAX_IN_MEMORY_SEC) -> AudioBuffer:
+    """
+    Decode any ffmpeg-readable media to mono float32 PCM in a single pass.
+
+    ffmpeg's raw output is piped straight into the buffer, with no intermediate
+    WAV. When spill_path is given and the media is longer than max_in_memory_sec,
+    the PCM is streamed to spill_path and memory-mapped instead. A non-zero ffmpeg
+    exit raises AudioDecodeError with ffmpeg's stderr.
+    """
+    spill = False
+    if spill_path is not None:
+        duration = probe_duration(media_path)
+        spill = duration is not None and duration > max_in_memory_sec
+
+    cmd = [
+        "ffmpeg", "-nostdin", "-v", "error", "-i", media_path,
+        "-vn", "-ac", "1", "-ar", str(sample_rate),
+        "-f", "f32le", "-acodec", "pcm_f32le", "-",
+    ]
+    # stderr goes to a temp file so a chatty ffmpeg can never block on a full pipe
+    with tempfile.TemporaryFile() as stderr:
+        try:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr)
+        except FileNotFoundError as e:
+            raise AudioDecodeError("ffmpeg not found on PATH") from e
+
+        if spill:
+            os.makedirs(os.path.dirname(spill_path) or ".", exist_ok=True)
+            with open(spill_path, "wb") as out:
+                for chunk in iter(lambda: process.stdout.read(DECODE_CHUNK_SIZE), b""):
+                    out.write(chunk)
+        else:
+            pcm = bytearray()
+            for chunk in iter(lambda: process.stdout.read(DECODE_CHUNK_SIZE), b""):
+                pcm += chunk
+        process.stdout.close()
+
+        if process.wait() != 0:
+            stderr.seek(0)
+            message = stderr.read().decode(errors="replace").strip()
+            raise AudioDecodeError(f"ffmpeg failed to decode {media_path} (exit {process.returncode}): {message}")
+
+    if spill:
+        n_samples = os.path.getsize(spill_path) // BYTES_PER_SAMPLE
+        if n_samples == 0:
+            raise AudioDecodeError(f"ffmpeg produced no audio for {media_path}")
+        # Copy-on-write: writable for consumers like torch, without touching the file
+        samples = np.memmap(spill_path, dtype=np.float32, mode="c", shape=(n_samples,))
+        logger.info(f"[Audio] Decoded {n_samples / sample_rate:.1f}s to memory-mapped {spill_path}")
+        return AudioBuffer(samples, sample_rate, spill_path)
+
+    usable = len(pcm) - len(pcm) % BYTES_PER_SAMPLE
+    if usable == 0:
+        raise AudioDecodeError(f"ffmpeg produced no audio for {media_path}")
+    samples = np.frombuffer(pcm, dtype=np.float32, count=usable // BYTES_PER_SAMPLE)
+    logger.info(f"[Audio] Decoded {len(samples) / sample_rate:.1f}s into memory")
+    return AudioBuffer(samples, sample_rate)
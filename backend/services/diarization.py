@@ -0,0 +1,178 @@
+import time
+import logging
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# pyannote speaker-diarization-3.1 reports these hook steps in this order; clustering runs
+# between "embeddings" and "discrete_diarization"
+HOOK_STAGES = (("segmentation", "segmentation"), ("speaker_counting", "speaker_counting"),
+               ("embeddings", "embedding"), ("discrete_diarization", "clustering"))
+VAD_GAP_SEC = 0.5        # silence left between speech regions in fast mode
+VAD_MIN_SILENCE_MS = 1000
+VAD_SPEECH_PAD_MS = 200
+VAD_MAX_SPEECH_RATIO = 0.9  # fast mode is skipped when speech covers more of the audio than this
+
+
+@dataclass(frozen=True)
+class DiarizationSettings:
+    """
+    Speed knobs for the pyannote pipeline.
+
+    Batch sizes of 0 and threads of 0 keep the pipeline's own defaults.
+    segmentation_step is the hop between 10 s segmentation windows as a
+    fraction of the window: pyannote uses 0.1 (90% overlap), and 0.2-0.25
+    roughly halves segmentation work on CPU. num_speakers, when known, skips
+    the cluster-count search. fast_vad diarizes only the speech that Silero
+    VAD finds, so silence is never segmented or embedded.
+    """
+    embedding_batch_size: int = 32
+    segmentation_batch_size: int = 32
+    segmentation_step: float = 0.1
+    threads: int = 0
+    num_speakers: Optional[int] = None
+    fast_vad: bool = False
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "DiarizationSettings":
+        return cls(
+            embedding_batch_size=config.get("diarization_embedding_batch_size", cls.embedding_batch_size),
+            segmentation_batch_size=config.get("diarization_segmentation_batch_size", cls.segmentation_batch_size),
+            segmentation_step=config.get("diarization_segmentation_step", cls.segmentation_step),
+            threads=config.get("diarization_threads", cls.threads),
+            num_speakers=config.get("diarization_num_speakers") or None,
+            fast_vad=config.get("diarization_fast_vad", cls.fast_vad),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def configure_pipeline(pipeline, settings: DiarizationSettings):
+    """Apply batch sizes and segmentation step to a loaded SpeakerDiarization pipeline"""
+    if settings.embedding_batch_size:
+        pipeline.embedding_batch_size = settings.embedding_batch_size
+    if settings.segmentation_batch_size:
+        pipeline.segmentation_batch_size = settings.segmentation_batch_size
+    segmentation = getattr(pipeline, "_segmentation", None)
+    if segmentation is not None and settings.segmentation_step:
+        pipeline.segmentation_step = settings.segmentation_step
+        segmentation.step = settings.segmentation_step * segmentation.duration
+    return pipeline
+
+
+class StageTimer:
+    """
+    pyannote pipeline hook that records when each sub-stage finishes.
+
+    The pipeline calls hook(step_name, artifact, ...) as it works, including
+    progress calls during a step. The last call of a step marks its end, so
+    each stage's time is the gap from the previous stage's end to its own.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.last_seen: Dict[str, float] = {}
+
+    def __call__(self, step_name: str, step_artifact: Any = None, file: Any = None,
+                 total: Optional[int] = None, completed: Optional[int] = None):
+        self.last_seen[step_name] = time.perf_counter()
+
+    def stages(self, finished: Optional[float] = None) -> Dict[str, float]:
+        finished = finished or time.perf_counter()
+        timings = {}
+        previous = self.started
+        for step_name, stage in HOOK_STAGES:
+            if step_name in self.last_seen:
+                timings[f"{stage}_sec"] = self.last_seen[step_name] - previous
+                previous = self.last_seen[step_name]
+        timings["other_sec"] = finished - previous
+        return timings
+
+
+def compact_speech(samples: np.ndarray, sample_rate: int) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Speech-only copy of the audio for fast mode: (samples, compact starts, source starts) per region.
+
+    Regions come from faster-whisper's Silero VAD and are joined with
+    VAD_GAP_SEC of silence, so pyannote still sees a pause between them. Returns None
+    when VAD would not shorten the audio enough to be worth it.
+    """
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    speech = get_speech_timestamps(np.asarray(samples), VadOptions(min_silence_duration_ms=VAD_MIN_SILENCE_MS,
+                                                                   speech_pad_ms=VAD_SPEECH_PAD_MS))
+    speech_samples = sum(r["end"] - r["start"] for r in speech)
+    if not speech or speech_samples > VAD_MAX_SPEECH_RATIO * len(samples):
+        return None
+
+    gap = np.zeros(int(VAD_GAP_SEC * sample_rate), dtype=np.float32)
+    pieces, compact_starts, source_starts = [], [], []
+    position = 0
+    for region in speech:
+        if pieces:
+            pieces.append(gap)
+            position += len(gap)
+        compact_starts.append(position)
+        source_starts.append(region["start"])
+        pieces.append(samples[region["start"]:region["end"]])
+        position += region["end"] - region["start"]
+    return (np.concatenate(pieces).astype(np.float32, copy=False),
+            np.asarray(compact_starts), np.asarray(source_starts))
+
+
+def restore_turns(turns: List[Dict[str, Any]], compact_starts: np.ndarray, source_starts: np.ndarray,
+                  sample_rate: int) -> List[Dict[str, Any]]:
+    """Map turns on the speech-only timeline back to the source, split at every region boundary"""
+    lengths = np.diff(np.append(compact_starts, np.inf)) - int(VAD_GAP_SEC * sample_rate)
+    compact_ends = compact_starts + lengths
+    restored = []
+    for turn in turns:
+        start, end = turn["start"] * sample_rate, turn["end"] * sample_rate
+        first = max(int(np.searchsorted(compact_starts, start, side="right")) - 1, 0)
+        last = int(np.searchsorted(compact_starts, end, side="left"))
+        for i in range(first, last):
+            lo, hi = max(start, compact_starts[i]), min(end, compact_ends[i])
+            if hi > lo:
+                offset = source_starts[i] - compact_starts[i]
+                restored.append({**turn, "start": (lo + offset) / sample_rate, "end": (hi + offset) / sample_rate})
+    return restored
+
+
+def run_diarization(pipeline, samples: np.ndarray, sample_rate: int, settings: DiarizationSettings,
+                    num_speakers: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Diarize samples with the configured pipeline; returns (turns, timing report)"""
+    started = time.perf_counter()
+    report: Dict[str, Any] = {"audio_sec": len(samples) / sample_rate, "fast_vad": False}
+    compact = None
+    if settings.fast_vad:
+        compact = compact_speech(samples, sample_rate)
+        report["vad_sec"] = time.perf_counter() - started
+        if compact is not None:
+            report["fast_vad"] = True
+            samples = compact[0]
+    report["diarized_sec"] = len(samples) / sample_rate
+
+    kwargs = {}
+    num_speakers = num_speakers or settings.num_speakers
+    if num_speakers:
+        kwargs["num_speakers"] = num_speakers
+    timer = StageTimer()
+    diarization = pipeline({"waveform": torch.from_numpy(np.ascontiguousarray(samples)).unsqueeze(0),
+                            "sample_rate": sample_rate}, hook=timer, **kwargs)
+    report.update(timer.stages())
+
+    turns = [{"start": turn.start, "end": turn.end, "speaker": speaker}
+             for turn, _, speaker in diarization.itertracks(yield_label=True)]
+    if compact is not None:
+        turns = restore_turns(turns, compact[1], compact[2], sample_rate)
+    report["total_sec"] = time.perf_counter() - started
+    report["rtf"] = report["total_sec"] / report["audio_sec"] if report["audio_sec"] else None
+    logger.info("[Diarization] " + ", ".join(f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}"
+                                             for k, v in report.items()))
+    return turns, report
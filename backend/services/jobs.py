@@ -0,0 +1,203 @@
+import threading
+import time
+import uuid
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+STAGE_PENDING = "pending"
+STAGE_RUNNING = "running"
+STAGE_DONE = "done"
+
+ANALYSIS_STAGES = ["extract", "transcribe", "diarize", "assign", "segment"]
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when a client has asked for it to stop"""
+
+
+class JobQueueFull(Exception):
+    """Raised when admission control rejects a new job"""
+
+
+@dataclass
+class Job:
+    """A unit of background work with per-stage progress that clients can poll or stream"""
+    id: str
+    kind: str
+    stages: List[str]
+    status: str = QUEUED
+    stage_status: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    version: int = 0
+    future: Optional[Future] = field(default=None, repr=False)
+    _cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def __post_init__(self):
+        for stage in self.stages:
+            self.stage_status[stage] = {"status": STAGE_PENDING, "started_at": None, "finished_at": None}
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def report(self, stage: str, status: str = STAGE_RUNNING):
+        """Progress callback handed to the job function; also the cooperative cancellation point"""
+        if self._cancel_event.is_set():
+            raise JobCancelled(f"Job {self.id} was cancelled")
+
+        with self._lock:
+            entry = self.stage_status.setdefault(stage, {"status": STAGE_PENDING, "started_at": None, "finished_at": None})
+            entry["status"] = status
+            now = time.time()
+            if status == STAGE_RUNNING and entry["started_at"] is None:
+                entry["started_at"] = now
+            elif status == STAGE_DONE:
+                entry["finished_at"] = now
+            self.version += 1
+
+    def _transition(self, status: str, result: Any = None, error: Optional[str] = None):
+        with self._lock:
+            self.status = status
+            now = time.time()
+            if status == RUNNING:
+                self.started_at = now
+            if status in FINISHED_STATES:
+                self.finished_at = now
+                self.result = result
+                self.error = error
+            self.version += 1
+
+    @property
+    def progress(self) -> float:
+        if not self.stage_status:
+            return 1.0 if self.status == SUCCEEDED else 0.0
+        done = sum(1 for s in self.stage_status.values() if s["status"] == STAGE_DONE)
+        return done / len(self.stage_status)
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        with self._lock:
+            data = {
+                "job_id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "progress": round(self.progress, 3),
+                "stages": {name: dict(info) for name, info in self.stage_status.items()},
+                "error": self.error,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
+            if include_result and self.status == SUCCEEDED:
+                data["result"] = self.result
+            return data
+
+
+class JobManager:
+    """Bounded worker pool for heavy jobs with admission control, progress and cancellation"""
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 8, finished_ttl_sec: float = 3600.0):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.finished_ttl_sec = finished_ttl_sec
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def _active_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.status not in FINISHED_STATES)
+
+    def _prune_finished(self):
+        cutoff = time.time() - self.finished_ttl_sec
+        for job_id in [j.id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def submit(self, fn: Callable[..., Any], *args, kind: str = "job",
+               stages: Optional[List[str]] = None, **kwargs) -> Job:
+        """
+        Queue fn(*args, progress=job.report, **kwargs) on the worker pool.
+
+        Raises JobQueueFull when running plus queued jobs would exceed
+        max_workers + max_pending, so callers can answer 429 instead of piling up work.
+        """
+        with self._lock:
+            self._prune_finished()
+            if self._active_count() >= self.max_workers + self.max_pending:
+                raise JobQueueFull(
+                    f"Too many jobs in progress ({self.max_workers} running, {self.max_pending} queued)"
+                )
+            job = Job(id=uuid.uuid4().hex, kind=kind, stages=list(stages or []))
+            self._jobs[job.id] = job
+            job.future = self._executor.submit(self._run, job, fn, args, kwargs)
+            job.future.add_done_callback(self._on_future_done(job))
+        logger.info(f"[Jobs] Queued {kind} job {job.id}")
+        return job
+
+    def _run(self, job: Job, fn: Callable[..., Any], args, kwargs) -> Any:
+        if job.cancel_requested:
+            job._transition(CANCELLED)
+            return None
+
+        job._transition(RUNNING)
+        try:
+            result = fn(*args, progress=job.report, **kwargs)
+        except JobCancelled:
+            logger.info(f"[Jobs] Job {job.id} cancelled")
+            job._transition(CANCELLED)
+            return None
+        except Exception as e:
+            logger.error(f"[Jobs] Job {job.id} failed: {e}")
+            job._transition(FAILED, error=str(e))
+            raise
+
+        if isinstance(result, dict) and result.get("status") == "failed":
+            job._transition(FAILED, result=result, error=result.get("error"))
+        else:
+            job._transition(SUCCEEDED, result=result)
+        return result
+
+    @staticmethod
+    def _on_future_done(job: Job):
+        def callback(future: Future):
+            # A queued job cancelled through its future never reaches _run
+            if future.cancelled() and job.status not in FINISHED_STATES:
+                job._transition(CANCELLED)
+        return callback
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued job immediately, or ask a running one to stop at its next stage"""
+        job = self._jobs.get(job_id)
+        if job is None or job.status in FINISHED_STATES:
+            return job
+
+        job._cancel_event.set()
+        if job.future is not None:
+            job.future.cancel()
+        return job
+
+    def shutdown(self):
+        for job in list(self._jobs.values()):
+            self.cancel(job.id)
+        self._executor.shutdown(wait=False)
@@ -1,115 +1,192 @@
-import numpy as np
 import os
-import queue
-import sounddevice as sd
 import sys
 import threading
+import time
 import yaml
+import numpy as np
+import soundfile as sf
 
-from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Optional, Union
 from faster_whisper import WhisperModel
 
+try:
+    import sounddevice as sd
+except (ImportError, OSError):  # sounddevice (and PortAudio) is only needed for the local microphone
+    sd = None
 
-def process_transcription(
-    whisper: WhisperModel,
-    chunk: np.ndarray,
-    silence_threshold: float,
-    sample_rate: int
-) -> None:
+from services.ring_buffer import AudioRingBuffer, DROP_OLDEST
+from services.streaming_decoder import StreamingDecoder, TranscriptEvent, FINAL
+from services.vad_gate import FrameVAD, VADGate
+
+PCM_ENCODINGS = {"s16le": np.int16, "f32le": np.float32}
+
+
+def print_transcript_event(event: TranscriptEvent) -> None:
     """
-    Process a chunk of audio data and transcribe it using the Whisper model.
-    This function is run in a separate thread to allow for concurrent processing.
+    Default event handler for the standalone script: committed text on its own
+    line, the current partial hypothesis rewritten in place below it.
+    """
+    if event.kind == FINAL:
+        latency = f" ({event.latency_sec:.2f}s)" if event.latency_sec is not None else ""
+        sys.stdout.write(f"\r\033[KTranscript: {event.text}{latency}\n")
+    elif event.text:
+        sys.stdout.write(f"\r\033[K... {event.text}")
+    sys.stdout.flush()
 
-    Inputs:
-    - whisper: WhisperModel instance for transcription
-    - chunk: Audio data chunk to be transcribed (numpy array)
-    - silence_threshold: Threshold for silence detection
-    - sample_rate: Sample rate for audio recording
+def decode_pcm(data: bytes, encoding: str = "s16le") -> np.ndarray:
+    """Little-endian mono PCM bytes (s16le or f32le) to float32 samples in [-1, 1]"""
+    samples = np.frombuffer(data, dtype=np.dtype(PCM_ENCODINGS[encoding]).newbyteorder("<"))
+    if encoding == "s16le":
+        return samples.astype(np.float32) / 32768.0
+    return samples.astype(np.float32)
+
+@dataclass
+class LiveSettings:
+    """Live transcription settings shared by the standalone script and the WebSocket endpoint"""
+    sample_rate: int = 16000
+    channels: int = 1
+    queue_timeout: float = 1.0
+    # streaming decoder: a word is committed after two decodes agree, so latency is ~2 steps + decode time
+    step_sec: float = 1.0
+    max_window_sec: float = 15.0
+    beam_size: int = 5
+    # Fixed memory ceiling for audio waiting on transcription; always holds a full decode window
+    buffer_sec: float = 30.0
+    overflow_policy: str = DROP_OLDEST
+    vad: bool = True
+    vad_snr_db: float = 6.0
+    vad_hangover_ms: int = 300
+    vad_min_energy: float = 0.001
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "LiveSettings":
+        max_window_sec = config.get("live_max_window_seconds", 15.0)
+        return cls(
+            sample_rate=config.get("sample_rate", 16000),
+            channels=config.get("channels", 1),
+            queue_timeout=config.get("queue_timeout", 1.0),
+            step_sec=config.get("live_step_seconds", 1.0),
+            max_window_sec=max_window_sec,
+            beam_size=config.get("live_beam_size", 5),
+            buffer_sec=max(config.get("live_buffer_seconds", 30), 2 * max_window_sec),
+            overflow_policy=config.get("live_overflow_policy", DROP_OLDEST),
+            vad=config.get("live_vad", True),
+            vad_snr_db=config.get("live_vad_snr_db", 6.0),
+            vad_hangover_ms=config.get("live_vad_hangover_ms", 300),
+            vad_min_energy=config.get("silence_threshold", 0.001),  # minimum frame RMS counted as speech
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+class LiveModelPool:
     """
-    
-    if np.abs(chunk).mean() > silence_threshold:
-        # faster-whisper expects audio data as float32 numpy array
-        # Transcribe the audio chunk
-        segments, _ = whisper.transcribe(chunk, beam_size=5)
-        
-        # Combine all segments into a single transcript
-        transcript = " ".join([segment.text for segment in segments])
-        
-        if transcript.strip():
-            print(f"Transcript: {transcript}")
+    One Whisper model shared by many live sessions.
+
+    The model is loaded with num_workers replicas of its compute state, so up
+    to that many decodes run in parallel. A semaphore admits one decode per
+    replica. Extra sessions wait their turn instead of piling onto CTranslate2's
+    internal queue, and every decode runs to completion inside its slot.
+    """
+
+    def __init__(self, model: WhisperModel, workers: int = 1):
+        self.model = model
+        self.workers = max(int(workers), 1)
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._lock = threading.Lock()
+        self.decodes = 0
+        self.wait_sec = 0.0
+
+    @classmethod
+    def load(cls, model_size: str, device: str = "auto", compute_type: str = "int8", workers: int = 1):
+        print(f"Loading faster-whisper {model_size} model for {workers} live decode worker(s)...")
+        return cls(WhisperModel(model_size, device=device, compute_type=compute_type, num_workers=max(int(workers), 1)),
+                   workers)
+
+    def transcribe(self, audio: np.ndarray, **kwargs):
+        """model.transcribe() with the segments decoded eagerly inside a worker slot"""
+        started = time.perf_counter()
+        with self._slots:
+            waited = time.perf_counter() - started
+            segments, info = self.model.transcribe(audio, **kwargs)
+            # faster-whisper decodes lazily; finish while the slot is held
+            segments = list(segments)
+        with self._lock:
+            self.decodes += 1
+            self.wait_sec += waited
+        return segments, info
+
+    def stats(self) -> Dict[str, Any]:
+        return {"workers": self.workers, "decodes": self.decodes, "wait_sec": self.wait_sec}
 
 def process_audio(
-    whisper: WhisperModel,
-    audio_queue: queue.Queue,
+    whisper: Union[WhisperModel, LiveModelPool],
+    audio_buffer: AudioRingBuffer,
     stop_event: threading.Event,
-    max_workers: int,
     queue_timeout: float,
-    chunk_samples: int,
-    silence_threshold: float,
-    sample_rate: int
-) -> None:
+    step_duration: float,
+    max_window_duration: float,
+    sample_rate: int,
+    beam_size: int = 5,
+    on_event: Callable[[TranscriptEvent], None] = print_transcript_event,
+    vad_gate: Optional[VADGate] = None
+) -> StreamingDecoder:
     """
-    Process audio data from the queue and transcribe it using the Whisper model.
-    This function runs in a separate thread to allow for concurrent processing.
+    Transcribe audio from the ring buffer with a sliding-window streaming decoder.
+    This function runs in a separate thread. Each stream gets one decoder thread,
+    which keeps its results in order; sessions share the model only through a LiveModelPool.
 
     Inputs:
-    - whisper: WhisperModel instance for transcription
-    - audio_queue: Queue containing audio data chunks
+    - whisper: WhisperModel instance (or shared LiveModelPool) for transcription
+    - audio_buffer: Ring buffer the audio source writes samples into
     - stop_event: Event to signal when to stop processing
-    - max_workers: Number of parallel transcription workers
-    - queue_timeout: Timeout for queue operations
-    - chunk_samples: Number of samples in each audio chunk
-    - silence_threshold: Threshold for silence detection
+    - queue_timeout: How long to wait for new audio before re-checking stop_event
+    - step_duration: Seconds of new audio between decodes (trades latency for compute)
+    - max_window_duration: Longest window re-decoded before it is trimmed to committed text
     - sample_rate: Sample rate for audio recording
+    - beam_size: Beam size for each decode
+    - on_event: Receives in-order partial and final TranscriptEvents
+    - vad_gate: The gate feeding audio_buffer, if any. Its utterance ends commit pending
+      text, and its time map keeps event times on the original stream timeline
+
+    Returns the decoder, whose stats report decode time and commit latency.
     """
 
-    buffer = np.empty((0,), dtype=np.float32)
-    
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = []
-        
-        while not stop_event.is_set():
-            try:
-                audio_chunk = audio_queue.get(timeout=queue_timeout)
-                audio_chunk = audio_chunk.flatten()
-                buffer = np.concatenate([buffer, audio_chunk])
-
-                while len(buffer) >= chunk_samples:
-                    current_chunk = buffer[:chunk_samples]
-                    buffer = buffer[chunk_samples:]
-                    
-                    future = executor.submit(
-                        process_transcription,
-                        whisper,
-                        current_chunk,
-                        silence_threshold,
-                        sample_rate
-                    )
-                    futures = [f for f in futures if not f.done()] + [future]
-
-            except queue.Empty:
-                continue
-            
-        for future in futures:
-            future.result()
+    decoder = StreamingDecoder(
+        whisper,
+        sample_rate=sample_rate,
+        step_sec=step_duration,
+        max_window_sec=max_window_duration,
+        beam_size=beam_size,
+        on_event=on_event,
+        time_map=vad_gate.source_time if vad_gate is not None else None,
+        # The gate forwards hangover_ms of trailing silence; a quiet buffer after that means the utterance ended
+        idle_flush_sec=max(step_duration, queue_timeout) if vad_gate is not None else None,
+    )
+    decoder.run(audio_buffer, stop_event, poll_timeout=queue_timeout)
+    return decoder
 
 def record_audio(
-    audio_queue: queue.Queue,
+    audio_buffer: Union[AudioRingBuffer, VADGate],
     stop_event: threading.Event,
     sample_rate: int,
     channels: int
 ) -> None:
     """
-    Record audio from the microphone and put it into the audio queue.
+    Record audio from the microphone and write it into the ring buffer.
     This function runs in a separate thread to allow for concurrent processing.
 
     Inputs:
-    - audio_queue: Queue to store audio data chunks
+    - audio_buffer: Ring buffer (or the VAD gate in front of it) to store audio samples
     - stop_event: Event to signal when to stop recording
     - sample_rate: Sample rate for audio recording
     - channels: Number of audio channels (1 for mono)
     """
 
+    if sd is None:
+        raise RuntimeError("sounddevice is not available; install it (and PortAudio) to record from the microphone")
+
     def audio_callback(indata, frames, time, status):
         """
         Callback function for audio input stream. This function is called by the sounddevice library
@@ -119,7 +196,8 @@ def record_audio(
         if status:
             print(f"Status: {status}")
         if not stop_event.is_set():
-            audio_queue.put(indata.copy())
+            # Never block the audio callback; under backpressure a full buffer rejects the block
+            audio_buffer.write(indata.mean(axis=1) if channels > 1 else indata.flatten(), timeout=0)
 
     with sd.InputStream(
         samplerate=sample_rate,
@@ -129,25 +207,140 @@ def record_audio(
         print("Microphone stream initialized... (Press Ctrl+C to stop)")
         stop_event.wait()
 
+class MicrophoneSource:
+    """Live audio source for the local microphone (the standalone script's default)"""
+
+    def __init__(self, channels: int = 1):
+        self.channels = channels
+
+    def stream(self, sink: Union[AudioRingBuffer, VADGate], stop_event: threading.Event, sample_rate: int) -> None:
+        record_audio(sink, stop_event, sample_rate, self.channels)
+
+class WavFileSource:
+    """
+    Live audio source that plays a WAV file into the pipeline, for runs without a microphone.
+
+    realtime paces blocks at the file's own speed, like a live speaker. Otherwise
+    the file is written as fast as the buffer accepts it; each write waits for
+    room, so behind a backpressure buffer no audio is dropped. The file must
+    already be at the stream's sample rate; multichannel audio is downmixed to mono.
+    """
+
+    def __init__(self, path: str, block_sec: float = 0.1, realtime: bool = False):
+        self.path = path
+        self.block_sec = block_sec
+        self.realtime = realtime
+
+    def stream(self, sink: Union[AudioRingBuffer, VADGate], stop_event: threading.Event, sample_rate: int) -> None:
+        with sf.SoundFile(self.path) as f:
+            if f.samplerate != sample_rate:
+                raise ValueError(f"{self.path} is {f.samplerate} Hz; live transcription expects {sample_rate} Hz")
+            block = max(int(self.block_sec * sample_rate), 1)
+            started = time.monotonic()
+            sent = 0
+            for samples in f.blocks(blocksize=block, dtype="float32", always_2d=True):
+                if stop_event.is_set():
+                    break
+                if self.realtime:
+                    delay = started + sent / sample_rate - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                sink.write(samples.mean(axis=1), timeout=0 if self.realtime else None)
+                sent += len(samples)
+
+class LiveSession:
+    """
+    One live transcription stream: its ring buffer, optional VAD gate and decoder thread.
+
+    An audio source (or a network handler) calls write() from one thread.
+    The decoder thread delivers in-order TranscriptEvents to on_event, and
+    stop() commits what is left and returns the session stats. Several sessions
+    can share a single LiveModelPool.
+    """
+
+    def __init__(self, model: Union[WhisperModel, LiveModelPool], settings: LiveSettings,
+                 on_event: Callable[[TranscriptEvent], None] = print_transcript_event,
+                 overflow_policy: Optional[str] = None):
+        self.model = model
+        self.settings = settings
+        self.on_event = on_event
+        self.audio_buffer = AudioRingBuffer(int(settings.sample_rate * settings.buffer_sec),
+                                            overflow_policy or settings.overflow_policy)
+        self.stop_event = threading.Event()
+        self.decoder: Optional[StreamingDecoder] = None
+        self.started_at = time.monotonic()
+
+        # frame-level VAD in front of the buffer: non-speech never reaches the decoder
+        self.vad_gate = None
+        if settings.vad:
+            self.vad_gate = VADGate(
+                self.audio_buffer,
+                sample_rate=settings.sample_rate,
+                hangover_ms=settings.vad_hangover_ms,
+                vad=FrameVAD(snr_db=settings.vad_snr_db, min_energy=settings.vad_min_energy),
+            )
+        self._thread = threading.Thread(target=self._process, daemon=True)
+
+    @property
+    def sink(self) -> Union[AudioRingBuffer, VADGate]:
+        """Where audio for this session is written"""
+        return self.vad_gate or self.audio_buffer
+
+    def _process(self):
+        self.decoder = process_audio(
+            self.model,
+            self.audio_buffer,
+            self.stop_event,
+            self.settings.queue_timeout,
+            self.settings.step_sec,
+            self.settings.max_window_sec,
+            self.settings.sample_rate,
+            self.settings.beam_size,
+            self.on_event,
+            self.vad_gate
+        )
+
+    def start(self) -> "LiveSession":
+        self._thread.start()
+        return self
+
+    def write(self, samples: np.ndarray, timeout: Optional[float] = None) -> int:
+        return self.sink.write(samples, timeout=timeout)
+
+    @property
+    def text(self) -> str:
+        return self.decoder.text if self.decoder is not None else ""
+
+    def stop(self) -> Dict[str, Any]:
+        """Stop accepting audio, commit the pending text and return the session stats"""
+        self.stop_event.set()
+        self.audio_buffer.close()
+        if self._thread.is_alive():
+            self._thread.join()
+        return self.stats()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "duration_sec": time.monotonic() - self.started_at,
+            "buffer": self.audio_buffer.stats(),
+            "vad": self.vad_gate.stats() if self.vad_gate is not None else None,
+            "decoder": self.decoder.stats.to_dict() if self.decoder is not None else None,
+        }
+
 class LiveTranscriber:
-    def __init__(self):
+    def __init__(self, on_event: Callable[[TranscriptEvent], None] = print_transcript_event, source=None):
         # Load configuration if config file exists, otherwise use defaults
         config = {}
         if os.path.exists("config.yaml"):
             with open("config.yaml", "r") as f:
                 config = yaml.safe_load(f)
-        
-        # audio settings
-        self.sample_rate = config.get("sample_rate", 16000)
-        self.chunk_duration = config.get("chunk_duration", 4)
-        self.channels = config.get("channels", 1)
-        
-        # processing settings
-        self.max_workers = config.get("max_workers", 4)
-        self.silence_threshold = config.get("silence_threshold", 0.001)
-        self.queue_timeout = config.get("queue_timeout", 1.0)
-        self.chunk_samples = int(self.sample_rate * self.chunk_duration)
-        
+
+        # audio and processing settings
+        self.settings = LiveSettings.from_config(config)
+        self.on_event = on_event
+        # anything with stream(sink, stop_event, sample_rate): the microphone by default, or a WavFileSource
+        self.source = source or MicrophoneSource(self.settings.channels)
+
         # model settings
         self.model_size = config.get("model_size", "small")
         self.device = config.get("device", "cpu")  # can be "cpu", "cuda", or "auto"
@@ -156,48 +349,33 @@ class LiveTranscriber:
         # initialize the faster-whisper model
         print(f"Loading faster-whisper {self.model_size} model...")
         self.model = WhisperModel(
-            self.model_size, 
-            device=self.device, 
+            self.model_size,
+            device=self.device,
             compute_type=self.compute_type
         )
 
-        # initialize the audio queue and stop event
-        self.audio_queue = queue.Queue()
-        self.stop_event = threading.Event()
+        # ring buffer, VAD gate and decoder thread for this stream
+        self.session = LiveSession(self.model, self.settings, on_event=self.on_event)
 
     def run(self):
         """
         Run the live transcription.
         """
-        
+
         # launch the audio processing and recording threads
-        process_thread = threading.Thread(
-            target=process_audio, 
-            args=(
-                self.model,
-                self.audio_queue,
-                self.stop_event,
-                self.max_workers,
-                self.queue_timeout,
-                self.chunk_samples,
-                self.silence_threshold,
-                self.sample_rate
-            )
-        )
-        process_thread.start()
+        self.session.start()
 
         record_thread = threading.Thread(
-            target=record_audio, 
+            target=self.source.stream,
             args=(
-                self.audio_queue,
-                self.stop_event,
-                self.sample_rate,
-                self.channels
+                self.session.sink,
+                self.session.stop_event,
+                self.settings.sample_rate
             )
         )
         record_thread.start()
 
-        # wait for threads to finish
+        # wait for threads to finish (a file source ends on its own)
         try:
             while True:
                 record_thread.join(timeout=0.1)
@@ -206,11 +384,16 @@ class LiveTranscriber:
         except KeyboardInterrupt:
             print("\nStopping transcription...")
         finally:
-            self.stop_event.set()
+            # stopping closes the buffer first, which releases a source blocked on backpressure
+            stats = self.session.stop()
             record_thread.join()
-            process_thread.join()
-            print("Transcription stopped.")
+            print(f"Transcription stopped. Buffer stats: {stats['buffer']}")
+            if stats["vad"] is not None:
+                print(f"VAD stats: {stats['vad']}")
+            if stats["decoder"] is not None:
+                print(f"Decoder stats: {stats['decoder']}")
 
 if __name__ == "__main__":
-    transcriber = LiveTranscriber()
-    transcriber.run()
\ No newline at end of file
+    # python services/livetranscribe.py [file.wav] streams a recording instead of the microphone
+    transcriber = LiveTranscriber(source=WavFileSource(sys.argv[1], realtime=True) if len(sys.argv) > 1 else None)
+    transcriber.run()
@@ -0,0 +1,225 @@
+import os
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.audio_buffer import AudioBuffer, SAMPLE_RATE
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CHUNK_SEC = 120.0
+DEFAULT_OVERLAP_SEC = 1.0
+MIN_SILENCE_MS = 500
+
+
+@dataclass
+class Chunk:
+    """
+    One unit of parallel work.
+
+    [start, end) is the decoded window in samples, padded into the surrounding
+    silence or overlapping its neighbour. [own_start, own_end) in seconds is the
+    span whose words this chunk contributes to the stitched transcript.
+    """
+    index: int
+    start: int
+    end: int
+    own_start: float
+    own_end: float
+
+
+def _split_long_region(start: int, end: int, max_len: int, overlap: int) -> List[Tuple[int, int]]:
+    """Hard-split continuous speech into max_len pieces that overlap by `overlap` samples"""
+    pieces = []
+    step = max(max_len - overlap, 1)
+    while end - start > max_len:
+        pieces.append((start, start + max_len))
+        start += step
+    pieces.append((start, end))
+    return pieces
+
+
+def plan_chunks(speech: Sequence[Dict[str, int]], n_samples: int, sample_rate: int,
+                max_chunk_sec: float = DEFAULT_MAX_CHUNK_SEC,
+                overlap_sec: float = DEFAULT_OVERLAP_SEC) -> List[Chunk]:
+    """
+    Pack VAD speech regions ({"start", "end"} in samples) into chunks of at most max_chunk_sec.
+
+    Chunks are cut in the silence between regions where possible. Ownership
+    boundaries sit halfway between neighbouring chunks, so every instant of the
+    timeline belongs to exactly one chunk.
+    """
+    max_len = int(max_chunk_sec * sample_rate)
+    overlap = int(overlap_sec * sample_rate)
+
+    groups: List[Tuple[int, int]] = []
+    for region in sorted(speech, key=lambda r: r["start"]):
+        for start, end in _split_long_region(region["start"], region["end"], max_len, overlap):
+            if groups and end - groups[-1][0] <= max_len and start >= groups[-1][1]:
+                groups[-1] = (groups[-1][0], end)
+            else:
+                groups.append((start, end))
+
+    chunks = []
+    for i, (start, end) in enumerate(groups):
+        own_start = 0 if i == 0 else (groups[i - 1][1] + start) / 2
+        own_end = n_samples if i == len(groups) - 1 else (end + groups[i + 1][0]) / 2
+        chunks.append(Chunk(
+            index=i,
+            start=max(start - overlap, 0),
+            end=min(end + overlap, n_samples),
+            own_start=own_start / sample_rate,
+            own_end=own_end / sample_rate,
+        ))
+    return chunks
+
+
+def stitch_chunk(chunk: Chunk, segments: List[Dict]) -> List[Dict]:
+    """
+    Keep the words whose midpoint falls in the chunk's owned span.
+
+    Segments lose the words owned by a neighbour (their text is rebuilt from
+    the remaining words) and are dropped when none remain, so overlapping
+    windows never duplicate or reorder words.
+    """
+    stitched = []
+    for seg in segments:
+        words = seg.get("words") or []
+        if not words:
+            midpoint = (seg["start"] + seg["end"]) / 2
+            if chunk.own_start <= midpoint < chunk.own_end:
+                stitched.append(seg)
+            continue
+
+        kept = [w for w in words if chunk.own_start <= (w["start"] + w["end"]) / 2 < chunk.own_end]
+        if not kept:
+            continue
+        if len(kept) != len(words):
+            seg = dict(seg, start=kept[0]["start"], end=kept[-1]["end"],
+                       text="".join(w["word"] for w in kept))
+        seg["words"] = kept
+        stitched.append(seg)
+    return stitched
+
+
+# ---- worker process side -------------------------------------------------
+
+_worker_model = None
+
+
+def _init_worker(model_size: str, compute_type: str, cpu_threads: int):
+    """Each worker owns one CTranslate2 model with its own intra-op thread budget"""
+    global _worker_model
+    from faster_whisper import WhisperModel
+    _worker_model = WhisperModel(model_size, device="cpu", compute_type=compute_type,
+                                 cpu_threads=cpu_threads, num_workers=1)
+
+
+def _chunk_samples(audio_ref, start: int, end: int) -> np.ndarray:
+    # Memory-mapped sessions pass the file path so workers read their window without pickling it
+    if isinstance(audio_ref, str):
+        return np.array(np.memmap(audio_ref, dtype=np.float32, mode="r")[start:end])
+    return audio_ref
+
+
+def _transcribe_chunk(audio_ref, start: int, end: int, sample_rate: int, beam_size: int) -> List[Dict]:
+    samples = _chunk_samples(audio_ref, start, end)
+    offset = start / sample_rate
+    segments, _ = _worker_model.transcribe(samples, beam_size=beam_size, word_timestamps=True,
+                                           condition_on_previous_text=False)
+    result = []
+    for segment in segments:
+        result.append({
+            "start": segment.start + offset,
+            "end": segment.end + offset,
+            "text": segment.text,
+            "words": [
+                {"start": w.start + offset, "end": w.end + offset, "word": w.word}
+                for w in (segment.words or [])
+            ],
+        })
+    return result
+
+
+# ---- parent process side -------------------------------------------------
+
+class LongformTranscriber:
+    """
+    Transcribes long audio by VAD-chunking it across a pool of worker processes.
+
+    The pool (and the model in each worker) is created on first use and kept
+    for later requests. Spawned processes are used so CTranslate2 and torch
+    state from the server process never leaks into workers.
+    """
+
+    def __init__(self, model_size: str, workers: int, threads_per_worker: int = 0,
+                 compute_type: str = "default", beam_size: int = 5,
+                 max_chunk_sec: float = DEFAULT_MAX_CHUNK_SEC, overlap_sec: float = DEFAULT_OVERLAP_SEC):
+        self.model_size = model_size
+        self.workers = workers
+        # 0 splits the machine's cores evenly across workers
+        self.threads_per_worker = threads_per_worker or max((os.cpu_count() or 1) // workers, 1)
+        self.compute_type = compute_type
+        self.beam_size = beam_size
+        self.max_chunk_sec = max_chunk_sec
+        self.overlap_sec = overlap_sec
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                logger.info(f"[Longform] Starting {self.workers} workers x {self.threads_per_worker} threads "
+                            f"({self.model_size}, {self.compute_type})")
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.model_size, self.compute_type, self.threads_per_worker),
+                )
+            return self._pool
+
+    def warm(self):
+        """Start every worker and load its model; each submit spawns a process until the pool is full"""
+        silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+        pool = self._get_pool()
+        futures = [pool.submit(_transcribe_chunk, silence, 0, len(silence), SAMPLE_RATE, 1)
+                   for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def plan(self, audio: AudioBuffer) -> List[Chunk]:
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
+        speech = get_speech_timestamps(np.asarray(audio.samples),
+                                       VadOptions(min_silence_duration_ms=MIN_SILENCE_MS))
+        return plan_chunks(speech, len(audio.samples), audio.sample_rate, self.max_chunk_sec, self.overlap_sec)
+
+    def iter_transcribe(self, audio: AudioBuffer) -> Iterator[Dict]:
+        """Yield stitched segments in timeline order as each chunk (in order) finishes"""
+        chunks = self.plan(audio)
+        logger.info(f"[Longform] {audio.duration_sec:.0f}s of audio in {len(chunks)} chunks")
+        pool = self._get_pool()
+        futures = []
+        for chunk in chunks:
+            audio_ref = audio.path if audio.memory_mapped else np.array(audio.samples[chunk.start:chunk.end])
+            futures.append(pool.submit(_transcribe_chunk, audio_ref, chunk.start, chunk.end,
+                                       audio.sample_rate, self.beam_size))
+        try:
+            for chunk, future in zip(chunks, futures):
+                yield from stitch_chunk(chunk, future.result())
+        finally:
+            # A cancelled analysis should not keep the pool busy with its remaining chunks
+            for future in futures:
+                future.cancel()
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
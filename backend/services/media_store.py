@@ -0,0 +1,156 @@
+import os
+import uuid
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Optional
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Fixed-size read/write unit; peak memory per upload stays at one chunk regardless of file size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class StoredMedia:
+    """A media file stored under the hash of its bytes"""
+    path: str
+    sha256: str
+    size_bytes: int
+    already_stored: bool = False
+
+
+def hash_file(path: str, chunk_size: int = UPLOAD_CHUNK_SIZE) -> str:
+    """SHA-256 of a file on disk, read in fixed-size chunks"""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class MediaStore:
+    """Content-addressed storage for uploaded videos, written in a single streaming pass"""
+
+    def __init__(self, root_dir: str, max_size_bytes: Optional[int] = None):
+        self.root_dir = root_dir
+        self.incoming_dir = os.path.join(root_dir, ".incoming")
+        self.max_size_bytes = max_size_bytes
+        # Reference counts of files jobs and workspaces still read; eviction skips them
+        self._pins: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.incoming_dir, exist_ok=True)
+
+    def path_for(self, sha256: str, suffix: str) -> str:
+        return os.path.join(self.root_dir, sha256[:2], f"{sha256}{suffix}")
+
+    async def ingest_stream(self, chunks: AsyncIterator[bytes], suffix: str) -> StoredMedia:
+        """
+        Write an async byte stream to the store, hashing it on the fly.
+
+        Data lands in a temp file inside the store and is renamed into place once the
+        hash is known, so the bytes are written exactly once and never held in memory.
+        The stored file comes back pinned: the caller owns one release() of its path.
+        """
+        hasher = hashlib.sha256()
+        size = 0
+        incoming_path = os.path.join(self.incoming_dir, f"{uuid.uuid4().hex}{suffix}")
+        try:
+            with open(incoming_path, "wb") as f:
+                async for chunk in chunks:
+                    hasher.update(chunk)
+                    size += len(chunk)
+                    await run_in_threadpool(f.write, chunk)
+
+            sha256 = hasher.hexdigest()
+            final_path = self.path_for(sha256, suffix)
+            already_stored = await run_in_threadpool(self._place, incoming_path, final_path)
+        except BaseException:
+            if os.path.exists(incoming_path):
+                os.remove(incoming_path)
+            raise
+
+        logger.info(f"[MediaStore] Stored {size / (1024 * 1024):.1f} MB as {final_path}"
+                    f"{' (already present)' if already_stored else ''}")
+        await run_in_threadpool(self.evict)
+        return StoredMedia(path=final_path, sha256=sha256, size_bytes=size, already_stored=already_stored)
+
+    def _place(self, incoming_path: str, final_path: str) -> bool:
+        """Move an ingested file into place and pin it, atomically with respect to evict(); True if it was already stored"""
+        with self._lock:
+            if os.path.exists(final_path):
+                # Same bytes were uploaded before; keep the existing file
+                os.remove(incoming_path)
+                os.utime(final_path)
+                already_stored = True
+            else:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.replace(incoming_path, final_path)
+                already_stored = False
+            path = os.path.abspath(final_path)
+            self._pins[path] = self._pins.get(path, 0) + 1
+        return already_stored
+
+    async def ingest_upload(self, upload: UploadFile) -> StoredMedia:
+        """Stream a FastAPI upload into the store in UPLOAD_CHUNK_SIZE pieces"""
+        suffix = os.path.splitext(upload.filename or "")[1].lower() or ".mp4"
+
+        async def chunks():
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+        return await self.ingest_stream(chunks(), suffix)
+
+    def pin(self, path: str):
+        """Keep a stored file from being evicted until the matching release()"""
+        path = os.path.abspath(path)
+        with self._lock:
+            self._pins[path] = self._pins.get(path, 0) + 1
+
+    def release(self, path: str):
+        path = os.path.abspath(path)
+        with self._lock:
+            count = self._pins.get(path, 0) - 1
+            if count > 0:
+                self._pins[path] = count
+            else:
+                self._pins.pop(path, None)
+
+    def evict(self):
+        """
+        Remove least recently used media until the store fits in max_size_bytes; pinned files are kept.
+
+        Blocking (directory scans and unlinks), so async callers run it in a thread.
+        The scan and removals hold the store lock, so a file can't be placed or pinned mid-eviction.
+        """
+        if not self.max_size_bytes:
+            return
+
+        with self._lock:
+            entries = []
+            for shard in os.listdir(self.root_dir):
+                shard_dir = os.path.join(self.root_dir, shard)
+                if shard_dir == self.incoming_dir or not os.path.isdir(shard_dir):
+                    continue
+                for name in os.listdir(shard_dir):
+                    path = os.path.join(shard_dir, name)
+                    stat = os.stat(path)
+                    entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_size_bytes:
+                    break
+                if os.path.abspath(path) in self._pins:
+                    continue
+                os.remove(path)
+                total -= size
+                logger.info(f"[MediaStore] Evicted {path}")
@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import torch
+
+try:
+    import psutil
+except ImportError:  # psutil is optional; fall back to /proc on Linux
+    psutil = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def get_process_rss_mb() -> Optional[float]:
+    """Return the resident set size of this process in MB, if it can be measured"""
+    if psutil is not None:
+        return psutil.Process(os.getpid()).memory_info().rss / (1024 * 1024)
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _get_gpu_allocated_mb() -> Optional[float]:
+    if torch.cuda.is_available():
+        return torch.cuda.memory_allocated() / (1024 * 1024)
+    return None
+
+
+@dataclass
+class ModelStats:
+    """Load metrics recorded for a single registered model"""
+    name: str
+    loaded: bool = False
+    load_time_sec: Optional[float] = None
+    rss_mb: Optional[float] = None
+    gpu_mb: Optional[float] = None
+    loaded_at: Optional[float] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class _ModelEntry:
+    loader: Callable[[], Any]
+    thread_safe: bool
+    load_lock: threading.Lock
+    use_lock: threading.RLock
+    stats: ModelStats
+    model: Any = None
+
+
+class ModelRegistry:
+    """Process-wide registry that loads each heavy model once and shares it across requests"""
+
+    def __init__(self):
+        self._entries: Dict[str, _ModelEntry] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any], thread_safe: bool = False):
+        """Register a loader for a model. Loading is deferred until first use or warm()."""
+        with self._lock:
+            if name in self._entries:
+                return
+            self._entries[name] = _ModelEntry(
+                loader=loader,
+                thread_safe=thread_safe,
+                load_lock=threading.Lock(),
+                use_lock=threading.RLock(),
+                stats=ModelStats(name=name),
+            )
+
+    def _entry(self, name: str) -> _ModelEntry:
+        try:
+            return self._entries[name]
+        except KeyError:
+            raise KeyError(f"Model '{name}' is not registered. Registered models: {list(self._entries)}")
+
+    def get(self, name: str) -> Any:
+        """Return the shared model instance, loading it on first access"""
+        entry = self._entry(name)
+        if entry.model is not None:
+            return entry.model
+
+        with entry.load_lock:
+            # Another thread may have finished loading while we waited
+            if entry.model is not None:
+                return entry.model
+
+            logger.info(f"[Registry] Loading model '{name}'...")
+            rss_before = get_process_rss_mb()
+            gpu_before = _get_gpu_allocated_mb()
+            started = time.perf_counter()
+            try:
+                model = entry.loader()
+            except Exception as e:
+                entry.stats.error = str(e)
+                logger.error(f"[Registry] Failed to load model '{name}': {e}")
+                raise
+
+            rss_after = get_process_rss_mb()
+            gpu_after = _get_gpu_allocated_mb()
+            entry.stats.loaded = True
+            entry.stats.error = None
+            entry.stats.load_time_sec = time.perf_counter() - started
+            entry.stats.loaded_at = time.time()
+            if rss_before is not None and rss_after is not None:
+                entry.stats.rss_mb = max(rss_after - rss_before, 0.0)
+            if gpu_before is not None and gpu_after is not None:
+                entry.stats.gpu_mb = max(gpu_after - gpu_before, 0.0)
+            entry.model = model
+
+            logger.info(
+                f"[Registry] Model '{name}' loaded in {entry.stats.load_time_sec:.2f}s "
+                f"(rss +{entry.stats.rss_mb or 0:.1f} MB)"
+            )
+            return model
+
+    @contextmanager
+    def use(self, name: str):
+        """Yield the shared model, serializing access for models that are not thread safe"""
+        entry = self._entry(name)
+        model = self.get(name)
+        if entry.thread_safe:
+            yield model
+        else:
+            with entry.use_lock:
+                yield model
+
+    def warm(self, names: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Load the given (or all) registered models, logging failures instead of raising"""
+        for name in list(names if names is not None else self._entries):
+            try:
+                self.get(name)
+            except Exception:
+                # Already recorded in stats; a missing optional model should not block startup
+                continue
+        return self.stats()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return load time and memory footprint for every registered model"""
+        return {name: asdict(entry.stats) for name, entry in self._entries.items()}
+
+
+model_registry = ModelRegistry()
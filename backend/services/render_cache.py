@@ -0,0 +1,63 @@
+import os
+import json
+import uuid
+import hashlib
+import logging
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def hash_speaker_sample(path: str) -> str:
+    """SHA-256 of a speaker reference WAV; a new reference clip invalidates its renders"""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def make_render_key(speaker_sample_hash: str, text: str, language: str, model_version: str) -> str:
+    payload = json.dumps([speaker_sample_hash, text, language, model_version])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """
+    Directory of synthesized clips keyed by (speaker sample, text, language, model version).
+
+    Clips are kept as raw float32 samples in .npz files, so a hit is a single
+    read with no audio decoding.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def get(self, key: str) -> Optional[Tuple[np.ndarray, int]]:
+        """Return (samples, sample_rate) for a cached clip, or None"""
+        path = self.path_for(key)
+        if os.path.exists(path):
+            with np.load(path) as data:
+                clip = data["samples"], int(data["sample_rate"])
+            self.hits += 1
+            return clip
+        self.misses += 1
+        return None
+
+    def put(self, key: str, samples: np.ndarray, sample_rate: int):
+        staging_path = os.path.join(self.cache_dir, f".render-{uuid.uuid4().hex}.npz")
+        with open(staging_path, "wb") as f:
+            np.savez(f, samples=samples.astype(np.float32, copy=False), sample_rate=sample_rate)
+        os.replace(staging_path, self.path_for(key))
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+import numpy as np
+
+DROP_OLDEST = "drop_oldest"    # a slow consumer loses the oldest unread audio
+BACKPRESSURE = "backpressure"  # a fast producer waits for space (or gives up after its timeout)
+OVERFLOW_POLICIES = (DROP_OLDEST, BACKPRESSURE)
+ARRIVAL_HISTORY = 4096  # recent (write position, time) marks kept for latency measurement
+
+
+class AudioRingBuffer:
+    """
+    Fixed-size float32 sample FIFO between an audio producer and a transcription consumer.
+
+    Storage is allocated once. Every sample is written twice, at slot i and
+    i + capacity, so any run of up to `capacity` unread samples is contiguous.
+    read() then returns a view instead of copying, even across the wrap point.
+    Memory never exceeds 2 * capacity samples, whatever the backlog.
+
+    Intended for one producer thread and one consumer thread. The lock only
+    guards the index bookkeeping and the short copies into the buffer.
+    """
+
+    def __init__(self, capacity: int, policy: str = DROP_OLDEST):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{policy}'. Expected one of {OVERFLOW_POLICIES}")
+        self.capacity = capacity
+        self.policy = policy
+        self._data = np.zeros(2 * capacity, dtype=np.float32)
+        self._read = 0   # total samples consumed
+        self._write = 0  # total samples written
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self.dropped_samples = 0   # discarded by drop_oldest when the consumer fell behind
+        self.rejected_samples = 0  # refused under backpressure after the producer's timeout
+        self.high_water = 0        # largest backlog seen, in samples
+        self._arrivals = deque(maxlen=ARRIVAL_HISTORY)
+
+    def __len__(self) -> int:
+        return self._write - self._read
+
+    @property
+    def free(self) -> int:
+        return self.capacity - len(self)
+
+    @property
+    def read_position(self) -> int:
+        """Stream index of the oldest unread sample"""
+        return self._read
+
+    @property
+    def write_position(self) -> int:
+        """Stream index one past the newest sample"""
+        return self._write
+
+    def arrival_time(self, position: int) -> Optional[float]:
+        """time.monotonic() at which the sample at stream index `position` was written, if still tracked"""
+        with self._cond:
+            for written_until, arrived in self._arrivals:
+                if written_until > position:
+                    return arrived
+        return None
+
+    def _copy_in(self, samples: np.ndarray):
+        start = self._write % self.capacity
+        first = min(len(samples), self.capacity - start)
+        # Primary copy at [start, start + n) and mirror copy half a buffer away
+        self._data[start:start + first] = samples[:first]
+        self._data[start + self.capacity:start + self.capacity + first] = samples[:first]
+        rest = samples[first:]
+        if len(rest):
+            self._data[:len(rest)] = rest
+            self._data[self.capacity:self.capacity + len(rest)] = rest
+        self._write += len(samples)
+        self._arrivals.append((self._write, time.monotonic()))
+        self.high_water = max(self.high_water, len(self))
+
+    def write(self, samples: np.ndarray, timeout: Optional[float] = None) -> int:
+        """
+        Append samples and return how many were accepted.
+
+        drop_oldest always accepts everything, advancing past unread audio as
+        needed. backpressure waits up to `timeout` seconds (forever if None) for
+        the consumer to make room, then rejects whatever still doesn't fit.
+        """
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        if len(samples) > self.capacity:
+            if self.policy == DROP_OLDEST:
+                with self._cond:
+                    self.dropped_samples += len(samples) - self.capacity
+                samples = samples[-self.capacity:]
+
+        with self._cond:
+            if self._closed:
+                self.rejected_samples += len(samples)
+                return 0
+            if self.policy == DROP_OLDEST:
+                overflow = len(samples) - self.free
+                if overflow > 0:
+                    self._read += overflow
+                    self.dropped_samples += overflow
+                self._copy_in(samples)
+                self._cond.notify_all()
+                return len(samples)
+
+            deadline = None if timeout is None else time.monotonic() + timeout
+            accepted = 0
+            while accepted < len(samples) and not self._closed:
+                if self.free == 0:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                    continue
+                n = min(self.free, len(samples) - accepted)
+                self._copy_in(samples[accepted:accepted + n])
+                accepted += n
+                self._cond.notify_all()
+            self.rejected_samples += len(samples) - accepted
+            return accepted
+
+    def read(self, n: int, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """
+        Wait until n samples are unread and return a zero-copy view of the oldest n.
+
+        The samples stay unread until consume(). The view is only stable until
+        then, because afterwards (or under drop_oldest pressure) the producer
+        may reuse those slots. Copy it before handing it to another thread.
+        Returns None on timeout, or when the buffer is closed with fewer than n samples left.
+        """
+        if n > self.capacity:
+            raise ValueError(f"Cannot read {n} samples from a ring buffer of {self.capacity}")
+        with self._cond:
+            if not self._cond.wait_for(lambda: len(self) >= n or self._closed, timeout):
+                return None
+            if len(self) < n:
+                return None
+            start = self._read % self.capacity
+            return self._data[start:start + n]
+
+    def consume(self, n: int):
+        """Mark the oldest n samples as read, freeing their slots"""
+        with self._cond:
+            self._read += min(n, len(self))
+            self._cond.notify_all()
+
+    def drain(self) -> np.ndarray:
+        """Copy out and consume everything unread (used to flush the tail on shutdown)"""
+        with self._cond:
+            start = self._read % self.capacity
+            tail = self._data[start:start + len(self)].copy()
+            self._read = self._write
+            self._cond.notify_all()
+            return tail
+
+    def close(self):
+        """Wake blocked readers and writers; later writes are rejected"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "capacity": self.capacity,
+            "buffered": len(self),
+            "high_water": self.high_water,
+            "written": self._write,
+            "dropped": self.dropped_samples,
+            "rejected": self.rejected_samples,
+        }
@@ -0,0 +1,162 @@
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+
+from services.turn_index import TurnIndex
+
+# Queries are scored in blocks so memory stays bounded on very long transcripts
+QUERY_BLOCK_SIZE = 262144
+# Overlaps are computed from prefix sums, so differences below this (in seconds)
+# are rounding noise: such scores count as ties and resolve to the first label
+OVERLAP_TOLERANCE = 1e-6
+
+
+class SpeakerIntervalIndex:
+    """
+    Sorted-interval index over diarization turns for bulk speaker assignment.
+
+    For every speaker the turn starts and ends are sorted independently and
+    prefix-summed. The total overlap of a query interval [s, e] with all turns
+    of a speaker is then F(e) - F(s), where F(x) is the (multiplicity-counted)
+    speech time of that speaker before x, so each query costs a handful of
+    binary searches per speaker instead of a scan over every turn.
+    """
+
+    def __init__(self, starts: Sequence[float], ends: Sequence[float], speakers: Sequence[str]):
+        starts = np.asarray(starts, dtype=np.float64)
+        ends = np.asarray(ends, dtype=np.float64)
+        speakers = np.asarray(speakers)
+
+        # Sorted labels keep tie-breaking identical to pandas groupby ordering
+        if len(speakers):
+            self.labels, codes = np.unique(speakers, return_inverse=True)
+        else:
+            self.labels, codes = np.array([], dtype=object), np.array([], dtype=np.int64)
+        self._build(starts, ends, codes)
+
+    def _build(self, starts: np.ndarray, ends: np.ndarray, codes: np.ndarray):
+        self._sorted_starts: List[np.ndarray] = []
+        self._sorted_ends: List[np.ndarray] = []
+        self._start_prefix: List[np.ndarray] = []
+        self._end_prefix: List[np.ndarray] = []
+
+        for code in range(len(self.labels)):
+            mask = codes == code
+            spk_starts = np.sort(starts[mask])
+            spk_ends = np.sort(ends[mask])
+            self._sorted_starts.append(spk_starts)
+            self._sorted_ends.append(spk_ends)
+            self._start_prefix.append(np.concatenate(([0.0], np.cumsum(spk_starts))))
+            self._end_prefix.append(np.concatenate(([0.0], np.cumsum(spk_ends))))
+
+    @classmethod
+    def from_dataframe(cls, diarize_df) -> "SpeakerIntervalIndex":
+        if diarize_df is None or len(diarize_df) == 0:
+            return cls([], [], [])
+        return cls(diarize_df["start"].to_numpy(), diarize_df["end"].to_numpy(), diarize_df["speaker"].to_numpy())
+
+    @classmethod
+    def from_turn_index(cls, turns: TurnIndex) -> "SpeakerIntervalIndex":
+        """Reuse the index's sorted labels and speaker codes instead of re-encoding label strings"""
+        index = cls.__new__(cls)
+        index.labels = np.asarray(turns.labels, dtype=object)
+        index._build(turns.start, turns.end, turns.speaker)
+        return index
+
+    @classmethod
+    def from_turns(cls, turns) -> "SpeakerIntervalIndex":
+        """From a TurnIndex or a (start, end, speaker) DataFrame"""
+        if isinstance(turns, TurnIndex):
+            return cls.from_turn_index(turns)
+        return cls.from_dataframe(turns)
+
+    def _speech_before(self, code: int, x: np.ndarray) -> np.ndarray:
+        """Total speech time of a speaker strictly before each x, counting overlapping turns twice"""
+        starts, ends = self._sorted_starts[code], self._sorted_ends[code]
+        n_started = np.searchsorted(starts, x, side="left")
+        n_ended = np.searchsorted(ends, x, side="left")
+        started = n_started * x - self._start_prefix[code][n_started]
+        ended = n_ended * x - self._end_prefix[code][n_ended]
+        return started - ended
+
+    def _signed_overlap(self, code: int, q_start: np.ndarray, q_end: np.ndarray) -> np.ndarray:
+        """Sum over turns of min(end, q_end) - max(start, q_start), negative gaps included"""
+        starts, ends = self._sorted_starts[code], self._sorted_ends[code]
+        n_turns = len(starts)
+
+        # sum(min(end_k, e)) = sum of ends below e + e * (number of ends >= e)
+        n_ends_below = np.searchsorted(ends, q_end, side="left")
+        sum_min_end = self._end_prefix[code][n_ends_below] + q_end * (n_turns - n_ends_below)
+
+        # sum(max(start_k, s)) = sum of starts above s + s * (number of starts <= s)
+        n_starts_at_or_below = np.searchsorted(starts, q_start, side="right")
+        sum_max_start = (self._start_prefix[code][-1] - self._start_prefix[code][n_starts_at_or_below]) \
+            + q_start * n_starts_at_or_below
+
+        return sum_min_end - sum_max_start
+
+    def overlap_scores(self, q_start: np.ndarray, q_end: np.ndarray, fill_nearest: bool = False) -> np.ndarray:
+        """Return a (n_speakers, n_queries) matrix of per-speaker overlap scores"""
+        q_start = np.asarray(q_start, dtype=np.float64)
+        q_end = np.asarray(q_end, dtype=np.float64)
+        scores = np.empty((len(self.labels), len(q_start)), dtype=np.float64)
+        for code in range(len(self.labels)):
+            if fill_nearest:
+                scores[code] = self._signed_overlap(code, q_start, q_end)
+            else:
+                scores[code] = self._speech_before(code, q_end) - self._speech_before(code, q_start)
+        return scores
+
+    def assign(self, q_start: Sequence[float], q_end: Sequence[float], fill_nearest: bool = False) -> np.ndarray:
+        """
+        Return the speaker code for every query interval, or -1 when no speaker applies.
+
+        Without fill_nearest only turns with a positive intersection count, so a query
+        that touches no turn stays unassigned. With fill_nearest every turn contributes
+        its (possibly negative) intersection, matching the original pandas behaviour.
+        """
+        q_start = np.asarray(q_start, dtype=np.float64)
+        q_end = np.asarray(q_end, dtype=np.float64)
+        result = np.full(len(q_start), -1, dtype=np.int64)
+        if len(self.labels) == 0 or len(q_start) == 0:
+            return result
+
+        for lo in range(0, len(q_start), QUERY_BLOCK_SIZE):
+            hi = min(lo + QUERY_BLOCK_SIZE, len(q_start))
+            scores = self.overlap_scores(q_start[lo:hi], q_end[lo:hi], fill_nearest)
+            best_score = scores.max(axis=0)
+            best = np.argmax(scores >= best_score - OVERLAP_TOLERANCE, axis=0)
+            if fill_nearest:
+                result[lo:hi] = best
+            else:
+                result[lo:hi] = np.where(best_score > OVERLAP_TOLERANCE, best, -1)
+        return result
+
+
+def _flatten_transcript(transcript_result: Dict) -> Tuple[List[Dict], np.ndarray, np.ndarray]:
+    """Collect every segment and word dict with its interval, in transcript order"""
+    items = []
+    for seg in transcript_result["segments"]:
+        items.append(seg)
+        items.extend(seg["words"])
+
+    starts = np.fromiter((item["start"] for item in items), dtype=np.float64, count=len(items))
+    ends = np.fromiter((item["end"] for item in items), dtype=np.float64, count=len(items))
+    return items, starts, ends
+
+
+def label_transcript(index: SpeakerIntervalIndex, transcript_result: Dict, fill_nearest: bool = False) -> Dict:
+    """Write speaker labels from an existing index into every segment and word of a transcript"""
+    items, starts, ends = _flatten_transcript(transcript_result)
+    codes = index.assign(starts, ends, fill_nearest=fill_nearest)
+
+    labels = index.labels.tolist()
+    for item, code in zip(items, codes.tolist()):
+        if code >= 0:
+            item["speaker"] = labels[code]
+    return transcript_result
+
+
+def assign_speakers_vectorized(turns, transcript_result: Dict, fill_nearest: bool = False) -> Dict:
+    """Assign a speaker to every segment and word in a single vectorized pass"""
+    index = SpeakerIntervalIndex.from_turns(turns)
+    return label_transcript(index, transcript_result, fill_nearest=fill_nearest)
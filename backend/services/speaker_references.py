@@ -0,0 +1,182 @@
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import soundfile as sf
+
+from services.audio_buffer import AudioBuffer, MappedWav
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+Interval = Tuple[float, float]
+
+
+@dataclass(frozen=True)
+class ReferenceClipPolicy:
+    """
+    Length and quality rules for the per-speaker xTTS reference clips.
+
+    A clip holds at most max_sec of a speaker's cleanest speech. xTTS crops
+    its conditioning audio to max_ref_len (30 s by default), so a longer clip
+    only costs disk and decode time. Audio within overlap_margin_sec of
+    another speaker's turn and clean stretches shorter than min_turn_sec are
+    left out, unless the speaker would otherwise end up under min_sec.
+    """
+    min_sec: float = 6.0
+    max_sec: float = 30.0
+    min_turn_sec: float = 1.0
+    overlap_margin_sec: float = 0.2
+    gap_sec: float = 0.1  # silence between the stretches joined into one clip
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "ReferenceClipPolicy":
+        return cls(
+            min_sec=config.get("speaker_reference_min_seconds", cls.min_sec),
+            max_sec=config.get("speaker_reference_max_seconds", cls.max_sec),
+            min_turn_sec=config.get("speaker_reference_min_turn_seconds", cls.min_turn_sec),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class ReferenceClip:
+    """Where a speaker's reference clip was written and how much of their speech it holds"""
+    speaker_id: str
+    path: str
+    duration_sec: float
+    clean_sec: float        # clean speech the speaker had to choose from
+    ranges: List[Interval]  # source seconds joined into the clip, in time order
+    below_min: bool = False
+
+
+def _merge(intervals: Sequence[Interval], margin: float = 0.0) -> List[Interval]:
+    """Sorted union of intervals, each widened by margin on both sides"""
+    merged: List[List[float]] = []
+    for start, end in sorted(i for i in intervals if i[1] > i[0]):
+        start, end = start - margin, end + margin
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def _subtract(intervals: List[Interval], holes: List[Interval]) -> List[Interval]:
+    """Parts of sorted, disjoint intervals not covered by sorted, disjoint holes (one linear sweep)"""
+    pieces = []
+    h = 0
+    for start, end in intervals:
+        while h < len(holes) and holes[h][1] <= start:
+            h += 1
+        cursor = start
+        k = h
+        while k < len(holes) and holes[k][0] < end:
+            if holes[k][0] > cursor:
+                pieces.append((cursor, holes[k][0]))
+            cursor = max(cursor, holes[k][1])
+            k += 1
+        if cursor < end:
+            pieces.append((cursor, end))
+    return pieces
+
+
+def _take(ranked: List[Interval], budget: float, min_piece: float) -> List[Interval]:
+    """Greedily fill budget seconds from ranked stretches, cutting the last one short"""
+    chosen = []
+    for start, end in ranked:
+        if budget < min_piece and chosen:
+            break
+        length = min(end - start, budget)
+        chosen.append((start, start + length))
+        budget -= length
+    return chosen
+
+
+def select_reference_ranges(turns: Dict[str, List[Interval]],
+                            policy: ReferenceClipPolicy) -> Dict[str, Tuple[List[Interval], float]]:
+    """
+    Pick each speaker's best stretches: (ranges in time order, clean seconds available).
+
+    Stretches are ranked by length: a long uninterrupted turn carries the
+    steadiest voice for cloning. When the speaker has less than min_sec of
+    clean audio, shorter stretches are admitted, and after them overlapped
+    turns, so every speaker still gets a reference.
+    """
+    merged = {speaker: _merge(intervals) for speaker, intervals in turns.items()}
+    everyone = [(start, end, speaker) for speaker, intervals in merged.items() for start, end in intervals]
+    selected = {}
+    for speaker, own in merged.items():
+        others = _merge([(start, end) for start, end, who in everyone if who != speaker], policy.overlap_margin_sec)
+        clean = _subtract(own, others)
+        clean_sec = sum(end - start for start, end in clean)
+
+        ranked = sorted(clean, key=lambda r: r[0] - r[1])  # longest first
+        candidates = [r for r in ranked if r[1] - r[0] >= policy.min_turn_sec]
+        if sum(end - start for start, end in candidates) < policy.min_sec:
+            candidates = ranked
+        if sum(end - start for start, end in candidates) < policy.min_sec:
+            # Overlapped speech is a last resort; it carries the other voice too
+            candidates = candidates + sorted(_subtract(own, clean), key=lambda r: r[0] - r[1])
+
+        # Clean and overlapped stretches of one turn touch; joined as-is they would get a gap of silence
+        chosen = _take(candidates, policy.max_sec, policy.min_turn_sec)
+        selected[speaker] = (_merge(chosen), clean_sec)
+    return selected
+
+
+class ReferenceClipBuilder:
+    """
+    Builds one capped reference WAV per speaker from selected sample ranges.
+
+    Only the chosen ranges are read from the audio: a slice of the analysis
+    buffer, or a range of a memory-mapped WAV. Each clip is assembled and
+    written on its own thread; the reads and libsndfile writes release the
+    GIL, so speakers proceed in parallel.
+    """
+
+    def __init__(self, policy: Optional[ReferenceClipPolicy] = None, max_workers: Optional[int] = None):
+        self.policy = policy or ReferenceClipPolicy()
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+
+    def _write_clip(self, audio: Union[AudioBuffer, MappedWav], speaker_id: str, ranges: List[Interval],
+                    clean_sec: float, output_dir: str) -> ReferenceClip:
+        sr = audio.sample_rate
+        gap = np.zeros(int(self.policy.gap_sec * sr), dtype=np.float32)
+        pieces = []
+        for start, end in ranges:
+            if pieces:
+                pieces.append(gap)
+            pieces.append(audio.read(int(start * sr), int(end * sr)))
+        clip = np.concatenate(pieces) if pieces else gap[:0]
+
+        path = os.path.join(output_dir, f"{speaker_id}.wav")
+        sf.write(path, clip, sr, subtype="PCM_16")
+        duration = len(clip) / sr
+        below_min = duration < self.policy.min_sec
+        if below_min:
+            logger.warning(f"[References] {speaker_id} has only {duration:.1f}s of speech "
+                           f"(policy minimum {self.policy.min_sec:.0f}s); the cloned voice may be unstable")
+        return ReferenceClip(speaker_id, path, duration, clean_sec, ranges, below_min)
+
+    def build(self, audio: Union[AudioBuffer, MappedWav], turns: Dict[str, List[Interval]],
+              output_dir: str) -> Dict[str, ReferenceClip]:
+        """Write <speaker_id>.wav into output_dir for every speaker in turns"""
+        os.makedirs(output_dir, exist_ok=True)
+        selected = select_reference_ranges(turns, self.policy)
+        with ThreadPoolExecutor(max_workers=max(min(self.max_workers, len(selected)), 1)) as pool:
+            futures = {
+                speaker_id: pool.submit(self._write_clip, audio, speaker_id, ranges, clean_sec, output_dir)
+                for speaker_id, (ranges, clean_sec) in selected.items()
+            }
+            clips = {speaker_id: future.result() for speaker_id, future in futures.items()}
+
+        for clip in clips.values():
+            logger.info(f"[References] {clip.speaker_id}: {clip.duration_sec:.1f}s from {len(clip.ranges)} turns "
+                        f"({clip.clean_sec:.1f}s clean speech available) -> {clip.path}")
+        return clips
@@ -1,9 +1,13 @@
 import os
-import json
 import logging
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
-from pydub import AudioSegment
+
+from services.audio_buffer import AudioBuffer, MappedWav
+from services.speaker_references import ReferenceClipBuilder, ReferenceClipPolicy, ReferenceClip
+from services.speaker_turns import SpeakerTurns, build_speaker_turns, units_text
+from services.turn_index import TurnIndex
+from services.transcript_store import find_transcript, load_transcript
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -20,7 +24,8 @@ class SpeakerSegment:
 class SpeakerSegmentationService:
     """Service for processing speaker segmentation from transcript data"""
     
-    def __init__(self, assets_dir: str = None):
+    def __init__(self, assets_dir: str = None, audio: Optional[AudioBuffer] = None,
+                 reference_policy: Optional[ReferenceClipPolicy] = None):
         # Set up paths - use absolute paths
         if assets_dir is None:
             # Get the backend directory (parent of services)
@@ -30,6 +35,11 @@ class SpeakerSegmentationService:
             self.assets_dir = assets_dir
             
         self.original_audio_path = os.path.join(self.assets_dir, "audio", "extracted_audio.wav")
+        # Already-decoded audio from the analysis stage; the WAV is only read when this is missing
+        self.audio = audio
+        self.reference_builder = ReferenceClipBuilder(reference_policy)
+        self.speaker_turns: Optional[SpeakerTurns] = None
+        self.reference_clips: Dict[str, ReferenceClip] = {}
         self.speaker_audio_output_dir = os.path.join(self.assets_dir, "speaker_audio")
         self.transcripts_dir = os.path.join(self.assets_dir, "users_segements")
         
@@ -37,13 +47,12 @@ class SpeakerSegmentationService:
         os.makedirs(self.speaker_audio_output_dir, exist_ok=True)
     
     def load_transcript_data(self, transcript_path: str = None) -> Dict:
-        """Load transcript JSON file"""
+        """Load the transcript from its store, or a transcript JSON file"""
         try:
             if not transcript_path:
-                transcript_path = os.path.join(self.transcripts_dir, "transcript.json")
+                transcript_path = find_transcript(self.transcripts_dir)
             
-            with open(transcript_path, 'r', encoding='utf-8') as f:
-                transcript_data = json.load(f)
+            transcript_data = load_transcript(transcript_path)
             
             logger.info(f"Loaded transcript with {len(transcript_data.get('segments', []))} segments")
             return transcript_data
@@ -53,103 +62,58 @@ class SpeakerSegmentationService:
             raise
     
     def extract_speaker_segments(self, transcript_data: Dict) -> Dict[str, List[SpeakerSegment]]:
-        """Extract speaker segments from transcript data"""
-        speaker_segments = {}
-        
-        for segment in transcript_data.get("segments", []):
-            segment_start = segment.get("start", 0)
-            segment_end = segment.get("end", 0)
-            segment_text = segment.get("text", "").strip()
-            segment_speaker = segment.get("speaker")
-            
-            # If segment has speaker info, use it
-            if segment_speaker:
-                if segment_speaker not in speaker_segments:
-                    speaker_segments[segment_speaker] = []
-                
-                speaker_segments[segment_speaker].append(SpeakerSegment(
-                    speaker_id=segment_speaker,
-                    start_time=segment_start,
-                    end_time=segment_end,
-                    text=segment_text,
-                    words=segment.get("words", [])
-                ))
-            
-            # Also check words for speaker information
-            for word in segment.get("words", []):
-                word_speaker = word.get("speaker")
-                if word_speaker:
-                    if word_speaker not in speaker_segments:
-                        speaker_segments[word_speaker] = []
-                    
-                    # Create mini-segments for each word if needed
-                    word_start = word.get("start", segment_start)
-                    word_end = word.get("end", segment_end)
-                    word_text = word.get("word", "").strip()
-                    
-                    # Group consecutive words by the same speaker
-                    if (speaker_segments[word_speaker] and 
-                        speaker_segments[word_speaker][-1].end_time >= word_start - 0.1):
-                        # Extend the last segment
-                        last_segment = speaker_segments[word_speaker][-1]
-                        last_segment.end_time = word_end
-                        last_segment.text += " " + word_text
-                    else:
-                        # Create new segment
-                        speaker_segments[word_speaker].append(SpeakerSegment(
-                            speaker_id=word_speaker,
-                            start_time=word_start,
-                            end_time=word_end,
-                            text=word_text
-                        ))
-        
-        # Sort segments by start time for each speaker
-        for speaker_id in speaker_segments:
-            speaker_segments[speaker_id].sort(key=lambda x: x.start_time)
+        """Extract non-overlapping speaker turns from transcript data"""
+        turns = build_speaker_turns(transcript_data.get("segments", []))
+        self.speaker_turns = turns
+
+        speaker_segments = {speaker_id: [] for speaker_id in turns.speakers}
+        for code, start, end, units in zip(turns.speaker.tolist(), turns.start.tolist(), turns.end.tolist(),
+                                           turns.turn_units()):
+            speaker_id = turns.speakers[code]
+            speaker_segments[speaker_id].append(SpeakerSegment(
+                speaker_id=speaker_id,
+                start_time=start,
+                end_time=end,
+                text=units_text(units),
+                words=[unit for unit in units if "word" in unit]
+            ))
         
         logger.info(f"Extracted segments for {len(speaker_segments)} speakers")
-        for speaker_id, segments in speaker_segments.items():
-            total_duration = sum(seg.end_time - seg.start_time for seg in segments)
-            logger.info(f"{speaker_id}: {len(segments)} segments, {total_duration:.2f}s total")
+        counts = turns.counts()
+        for speaker_id, total_duration in turns.durations().items():
+            logger.info(f"{speaker_id}: {counts[speaker_id]} segments, {total_duration:.2f}s total")
         
         return speaker_segments
     
     def create_speaker_audio_files(self, speaker_segments: Dict[str, List[SpeakerSegment]]) -> Dict[str, str]:
-        """Create individual audio files for each speaker"""
+        """Create a length-capped reference clip for each speaker from their cleanest turns"""
         try:
-            # Load original audio
-            original_audio = AudioSegment.from_file(self.original_audio_path)
-            speaker_audio_paths = {}
-            
-            for speaker_id, segments in speaker_segments.items():
-                # Combine all segments for this speaker
-                combined_audio = AudioSegment.empty()
-                
-                for segment in segments:
-                    start_ms = int(segment.start_time * 1000)
-                    end_ms = int(segment.end_time * 1000)
-                    
-                    # Extract segment audio
-                    segment_audio = original_audio[start_ms:end_ms]
-                    combined_audio += segment_audio
-                    
-                    # Add small silence between segments for natural speech
-                    if len(combined_audio) > 0:
-                        combined_audio += AudioSegment.silent(duration=100)  # 100ms silence
-                
-                # Export speaker audio
-                output_path = os.path.join(self.speaker_audio_output_dir, f"{speaker_id}.wav")
-                combined_audio.export(output_path, format="wav")
-                speaker_audio_paths[speaker_id] = output_path
-                
-                logger.info(f"Created speaker audio for {speaker_id}: {output_path} ({len(combined_audio)/1000:.2f}s)")
-            
-            return speaker_audio_paths
+            # Only the selected ranges are read; without the decoded buffer the WAV is memory-mapped
+            audio = self.audio if self.audio is not None else MappedWav(self.original_audio_path)
+            turns = {
+                speaker_id: [(segment.start_time, segment.end_time) for segment in segments]
+                for speaker_id, segments in speaker_segments.items()
+            }
+            self.reference_clips = self.reference_builder.build(audio, turns, self.speaker_audio_output_dir)
+            return {speaker_id: clip.path for speaker_id, clip in self.reference_clips.items()}
             
         except Exception as e:
             logger.error(f"Error creating speaker audio files: {e}")
             raise
     
+    def process_diarization_turns(self, turns: TurnIndex) -> Dict[str, str]:
+        """Build reference clips straight from diarization turns, without waiting for a transcript"""
+        speaker_segments = {
+            speaker_id: [SpeakerSegment(speaker_id=speaker_id, start_time=start, end_time=end, text="")
+                         for start, end in intervals]
+            for speaker_id, intervals in turns.intervals().items()
+        }
+
+        speaker_audio_paths = self.create_speaker_audio_files(speaker_segments)
+        logger.info(f"Speaker segmentation from {len(turns)} diarization turns complete: "
+                    f"{len(speaker_audio_paths)} speaker files created")
+        return speaker_audio_paths
+
     def process_speaker_segmentation(self, transcript_path: str = None) -> Dict[str, str]:
         """Complete workflow to process speaker segmentation"""
         try:
@@ -0,0 +1,147 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List
+
+import numpy as np
+
+JOIN_GAP_SEC = 0.1  # same-speaker words closer than this belong to one turn
+
+
+def units_text(units: List[Dict[str, Any]]) -> str:
+    """A turn's text: its words (or word-less segments' text), stripped and space-joined"""
+    texts = (unit["word"] if "word" in unit else unit.get("text", "") for unit in units)
+    return " ".join(t for t in (t.strip() for t in texts) if t)
+
+
+@dataclass
+class SpeakerTurns:
+    """
+    Non-overlapping same-speaker turns held as parallel arrays.
+
+    Turn i belongs to speakers[speaker[i]] and spans start[i]..end[i]. Its
+    units (word dicts, or whole segments that have no words) are
+    units[j] for j in unit_order[first_unit[i]:end_unit[i]]. Turns are
+    sorted by speaker, then time. Within one speaker, every turn starts after
+    the previous one ends, so no second of audio is counted twice.
+    """
+    speakers: List[str]
+    speaker: np.ndarray     # int32 index into speakers, per turn
+    start: np.ndarray       # float64 seconds
+    end: np.ndarray         # float64 seconds
+    first_unit: np.ndarray  # int64 offset into unit_order, per turn
+    end_unit: np.ndarray    # int64, exclusive
+    unit_order: np.ndarray  # int64 index into units, grouped by turn
+    units: List[Dict[str, Any]]
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def _units(self, i: int) -> List[Dict[str, Any]]:
+        return [self.units[j] for j in self.unit_order[self.first_unit[i]:self.end_unit[i]]]
+
+    def text(self, i: int) -> str:
+        return units_text(self._units(i))
+
+    def words(self, i: int) -> List[Dict[str, Any]]:
+        return [unit for unit in self._units(i) if "word" in unit]
+
+    def turn_units(self) -> Iterator[List[Dict[str, Any]]]:
+        """Every turn's units, in turn order; one pass, instead of indexing the arrays turn by turn"""
+        order = self.unit_order.tolist()
+        for lo, hi in zip(self.first_unit.tolist(), self.end_unit.tolist()):
+            yield [self.units[j] for j in order[lo:hi]]
+
+    def texts(self) -> List[str]:
+        """Every turn's text, in turn order, as text(i) gives it"""
+        return [units_text(units) for units in self.turn_units()]
+
+    def durations(self) -> Dict[str, float]:
+        """Seconds of speech per speaker"""
+        totals = np.bincount(self.speaker, weights=self.end - self.start, minlength=len(self.speakers))
+        return {name: float(total) for name, total in zip(self.speakers, totals)}
+
+    def counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.speaker, minlength=len(self.speakers))
+        return {name: int(count) for name, count in zip(self.speakers, counts)}
+
+    def for_speaker(self, speaker_id: str) -> np.ndarray:
+        """Turn indices of one speaker, in time order"""
+        code = self.speakers.index(speaker_id)
+        lo, hi = np.searchsorted(self.speaker, [code, code + 1])
+        return np.arange(lo, hi)
+
+
+def build_speaker_turns(segments: Iterable[Dict[str, Any]], join_gap: float = JOIN_GAP_SEC) -> SpeakerTurns:
+    """
+    Merge a transcript's labelled words into per-speaker turns in one pass.
+
+    Each word counts once, under its own speaker or else its segment's. A
+    segment without words counts as a single unit. Unlabelled units are
+    skipped. Units are grouped by speaker, keeping time order. A unit then
+    joins the current turn if it starts within join_gap of the furthest end
+    so far, so turns never overlap each other.
+    """
+    codes: Dict[str, int] = {}
+    unit_speaker: List[int] = []
+    unit_start: List[float] = []
+    unit_end: List[float] = []
+    units: List[Dict[str, Any]] = []
+    last_speaker, last_code = None, -1
+
+    for segment in segments:
+        segment_start = segment.get("start", 0)
+        segment_end = segment.get("end", 0)
+        segment_speaker = segment.get("speaker")
+        words = segment.get("words")
+        if not words:
+            if segment_speaker:
+                unit_speaker.append(codes.setdefault(segment_speaker, len(codes)))
+                unit_start.append(segment_start)
+                unit_end.append(segment_end)
+                units.append(segment)
+            continue
+        for word in words:
+            speaker = word.get("speaker") or segment_speaker
+            if not speaker:
+                continue
+            if speaker != last_speaker:
+                last_speaker, last_code = speaker, codes.setdefault(speaker, len(codes))
+            unit_speaker.append(last_code)
+            unit_start.append(word.get("start", segment_start))
+            unit_end.append(word.get("end", segment_end))
+            units.append(word)
+
+    speaker = np.asarray(unit_speaker, dtype=np.int32)
+    start = np.asarray(unit_start, dtype=np.float64)
+    end = np.maximum(np.asarray(unit_end, dtype=np.float64), start)
+
+    if len(start) and np.all(start[1:] >= start[:-1]) and len(codes) <= np.iinfo(np.int16).max:
+        # Transcripts arrive in time order: a stable radix sort on 16-bit speaker codes keeps that order, in linear time
+        order = np.argsort(speaker.astype(np.int16), kind="stable")
+    else:
+        order = np.lexsort((start, speaker))
+    speaker, start, end = speaker[order], start[order], end[order]
+
+    if len(start):
+        # Running max of end within each speaker: shifting every speaker onto its own
+        # time range lets one global maximum.accumulate do the per-speaker scan
+        span = float(end.max() - min(start.min(), 0.0)) + join_gap + 1.0
+        shifted_end = np.maximum.accumulate(end + speaker * span)
+        new_turn = np.ones(len(start), dtype=bool)
+        new_turn[1:] = (speaker[1:] != speaker[:-1]) | (start[1:] + speaker[1:] * span > shifted_end[:-1] + join_gap)
+        first_unit = np.flatnonzero(new_turn)
+        turn_end = np.maximum.reduceat(end, first_unit)
+    else:
+        first_unit = np.zeros(0, dtype=np.int64)
+        turn_end = end
+    end_unit = np.append(first_unit[1:], len(start)).astype(np.int64)
+
+    return SpeakerTurns(
+        speakers=list(codes),
+        speaker=speaker[first_unit],
+        start=start[first_unit],
+        end=turn_end,
+        first_unit=first_unit.astype(np.int64),
+        end_unit=end_unit,
+        unit_order=order.astype(np.int64),
+        units=units,
+    )
@@ -0,0 +1,134 @@
+import time
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class StageCancelled(Exception):
+    """Raised at a stage's cancellation point once another stage of the run has failed"""
+
+
+@dataclass
+class _Stage:
+    name: str
+    fn: Callable[[Dict[str, Any]], Any]
+    after: Sequence[str]
+    future: Optional[Future] = None
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+
+class StageGraph:
+    """
+    Runs named stages on a thread pool as soon as the stages they depend on finish.
+
+    Each stage function gets a dict of its dependencies' results. A stage can
+    also look at a stage it doesn't wait for via future(name), e.g. to start
+    using an early result while it keeps streaming. run() returns every
+    stage's result. On the first failure it cancels the stages that haven't
+    started, tells running ones to stop at their next check(), and waits
+    for them before re-raising, so nothing outlives run().
+    report() gives per-stage wall time and the critical path.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self._stages: Dict[str, _Stage] = {}
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+        self._stop = threading.Event()
+
+    def add(self, name: str, fn: Callable[[Dict[str, Any]], Any], after: Sequence[str] = ()) -> "StageGraph":
+        for dependency in after:
+            if dependency not in self._stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dependency}'")
+        self._stages[name] = _Stage(name, fn, tuple(after))
+        return self
+
+    def future(self, name: str) -> Optional[Future]:
+        """The stage's future once it has been submitted, else None"""
+        return self._stages[name].future
+
+    def check(self):
+        """Cancellation point for stage functions: raises StageCancelled once the run is failing"""
+        if self._stop.is_set():
+            raise StageCancelled("Stopped because another stage failed")
+
+    def _timed(self, stage: _Stage, inputs: Dict[str, Any]) -> Any:
+        self.check()
+        stage.started = time.perf_counter()
+        try:
+            return stage.fn(inputs)
+        finally:
+            stage.finished = time.perf_counter()
+
+    def run(self) -> Dict[str, Any]:
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self._started = time.perf_counter()
+        results: Dict[str, Any] = {}
+        waiting = dict(self._stages)
+        running: Dict[Future, _Stage] = {}
+        try:
+            while waiting or running:
+                for name, stage in list(waiting.items()):
+                    if all(dependency in results for dependency in stage.after):
+                        inputs = {dependency: results[dependency] for dependency in stage.after}
+                        stage.future = executor.submit(self._timed, stage, inputs)
+                        running[stage.future] = stage
+                        del waiting[name]
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    # Re-raises the stage's exception (including JobCancelled)
+                    results[stage.name] = future.result()
+            return results
+        except BaseException:
+            self._stop.set()
+            raise
+        finally:
+            # Running stages are waited for: they may hold model locks and write into the workspace,
+            # and the job's worker slot must cover them until they stop
+            executor.shutdown(wait=True, cancel_futures=True)
+            self._finished = time.perf_counter()
+
+    def critical_path(self) -> List[str]:
+        """Stages on the longest dependency chain, ending with the stage that finished last"""
+        finished = [s for s in self._stages.values() if s.finished is not None]
+        if not finished:
+            return []
+        stage = max(finished, key=lambda s: s.finished)
+        path = [stage.name]
+        while stage.after:
+            # The dependency that finished last is the one this stage was waiting for
+            stage = max((self._stages[d] for d in stage.after), key=lambda s: s.finished or 0.0)
+            path.append(stage.name)
+        return path[::-1]
+
+    def report(self) -> Dict[str, Any]:
+        origin = self._started or 0.0
+        stages = {}
+        for stage in self._stages.values():
+            if stage.started is None:
+                stages[stage.name] = {"after": list(stage.after), "ran": False}
+                continue
+            ready = max((self._stages[d].finished or origin for d in stage.after), default=origin)
+            stages[stage.name] = {
+                "after": list(stage.after),
+                "ran": True,
+                "start_sec": stage.started - origin,
+                "end_sec": (stage.finished or stage.started) - origin,
+                "wall_sec": (stage.finished or stage.started) - stage.started,
+                "queued_sec": stage.started - ready,  # ready but waiting for a pool thread
+            }
+        path = self.critical_path()
+        return {
+            "wall_sec": (self._finished or origin) - origin,
+            "stages": stages,
+            "critical_path": path,
+            "critical_path_sec": sum(stages[name]["wall_sec"] for name in path),
+        }
@@ -0,0 +1,259 @@
+import asyncio
+import re
+import time
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from services.ring_buffer import AudioRingBuffer
+
+PARTIAL = "partial"
+FINAL = "final"
+PROMPT_CHARS = 200  # committed text fed back to Whisper as context
+
+
+@dataclass
+class TranscriptEvent:
+    """
+    One in-order live transcription update.
+
+    final events carry newly committed words, which never change again.
+    partial events carry the current uncommitted tail and replace the
+    previous partial. Times are seconds from the start of the stream.
+    latency_sec (final only) is the wall time from the last committed word's
+    audio arriving in the buffer to this event being emitted.
+    """
+    kind: str
+    text: str
+    words: List[Dict[str, Any]]
+    start: Optional[float]
+    end: Optional[float]
+    latency_sec: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": self.kind,
+            "text": self.text,
+            "words": self.words,
+            "start": self.start,
+            "end": self.end,
+            "latency_sec": self.latency_sec,
+        }
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^\w']", "", word).lower()
+
+
+def _agreed_prefix(previous: List[Dict], current: List[Dict]) -> int:
+    """Number of leading words two consecutive hypotheses agree on"""
+    n = 0
+    for a, b in zip(previous, current):
+        if _normalize(a["word"]) != _normalize(b["word"]):
+            break
+        n += 1
+    return n
+
+
+@dataclass
+class DecoderStats:
+    decodes: int = 0
+    decode_sec: float = 0.0
+    audio_sec: float = 0.0
+    committed_words: int = 0
+    forced_commits: int = 0
+    latencies: List[float] = field(default_factory=list, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        latencies = np.array(self.latencies) if self.latencies else None
+        return {
+            "decodes": self.decodes,
+            "decode_sec": self.decode_sec,
+            "audio_sec": self.audio_sec,
+            "rtf": self.decode_sec / self.audio_sec if self.audio_sec else None,
+            "committed_words": self.committed_words,
+            "forced_commits": self.forced_commits,
+            "latency_p50_sec": float(np.percentile(latencies, 50)) if latencies is not None else None,
+            "latency_p90_sec": float(np.percentile(latencies, 90)) if latencies is not None else None,
+            "latency_max_sec": float(latencies.max()) if latencies is not None else None,
+        }
+
+
+class StreamingDecoder:
+    """
+    Sliding-window live decoder with local-agreement commits (LocalAgreement-2).
+
+    Every step_sec of new audio, the whole uncommitted window is re-decoded.
+    Words that two consecutive hypotheses agree on are committed as final, and
+    the rest is reported as partial. The window keeps the uncommitted audio,
+    so a word that straddles a step boundary is decoded whole. Once the window
+    passes max_window_sec it is trimmed to the last committed word.
+
+    Latency is bounded by roughly 2 * step_sec plus decode time: a word needs
+    two decodes to agree on it. Lower step_sec commits sooner and decodes more often.
+
+    Behind a VADGate the buffer only ever holds speech: time_map converts
+    buffer seconds back to stream seconds for events, and once no audio has
+    arrived for idle_flush_sec (the gate closed an utterance) the pending
+    hypothesis is committed instead of waiting for the next speaker.
+    """
+
+    def __init__(self, model, sample_rate: int = 16000, step_sec: float = 1.0, max_window_sec: float = 15.0,
+                 beam_size: int = 5, language: Optional[str] = None,
+                 on_event: Optional[Callable[[TranscriptEvent], None]] = None,
+                 time_map: Optional[Callable[[float], float]] = None, idle_flush_sec: Optional[float] = None):
+        self.model = model
+        self.sample_rate = sample_rate
+        self.step_samples = int(step_sec * sample_rate)
+        self.max_window_samples = int(max_window_sec * sample_rate)
+        self.beam_size = beam_size
+        self.language = language
+        self.on_event = on_event or (lambda event: None)
+        self.time_map = time_map or (lambda t: t)
+        self.idle_flush_sec = idle_flush_sec
+
+        self.committed: List[Dict[str, Any]] = []
+        self._hypothesis: List[Dict[str, Any]] = []
+        self._committed_until = 0.0  # stream seconds
+        self._decoded_until = 0      # stream samples
+        self.stats = DecoderStats()
+
+    @property
+    def text(self) -> str:
+        return "".join(w["word"] for w in self.committed).strip()
+
+    def _prompt(self) -> Optional[str]:
+        return self.text[-PROMPT_CHARS:] or None
+
+    def _decode(self, window: np.ndarray, window_start: int) -> List[Dict[str, Any]]:
+        offset = window_start / self.sample_rate
+        started = time.perf_counter()
+        segments, _ = self.model.transcribe(window, beam_size=self.beam_size, word_timestamps=True,
+                                            initial_prompt=self._prompt(), condition_on_previous_text=False,
+                                            language=self.language)
+        words = [
+            {"start": w.start + offset, "end": w.end + offset, "word": w.word}
+            for segment in segments for w in (segment.words or [])
+        ]
+        self.stats.decodes += 1
+        self.stats.decode_sec += time.perf_counter() - started
+        # Audio before the last commit is only context; its words are already out
+        return [w for w in words if w["end"] > self._committed_until + 1e-3]
+
+    def _mapped(self, words: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [dict(w, start=self.time_map(w["start"]), end=self.time_map(w["end"])) for w in words]
+
+    def _event(self, kind: str, words: List[Dict[str, Any]], latency: Optional[float] = None) -> TranscriptEvent:
+        words = self._mapped(words)
+        return TranscriptEvent(kind, "".join(w["word"] for w in words).strip(), words,
+                               words[0]["start"] if words else None, words[-1]["end"] if words else None, latency)
+
+    def _commit(self, words: List[Dict[str, Any]], ring: AudioRingBuffer):
+        if not words:
+            return
+        now = time.monotonic()
+        arrived = ring.arrival_time(int(words[-1]["end"] * self.sample_rate))
+        latency = now - arrived if arrived is not None else None
+        if latency is not None:
+            self.stats.latencies.append(latency)
+
+        self.committed.extend(words)
+        self.stats.committed_words += len(words)
+        self._committed_until = words[-1]["end"]
+        self.on_event(self._event(FINAL, words, latency))
+
+    def _emit_partial(self):
+        self.on_event(self._event(PARTIAL, self._hypothesis))
+
+    def _trim(self, ring: AudioRingBuffer, keep_from: int):
+        ring.consume(max(keep_from - ring.read_position, 0))
+
+    def step(self, ring: AudioRingBuffer, final: bool = False) -> bool:
+        """Decode the current window if step_sec of new audio is waiting (or final); returns whether it did"""
+        window_start = ring.read_position
+        available = len(ring)
+        new_samples = window_start + available - self._decoded_until
+        if available == 0 or (new_samples < self.step_samples and not final):
+            return False
+
+        # A copy, not the ring's view: under drop_oldest the producer may overwrite those slots mid-decode
+        window = np.array(ring.read(available, timeout=0))
+        self.stats.audio_sec += (window_start + available - max(self._decoded_until, window_start)) / self.sample_rate
+        self._decoded_until = window_start + available
+
+        words = self._decode(window, window_start)
+        agreed = len(words) if final else _agreed_prefix(self._hypothesis, words)
+        self._commit(words[:agreed], ring)
+        self._hypothesis = words[agreed:]
+
+        if not final and available > self.max_window_samples:
+            if self._hypothesis and self._committed_until * self.sample_rate <= window_start:
+                # No agreement for a whole window: commit rather than grow without bound
+                self.stats.forced_commits += 1
+                self._commit(self._hypothesis, ring)
+                self._hypothesis = []
+            if self.committed and self._committed_until * self.sample_rate > window_start:
+                self._trim(ring, int(self._committed_until * self.sample_rate))
+            else:
+                # No speech at all: keep one step of overlap for a word just starting
+                self._trim(ring, self._decoded_until - self.step_samples)
+
+        if final:
+            self._hypothesis = []
+            self._trim(ring, self._decoded_until)
+        self._emit_partial()
+        return True
+
+    def run(self, ring: AudioRingBuffer, stop_event: threading.Event, poll_timeout: float = 0.1):
+        """Decode until stop_event is set, then commit whatever is left"""
+        last_audio = time.monotonic()
+        last_position = ring.write_position
+        while not stop_event.is_set():
+            if ring.write_position != last_position:
+                last_audio, last_position = time.monotonic(), ring.write_position
+            elif (self.idle_flush_sec is not None and len(ring)
+                  and time.monotonic() - last_audio >= self.idle_flush_sec):
+                # The source went quiet mid-hypothesis: the utterance is over, commit it
+                self.flush(ring)
+                continue
+
+            if not self.step(ring):
+                # Wake when enough new audio for another step has arrived (or on timeout)
+                needed = self._decoded_until + self.step_samples - ring.read_position
+                ring.read(min(max(needed, 1), ring.capacity), timeout=poll_timeout)
+        self.flush(ring)
+
+    def flush(self, ring: AudioRingBuffer):
+        self.step(ring, final=True)
+
+
+class AsyncTranscriptEvents:
+    """
+    on_event callback that can be iterated from asyncio.
+
+    The decoder thread calls it, and `async for event in events` yields the
+    events on the loop in emission order until close().
+    """
+
+    _CLOSED = object()
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self._loop = loop or asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    def __call__(self, event: TranscriptEvent):
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, self._CLOSED)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> TranscriptEvent:
+        event = await self._queue.get()
+        if event is self._CLOSED:
+            raise StopAsyncIteration
+        return event
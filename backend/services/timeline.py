@@ -0,0 +1,118 @@
+import numpy as np
+import soundfile as sf
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+INT16_MIN = np.iinfo(np.int16).min
+INT16_MAX = np.iinfo(np.int16).max
+
+
+@dataclass
+class TimelineEdit:
+    """A replacement clip for the [start_time, end_time) span of the original audio"""
+    start_time: float
+    end_time: float
+    samples: np.ndarray  # int16, same sample rate and channel layout as the timeline
+
+
+def seconds_to_frame(seconds: float, sample_rate: int) -> int:
+    """Frame index for a time, truncated to whole milliseconds like the pydub-based code was"""
+    return int(int(seconds * 1000) * sample_rate / 1000)
+
+
+class AudioTimeline:
+    """
+    Edit assembler over a single int16 sample buffer.
+
+    Both strategies size the output up front, allocate it once and fill every
+    region with one slice assignment, so the cost is linear in the audio length
+    plus the clip lengths instead of rebuilding the whole track per edit.
+    """
+
+    def __init__(self, samples: np.ndarray, sample_rate: int):
+        self.samples = samples
+        self.sample_rate = sample_rate
+
+    @classmethod
+    def from_wav(cls, path: str) -> "AudioTimeline":
+        samples, sample_rate = sf.read(path, dtype="int16")
+        return cls(samples, sample_rate)
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    @property
+    def duration_sec(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+    def _frames(self, edit: TimelineEdit) -> Tuple[int, int]:
+        return seconds_to_frame(edit.start_time, self.sample_rate), seconds_to_frame(edit.end_time, self.sample_rate)
+
+    def _empty(self, n_frames: int) -> np.ndarray:
+        return np.zeros((n_frames,) + self.samples.shape[1:], dtype=np.int16)
+
+    def render_overlay(self, edits: Sequence[TimelineEdit]) -> np.ndarray:
+        """
+        Silence each edited span and mix its clip in at the span start (the v1 strategy).
+
+        A clip longer than its span is mixed over the audio that follows it, and the
+        track never grows past the original length or the last edited span end.
+        """
+        edits = sorted(edits, key=lambda e: e.start_time)
+        n_frames = len(self.samples)
+        for edit in edits:
+            _, end = self._frames(edit)
+            n_frames = max(n_frames, end)
+
+        output = self._empty(n_frames)
+        output[:len(self.samples)] = self.samples
+
+        for edit in edits:
+            start, end = self._frames(edit)
+            output[start:end] = 0
+            clip = edit.samples[:max(n_frames - start, 0)]
+            if len(clip):
+                region = output[start:start + len(clip)]
+                mixed = region.astype(np.int32) + clip
+                np.clip(mixed, INT16_MIN, INT16_MAX, out=mixed)
+                region[...] = mixed
+        return output
+
+    def _segment_plan(self, edits: Sequence[TimelineEdit]) -> List[Tuple[str, int, int, np.ndarray]]:
+        """Ordered (kind, src_start, src_end, clip) regions for the segment-building strategy"""
+        plan = []
+        last_end = 0.0
+        for edit in sorted(edits, key=lambda e: e.start_time):
+            if edit.start_time > last_end:
+                gap_start = seconds_to_frame(last_end, self.sample_rate)
+                gap_end = min(seconds_to_frame(edit.start_time, self.sample_rate), len(self.samples))
+                plan.append(("original", gap_start, max(gap_end, gap_start), None))
+            plan.append(("clip", 0, len(edit.samples), edit.samples))
+            last_end = edit.end_time
+
+        if last_end < self.duration_sec:
+            plan.append(("original", min(seconds_to_frame(last_end, self.sample_rate), len(self.samples)), len(self.samples), None))
+        return plan
+
+    def render_segments(self, edits: Sequence[TimelineEdit]) -> np.ndarray:
+        """
+        Rebuild the track as original gaps and cloned clips in time order (the v2 strategy).
+
+        The output length follows the clips, so a longer or shorter rewrite shifts
+        everything after it instead of overlapping it.
+        """
+        plan = self._segment_plan(edits)
+        output = self._empty(sum(src_end - src_start for _, src_start, src_end, _ in plan))
+
+        cursor = 0
+        for kind, src_start, src_end, clip in plan:
+            length = src_end - src_start
+            if kind == "clip":
+                output[cursor:cursor + length] = clip
+            else:
+                output[cursor:cursor + length] = self.samples[src_start:src_end]
+            cursor += length
+        return output
+
+    def export(self, samples: np.ndarray, path: str):
+        sf.write(path, samples, self.sample_rate, subtype="PCM_16")
@@ -1,135 +1,223 @@
 import torch
-import librosa
 import numpy as np
-import pandas as pd
 import json
 import os
-import soundfile as sf
 from pyannote.audio import Pipeline
 from faster_whisper import WhisperModel
-from typing import Union
+from typing import Dict, Optional, Union
 from concurrent.futures import ThreadPoolExecutor
-import subprocess
+import threading
 import yaml
 
+try:
+    from faster_whisper import BatchedInferencePipeline
+except ImportError:  # faster-whisper < 1.1 has no batched pipeline; batched profiles decode sequentially
+    BatchedInferencePipeline = None
+
+from services.model_registry import model_registry
+from services.audio_buffer import AudioBuffer, decode_audio, DEFAULT_MAX_IN_MEMORY_SEC
+from services.longform_transcribe import LongformTranscriber
+from services.transcription_profiles import TranscriptionProfile, DEFAULT_PROFILE, build_profiles, resolve_profile
+from services.speaker_assignment import assign_speakers_vectorized
+from services.speaker_references import ReferenceClipPolicy
+from services.diarization import DiarizationSettings, configure_pipeline, run_diarization
+from services.turn_index import TurnIndex
+
 with open("config.yaml", "r") as f:
     config = yaml.safe_load(f)
 
 
 HUGGINGFACE_TOKEN = config.get("Hugging_face","")  # Replace with your Hugging Face token
 SAMPLE_RATE = 16000
+WHISPER_DEVICE = config.get("device", "auto")
+DIARIZATION_MODEL = "pyannote/speaker-diarization-3.1"
+DIARIZATION_SETTINGS = DiarizationSettings.from_config(config)
+# Named speed/quality trade-offs; requests pick one, the config picks the default
+TRANSCRIPTION_PROFILES = build_profiles(config)
+DEFAULT_TRANSCRIPTION_PROFILE = config.get("transcription_profile", DEFAULT_PROFILE)
+# Long-form mode: CPU-only servers split long audio at VAD boundaries across worker processes
+LONGFORM_WORKERS = config.get("longform_workers", 0)
+LONGFORM_MIN_SEC = config.get("longform_min_duration_minutes", 10) * 60
+LONGFORM_MAX_CHUNK_SEC = config.get("longform_max_chunk_sec", 120)
+# xTTS reference clips: each speaker's cleanest turns, between min and max seconds long
+SPEAKER_REFERENCE_POLICY = ReferenceClipPolicy.from_config(config)
 OUTPUT_DIR = os.path.join(os.getcwd(), "assests/users_segements")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-def extract_audio_from_video(video_path, audio_out_path):
-    cmd = [
-        "ffmpeg", "-y", "-i", video_path,
-        "-ar", str(SAMPLE_RATE), "-ac", "1",
-        "-f", "wav", audio_out_path
-    ]
-    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    print(f"[Extract] Audio saved to {audio_out_path}")
 
-def transcribe(audio_file):
-    print("[Transcription] Loading model...")
-    model = WhisperModel("small", device="cuda" if torch.cuda.is_available() else "cpu")
+def get_profile(name: Optional[str] = None) -> TranscriptionProfile:
+    """Resolve a profile name (None means the configured default); raises ValueError if unknown"""
+    return resolve_profile(TRANSCRIPTION_PROFILES, name, DEFAULT_TRANSCRIPTION_PROFILE)
 
-    print(f"[Transcription] Transcribing {audio_file}...")
-    segments, info = model.transcribe(audio_file, beam_size=5, word_timestamps=True)
 
-    transcript_result = {"segments": []}
-    for segment in segments:
-        seg = {
-            "start": segment.start,
-            "end": segment.end,
-            "text": segment.text,
-            "words": []
-        }
-        if segment.words:
-            for word in segment.words:
-                seg["words"].append({
-                    "start": word.start,
-                    "end": word.end,
-                    "word": word.word
-                })
-        transcript_result["segments"].append(seg)
+def _whisper_device():
+    if WHISPER_DEVICE == "cuda" and not torch.cuda.is_available():
+        return "cpu"
+    return WHISPER_DEVICE
 
-    print("[Transcription] Done.")
-    return transcript_result
-
-def diarize(audio_file):
-    print("[Diarization] Loading audio with librosa...")
-    audio, sr = librosa.load(audio_file, sr=SAMPLE_RATE)
-    audio_data = {
-        "waveform": torch.from_numpy(audio).unsqueeze(0),
-        "sample_rate": SAMPLE_RATE
-    }
 
-    print("[Diarization] Loading diarization model...")
+def _register_whisper_model(profile: TranscriptionProfile) -> str:
+    def load():
+        return WhisperModel(profile.model_size, device=_whisper_device(), compute_type=profile.compute_type,
+                            cpu_threads=profile.cpu_threads)
+
+    # faster-whisper (CTranslate2) handles concurrent transcribe() calls
+    model_registry.register(profile.model_key, load, thread_safe=True)
+    return profile.model_key
+
+
+def _load_diarization_pipeline():
     pipeline = Pipeline.from_pretrained(
-        "pyannote/speaker-diarization-3.1",
+        DIARIZATION_MODEL,
         use_auth_token=HUGGINGFACE_TOKEN
     )
+    if DIARIZATION_SETTINGS.threads:
+        # Process-wide: also caps xTTS, which runs in separate requests on the same torch
+        torch.set_num_threads(DIARIZATION_SETTINGS.threads)
+    return configure_pipeline(pipeline, DIARIZATION_SETTINGS)
+
+
+# Only the default profile's model is registered (and warmed) up front; others load on first request
+_register_whisper_model(get_profile())
+# pyannote does not handle concurrent calls
+model_registry.register("diarization", _load_diarization_pipeline)
+
+# One worker pool per profile, created the first time that profile sees long audio
+_longform_transcribers: Dict[str, LongformTranscriber] = {}
+_longform_lock = threading.Lock()
+
+
+def _longform_enabled(profile: TranscriptionProfile) -> bool:
+    # Batched profiles already spread work across cores within one model
+    return LONGFORM_WORKERS > 1 and profile.batch_size == 0 and not torch.cuda.is_available()
+
+
+def get_longform_transcriber(profile: TranscriptionProfile) -> Optional[LongformTranscriber]:
+    if not _longform_enabled(profile):
+        return None
+    with _longform_lock:
+        if profile.name not in _longform_transcribers:
+            _longform_transcribers[profile.name] = LongformTranscriber(
+                profile.model_size,
+                workers=LONGFORM_WORKERS,
+                threads_per_worker=config.get("longform_threads_per_worker", 0),
+                compute_type=profile.compute_type,
+                beam_size=profile.beam_size,
+                max_chunk_sec=LONGFORM_MAX_CHUNK_SEC,
+            )
+        return _longform_transcribers[profile.name]
+
+
+def shutdown_longform():
+    with _longform_lock:
+        for transcriber in _longform_transcribers.values():
+            transcriber.shutdown()
+        _longform_transcribers.clear()
+
+def analysis_version(profile_name: Optional[str] = None):
+    """Models and settings that determine analysis output; part of the result cache key"""
+    profile = get_profile(profile_name)
+    version = {
+        "sample_rate": SAMPLE_RATE,
+        "whisper_profile": profile.to_dict(),
+        "whisper_device": _whisper_device(),
+        "diarization_model": DIARIZATION_MODEL,
+        # threads and batch sizes only change speed
+        "diarization": {"segmentation_step": DIARIZATION_SETTINGS.segmentation_step,
+                        "num_speakers": DIARIZATION_SETTINGS.num_speakers,
+                        "fast_vad": DIARIZATION_SETTINGS.fast_vad},
+        # Clips are cut from diarization turns, not from transcript words
+        "speaker_references": {**SPEAKER_REFERENCE_POLICY.to_dict(), "source": "diarization"},
+    }
+    if _longform_enabled(profile):
+        # Chunked decoding can differ slightly from one pass, so it keys its own cache entries
+        version["longform"] = {"min_sec": LONGFORM_MIN_SEC, "max_chunk_sec": LONGFORM_MAX_CHUNK_SEC}
+    return version
+
+MAX_IN_MEMORY_SEC = config.get("audio_max_in_memory_minutes", DEFAULT_MAX_IN_MEMORY_SEC / 60) * 60
+
+def extract_audio_from_video(video_path, audio_out_path=None, spill_path=None) -> AudioBuffer:
+    """Decode the video's audio once into a shared buffer; optionally keep a WAV copy for later sessions"""
+    audio = decode_audio(video_path, SAMPLE_RATE, spill_path=spill_path, max_in_memory_sec=MAX_IN_MEMORY_SEC)
+    print(f"[Extract] Decoded {audio.duration_sec:.1f}s of audio"
+          f"{' (memory-mapped)' if audio.memory_mapped else ''}")
+    if audio_out_path:
+        audio.write_wav(audio_out_path)
+        print(f"[Extract] Audio saved to {audio_out_path}")
+    return audio
+
+def _as_samples(audio: Union[str, AudioBuffer, np.ndarray]) -> np.ndarray:
+    """Mono float32 samples at SAMPLE_RATE from a path, a decoded buffer or an array"""
+    if isinstance(audio, AudioBuffer):
+        return audio.samples
+    if isinstance(audio, str):
+        return decode_audio(audio, SAMPLE_RATE).samples
+    return audio
+
+def _segment_to_dict(segment):
+    seg = {
+        "start": segment.start,
+        "end": segment.end,
+        "text": segment.text,
+        "words": []
+    }
+    if segment.words:
+        for word in segment.words:
+            seg["words"].append({
+                "start": word.start,
+                "end": word.end,
+                "word": word.word
+            })
+    return seg
+
+def iter_transcribe(audio: Union[str, AudioBuffer, np.ndarray], profile_name: Optional[str] = None):
+    """Yield transcript segments (with words) as soon as faster-whisper decodes them"""
+    profile = get_profile(profile_name)
+    samples = _as_samples(audio)
+    longform = get_longform_transcriber(profile)
+    if longform is not None and len(samples) >= LONGFORM_MIN_SEC * SAMPLE_RATE:
+        print(f"[Transcription] Long-form transcription of {len(samples) / SAMPLE_RATE:.1f}s of audio "
+              f"(profile '{profile.name}')...")
+        buffer = audio if isinstance(audio, AudioBuffer) else AudioBuffer(samples, SAMPLE_RATE)
+        yield from longform.iter_transcribe(buffer)
+        print("[Transcription] Done.")
+        return
+
+    print(f"[Transcription] Transcribing {len(samples) / SAMPLE_RATE:.1f}s of audio (profile '{profile.name}')...")
+    with model_registry.use(_register_whisper_model(profile)) as model:
+        if profile.batch_size > 0 and BatchedInferencePipeline is not None:
+            segments, info = BatchedInferencePipeline(model=model).transcribe(
+                samples, batch_size=profile.batch_size, beam_size=profile.beam_size, word_timestamps=True)
+        else:
+            segments, info = model.transcribe(samples, beam_size=profile.beam_size, word_timestamps=True)
+
+    # faster-whisper decodes lazily, one window per iteration of this generator
+    for segment in segments:
+        yield _segment_to_dict(segment)
+
+    print("[Transcription] Done.")
+
+def transcribe(audio: Union[str, AudioBuffer, np.ndarray], profile_name: Optional[str] = None):
+    return {"segments": list(iter_transcribe(audio, profile_name))}
+
+def diarize(audio: Union[str, AudioBuffer, np.ndarray], num_speakers: Optional[int] = None):
+    """
+    Speaker turns as a TurnIndex, plus the samples.
+    Per-sub-stage timings are in turns.report.
+    """
+    audio = _as_samples(audio)
 
     print("[Diarization] Running diarization...")
-    diarization = pipeline(audio_data)
-
-    segments = []
-    for turn, _, speaker in diarization.itertracks(yield_label=True):
-        segments.append({
-            "start": turn.start,
-            "end": turn.end,
-            "speaker": speaker
-        })
-
-    df = pd.DataFrame(segments)
-    return df, audio
-
-def assign_speakers(diarize_df, transcript_result, fill_nearest=False):
-    # (Same as your code)
-    for seg in transcript_result["segments"]:
-        diarize_df["intersection"] = np.minimum(diarize_df["end"], seg["end"]) - np.maximum(diarize_df["start"], seg["start"])
-        if not fill_nearest:
-            dia_tmp = diarize_df[diarize_df["intersection"] > 0]
-        else:
-            dia_tmp = diarize_df
-        if len(dia_tmp) > 0:
-            speaker = dia_tmp.groupby("speaker")["intersection"].sum().sort_values(ascending=False).index[0]
-            seg["speaker"] = speaker
-
-        for word in seg["words"]:
-            diarize_df["intersection"] = np.minimum(diarize_df["end"], word["end"]) - np.maximum(diarize_df["start"], word["start"])
-            if not fill_nearest:
-                dia_tmp = diarize_df[diarize_df["intersection"] > 0]
-            else:
-                dia_tmp = diarize_df
-            if len(dia_tmp) > 0:
-                speaker = dia_tmp.groupby("speaker")["intersection"].sum().sort_values(ascending=False).index[0]
-                word["speaker"] = speaker
-    return transcript_result
+    with model_registry.use("diarization") as pipeline:
+        segments, report = run_diarization(pipeline, audio, SAMPLE_RATE, DIARIZATION_SETTINGS, num_speakers)
+
+    return TurnIndex.from_turns(segments, report), audio
+
+def assign_speakers(turns, transcript_result, fill_nearest=False):
+    # One sorted-interval pass over all segments and words instead of a pandas groupby per word
+    return assign_speakers_vectorized(turns, transcript_result, fill_nearest=fill_nearest)
 
 def save_to_json(result, filename):
     with open(filename, "w", encoding="utf-8") as f:
-        json.dump(result, f, indent=2)
+        json.dump(result, f)
     print(f"[Save] Output saved to {filename}")
-
-def save_speaker_audio(diarize_df, audio, sr, min_duration_sec=180, max_duration_sec=300):
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    for speaker in diarize_df["speaker"].unique():
-        speaker_segs = diarize_df[diarize_df["speaker"] == speaker]
-        combined_audio = []
-        total_duration = 0.0
-        for _, row in speaker_segs.iterrows():
-            start_sample = int(row["start"] * sr)
-            end_sample = int(row["end"] * sr)
-            combined_audio.append(audio[start_sample:end_sample])
-            total_duration += (row["end"] - row["start"])
-            if total_duration >= min_duration_sec:
-                break
-        if combined_audio:
-            combined_audio = np.concatenate(combined_audio)
-            max_samples = int(max_duration_sec * sr)
-            combined_audio = combined_audio[:max_samples]
-            output_file = os.path.join(OUTPUT_DIR, f"{speaker}_segment.wav")
-            sf.write(output_file, combined_audio, sr)
-            print(f"[SAVE] Saved {output_file} ({combined_audio.shape[0]/sr:.1f} sec)")
\ No newline at end of file
@@ -0,0 +1,151 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from services.turn_index import TurnIndex
+
+UNKNOWN_SPEAKER = "Unknown"
+
+
+def talk_time(turns: TurnIndex, duration_sec: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Per-speaker talk, overlap and turn counts plus speech/silence totals, from diarization turns.
+
+    The timeline is cut at every turn boundary. For each speaker, the number
+    of their turns open in every piece comes from two searchsorted calls on
+    their sorted starts and ends. That gives who speaks in each piece, so
+    overlap (2+ speakers) and speech (1+) are masked sums with no loop over turns.
+    """
+    labels = turns.labels
+    talk = np.bincount(turns.speaker, weights=turns.end - turns.start, minlength=len(labels))
+    counts = np.bincount(turns.speaker, minlength=len(labels))
+    overlap = np.zeros(len(labels))
+    speech_sec = overlap_sec = 0.0
+    if len(turns):
+        points = np.unique(np.concatenate((turns.start, turns.end)))
+        lengths = np.diff(points)
+        active = np.empty((len(labels), len(lengths)), dtype=bool)
+        for code in range(len(labels)):
+            mine = turns.speaker == code
+            starts, ends = turns.start[mine], np.sort(turns.end[mine])
+            active[code] = (np.searchsorted(starts, points[:-1], side="right")
+                            > np.searchsorted(ends, points[:-1], side="right"))
+        speaking = active.sum(axis=0)
+        overlapped = lengths * (speaking >= 2)
+        overlap = active @ overlapped
+        speech_sec = float(lengths[speaking >= 1].sum())
+        overlap_sec = float(overlapped.sum())
+
+    if duration_sec is None:
+        duration_sec = turns.report.get("audio_sec") or (float(turns.end.max()) if len(turns) else 0.0)
+    silence_sec = max(duration_sec - speech_sec, 0.0)
+    return {
+        "talk_sec": {label: float(v) for label, v in zip(labels, talk)},
+        "overlap_sec": {label: float(v) for label, v in zip(labels, overlap)},
+        "turn_counts": {label: int(v) for label, v in zip(labels, counts)},
+        "speech_sec": speech_sec,
+        "total_overlap_sec": overlap_sec,
+        "silence_sec": silence_sec,
+        "duration_sec": float(duration_sec),
+    }
+
+
+class TranscriptStats:
+    """
+    Speaker statistics for a transcript, kept current as the transcript is edited.
+
+    Talk, overlap and turn metrics depend only on the diarization turns and
+    are computed once. Word counts are held per segment, as parallel arrays
+    of speaker code and word count, with running per-speaker totals. update()
+    recounts only segments whose speaker or text changed, so the editor can
+    refresh statistics after every edit without re-running the analysis.
+    """
+
+    def __init__(self, turns: TurnIndex, segments: Iterable[Any] = (), duration_sec: Optional[float] = None):
+        self.turns = turns
+        self.talk = talk_time(turns, duration_sec)
+        self._codes: Dict[str, int] = {}
+        self._totals = np.zeros(0, dtype=np.int64)    # words per speaker code
+        self._segments = np.zeros(0, dtype=np.int64)  # segments per speaker code
+        self._code(UNKNOWN_SPEAKER)
+        # Per segment: what it currently contributes to the totals
+        self._keys: List[Optional[Tuple[str, str]]] = []
+        self._speaker = np.zeros(0, dtype=np.int32)
+        self._words = np.zeros(0, dtype=np.int64)
+        self._counted = np.zeros(0, dtype=np.int64)
+        self.update(segments)
+
+    def _code(self, speaker: str) -> int:
+        code = self._codes.setdefault(speaker, len(self._codes))
+        if code == len(self._totals):
+            self._totals = np.append(self._totals, 0)
+            self._segments = np.append(self._segments, 0)
+        return code
+
+    def _add(self, rows: np.ndarray, sign: int):
+        """Add (sign=1) or remove (sign=-1) the given segments' contribution to the per-speaker totals"""
+        size = len(self._totals)
+        self._totals += sign * np.bincount(self._speaker[rows], weights=self._words[rows], minlength=size).astype(np.int64)
+        self._segments += sign * np.bincount(self._speaker[rows], weights=self._counted[rows], minlength=size).astype(np.int64)
+
+    def _resize(self, n: int):
+        old_n = len(self._keys)
+        if n < old_n:
+            self._add(np.arange(n, old_n), -1)
+            del self._keys[n:]
+        else:
+            self._keys.extend([None] * (n - old_n))
+        grow = max(n - old_n, 0)
+        self._speaker = np.concatenate((self._speaker[:n], np.zeros(grow, dtype=np.int32)))
+        self._words = np.concatenate((self._words[:n], np.zeros(grow, dtype=np.int64)))
+        self._counted = np.concatenate((self._counted[:n], np.zeros(grow, dtype=np.int64)))
+
+    def update(self, segments: Iterable[Any]) -> int:
+        """Bring the counts in line with segments (the full edited list); returns how many were recounted"""
+        # (speaker, text) per segment; None for entries that aren't segment dicts
+        keys = [(segment.get("speaker") or UNKNOWN_SPEAKER, segment.get("text") or "") if isinstance(segment, dict)
+                else None for segment in segments]
+        if len(keys) != len(self._keys):
+            self._resize(len(keys))
+        changed = [i for i, (key, old) in enumerate(zip(keys, self._keys)) if key != old]
+        if not changed:
+            return 0
+
+        rows = np.asarray(changed, dtype=np.int64)
+        self._add(rows, -1)
+        new = keys if len(changed) == len(keys) else [keys[i] for i in changed]
+        codes = self._codes
+        for speaker in dict.fromkeys(key[0] for key in new if key):
+            if speaker not in codes:
+                self._code(speaker)
+        self._speaker[rows] = [codes[key[0]] if key else 0 for key in new]
+        self._words[rows] = [len(key[1].split()) if key else 0 for key in new]
+        self._counted[rows] = [key is not None for key in new]
+        self._add(rows, 1)
+        for i, key in zip(changed, new):
+            self._keys[i] = key
+        return len(changed)
+
+    def to_dict(self) -> Dict[str, Any]:
+        # A speaker counts while at least one segment is attributed to them
+        speakers = [label for label, code in self._codes.items() if self._segments[code] > 0]
+        words = {label: int(self._totals[self._codes[label]]) for label in speakers}
+        talk, overlap, turn_counts = self.talk["talk_sec"], self.talk["overlap_sec"], self.talk["turn_counts"]
+        duration = self.talk["duration_sec"]
+        return {
+            "total_speakers": len(speakers),
+            "total_words": int(self._totals.sum()),
+            "speaker_word_counts": words,
+            "speaker_speaking_times": {label: talk.get(label, 0.0) for label in speakers},
+            "speakers_list": speakers,
+            "speaker_overlap_times": {label: overlap.get(label, 0.0) for label in speakers},
+            "speaker_turn_counts": {label: turn_counts.get(label, 0) for label in speakers},
+            "speaker_words_per_minute": {
+                label: words[label] / (talk[label] / 60.0) if talk.get(label) else None for label in speakers
+            },
+            "speech_sec": self.talk["speech_sec"],
+            "overlap_sec": self.talk["total_overlap_sec"],
+            "silence_sec": self.talk["silence_sec"],
+            "silence_ratio": self.talk["silence_sec"] / duration if duration else None,
+            "duration_sec": duration,
+        }
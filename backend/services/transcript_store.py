@@ -0,0 +1,246 @@
+import os
+import json
+import struct
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+TRANSCRIPT_STORE_FILE = "transcript.bin"
+LEGACY_TRANSCRIPT_FILE = "transcript.json"  # what analyses wrote before the store
+MAGIC = b"LUNATRN\x00"
+FORMAT_VERSION = 1
+ALIGN = 64  # every column starts on a 64-byte boundary so it can be viewed in place
+
+SEGMENT_KEYS = ("start", "end", "text", "words", "speaker")
+WORD_KEYS = ("start", "end", "word", "speaker")
+
+
+def _float(value: Any) -> float:
+    return float("nan") if value is None else float(value)
+
+
+def _encode(texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """UTF-8 blob plus n+1 byte offsets"""
+    encoded = [text.encode("utf-8") for text in texts]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _times(column: np.ndarray) -> List[Optional[float]]:
+    values = column.tolist()
+    if np.isnan(column).any():
+        return [None if v != v else v for v in values]
+    return values
+
+
+def write_transcript_store(transcript: Dict[str, Any], path: str):
+    """
+    Write a transcript as a columnar file (written aside, then renamed into place).
+
+    Segments and words become parallel arrays: start/end seconds, a speaker
+    code (-1 when unlabelled) and offsets into a UTF-8 text blob. Each segment
+    also records where its words start. Keys outside the Whisper schema
+    are kept in the header, so a round trip through to_dict() is lossless.
+    """
+    segments = transcript.get("segments", [])
+    labels: Dict[str, int] = {}
+    seg_start, seg_end, seg_speaker, seg_text, seg_words = [], [], [], [], [0]
+    word_start, word_end, word_speaker, word_text = [], [], [], []
+    seg_extra, word_extra = {}, {}
+
+    for i, segment in enumerate(segments):
+        seg_start.append(_float(segment.get("start")))
+        seg_end.append(_float(segment.get("end")))
+        speaker = segment.get("speaker")
+        seg_speaker.append(-1 if speaker is None else labels.setdefault(speaker, len(labels)))
+        seg_text.append(segment.get("text") or "")
+        extra = {k: v for k, v in segment.items() if k not in SEGMENT_KEYS}
+        if extra or "words" not in segment:
+            seg_extra[i] = {**extra, "has_words": "words" in segment}
+        for word in segment.get("words") or []:
+            word_start.append(_float(word.get("start")))
+            word_end.append(_float(word.get("end")))
+            speaker = word.get("speaker")
+            word_speaker.append(-1 if speaker is None else labels.setdefault(speaker, len(labels)))
+            word_text.append(word.get("word") or "")
+            extra = {k: v for k, v in word.items() if k not in WORD_KEYS}
+            if extra:
+                word_extra[len(word_text) - 1] = extra
+        seg_words.append(len(word_text))
+
+    seg_blob, seg_offsets = _encode(seg_text)
+    word_blob, word_offsets = _encode(word_text)
+    columns = {
+        "seg_start": np.asarray(seg_start, dtype=np.float64),
+        "seg_end": np.asarray(seg_end, dtype=np.float64),
+        "seg_speaker": np.asarray(seg_speaker, dtype=np.int32),
+        "seg_text_offsets": seg_offsets,
+        "seg_word_offsets": np.asarray(seg_words, dtype=np.int64),
+        "seg_text": seg_blob,
+        "word_start": np.asarray(word_start, dtype=np.float64),
+        "word_end": np.asarray(word_end, dtype=np.float64),
+        "word_speaker": np.asarray(word_speaker, dtype=np.int32),
+        "word_text_offsets": word_offsets,
+        "word_text": word_blob,
+    }
+
+    layout, offset = {}, 0
+    for name, column in columns.items():
+        layout[name] = [column.dtype.str, offset, len(column)]
+        offset += -(-column.nbytes // ALIGN) * ALIGN
+    header = json.dumps({
+        "version": FORMAT_VERSION,
+        "labels": list(labels),
+        "columns": layout,
+        "segment_extra": {str(k): v for k, v in seg_extra.items()},
+        "word_extra": {str(k): v for k, v in word_extra.items()},
+    }).encode("utf-8")
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGN) * ALIGN
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + struct.pack("<II", FORMAT_VERSION, len(header)) + header)
+        for name, column in columns.items():
+            f.seek(data_start + layout[name][1])
+            f.write(column.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+
+class TranscriptStore:
+    """
+    Read-only, memory-mapped view of a transcript written by write_transcript_store.
+
+    Opening the file only parses its small header. Columns are numpy views
+    into the mapping, and segment dicts are built only for the ranges asked
+    for. The editor and TTS paths can read a few segments, or the text and
+    speakers without the words, without decoding a tens-of-MB transcript.
+    to_dict() rebuilds the full JSON shape when it is needed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            prefix = f.read(len(MAGIC) + 8)
+            if len(prefix) < len(MAGIC) + 8 or prefix[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not a transcript store")
+            version, header_len = struct.unpack("<II", prefix[len(MAGIC):])
+            if version != FORMAT_VERSION:
+                raise ValueError(f"Unsupported transcript store version {version} in {path}")
+            header = json.loads(f.read(header_len))
+        data_start = -(-(len(MAGIC) + 8 + header_len) // ALIGN) * ALIGN
+        self.labels: List[str] = header["labels"]
+        self._segment_extra = {int(k): v for k, v in header["segment_extra"].items()}
+        self._word_extra = {int(k): v for k, v in header["word_extra"].items()}
+
+        mapped = np.memmap(path, dtype=np.uint8, mode="r") if os.path.getsize(path) > data_start else None
+        for name, (dtype, offset, length) in header["columns"].items():
+            dtype = np.dtype(dtype)
+            if length:
+                start = data_start + offset
+                column = mapped[start:start + length * dtype.itemsize].view(dtype)
+            else:
+                column = np.zeros(0, dtype=dtype)
+            setattr(self, name, column)
+
+    def __len__(self) -> int:
+        return len(self.seg_start)
+
+    @property
+    def n_words(self) -> int:
+        return len(self.word_start)
+
+    def _speaker_labels(self, codes: np.ndarray) -> List[Optional[str]]:
+        labels = self.labels
+        return [labels[c] if c >= 0 else None for c in codes.tolist()]
+
+    @staticmethod
+    def _texts(blob: np.ndarray, offsets: np.ndarray) -> List[str]:
+        view = memoryview(blob)
+        bounds = offsets.tolist()
+        base = bounds[0]
+        return [str(view[a - base:b - base], "utf-8") for a, b in zip(bounds[:-1], bounds[1:])]
+
+    def _words(self, lo: int, hi: int) -> List[Dict[str, Any]]:
+        if hi <= lo:
+            return []
+        offsets = self.word_text_offsets[lo:hi + 1]
+        texts = self._texts(self.word_text[offsets[0]:offsets[-1]], offsets)
+        starts, ends = _times(self.word_start[lo:hi]), _times(self.word_end[lo:hi])
+        speakers = self._speaker_labels(self.word_speaker[lo:hi])
+        words = [{"start": start, "end": end, "word": text, "speaker": speaker}
+                 for start, end, text, speaker in zip(starts, ends, texts, speakers)]
+        if None in speakers:
+            for word in words:
+                if word["speaker"] is None:
+                    del word["speaker"]
+        for j, extra in self._word_extra.items():
+            if lo <= j < hi:
+                words[j - lo].update(extra)
+        return words
+
+    def segments(self, start: int = 0, stop: Optional[int] = None, words: bool = True) -> List[Dict[str, Any]]:
+        """Segment dicts for segments[start:stop]; only that range is decoded"""
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if stop <= start:
+            return []
+        offsets = self.seg_text_offsets[start:stop + 1]
+        texts = self._texts(self.seg_text[offsets[0]:offsets[-1]], offsets)
+        word_bounds = self.seg_word_offsets[start:stop + 1].tolist()
+        all_words = self._words(word_bounds[0], word_bounds[-1]) if words else []
+        base = word_bounds[0]
+
+        result = []
+        for i, seg_start, seg_end, text, speaker in zip(range(start, stop), _times(self.seg_start[start:stop]),
+                                                        _times(self.seg_end[start:stop]), texts,
+                                                        self._speaker_labels(self.seg_speaker[start:stop])):
+            segment = {"start": seg_start, "end": seg_end, "text": text}
+            extra = self._segment_extra.get(i)
+            if words and (extra is None or extra["has_words"]):
+                k = i - start
+                segment["words"] = all_words[word_bounds[k] - base:word_bounds[k + 1] - base]
+            if speaker is not None:
+                segment["speaker"] = speaker
+            if extra is not None:
+                segment.update({k: v for k, v in extra.items() if k != "has_words"})
+            result.append(segment)
+        return result
+
+    def segment(self, index: int) -> Dict[str, Any]:
+        if not -len(self) <= index < len(self):
+            raise IndexError(f"Segment {index} out of range ({len(self)} segments)")
+        index %= len(self)
+        return self.segments(index, index + 1)[0]
+
+    def segments_between(self, start_sec: float, end_sec: float) -> Tuple[int, int]:
+        """Index range of the segments that start in [start_sec, end_sec)"""
+        return (int(self.seg_start.searchsorted(start_sec, side="left")),
+                int(self.seg_start.searchsorted(end_sec, side="left")))
+
+    def to_dict(self, words: bool = True) -> Dict[str, Any]:
+        return {"segments": self.segments(words=words)}
+
+
+def find_transcript(transcripts_dir: str) -> str:
+    """Path of the transcript in transcripts_dir: the store, or transcript.json for sessions analysed before it"""
+    path = os.path.join(transcripts_dir, TRANSCRIPT_STORE_FILE)
+    legacy_path = os.path.join(transcripts_dir, LEGACY_TRANSCRIPT_FILE)
+    if not os.path.exists(path) and os.path.exists(legacy_path):
+        return legacy_path
+    return path
+
+
+def load_transcript(path: str, words: bool = True) -> Dict[str, Any]:
+    """A transcript dict from either a transcript store or a JSON file"""
+    with open(path, "rb") as f:
+        is_store = f.read(len(MAGIC)) == MAGIC
+    if is_store:
+        return TranscriptStore(path).to_dict(words)
+    with open(path, "r", encoding="utf-8") as f:
+        transcript = json.load(f)
+    if not words:
+        transcript["segments"] = [{key: value for key, value in segment.items() if key != "words"}
+                                  if isinstance(segment, dict) else segment
+                                  for segment in transcript.get("segments", [])]
+    return transcript
@@ -0,0 +1,62 @@
+from dataclasses import dataclass, asdict, replace
+from typing import Any, Dict, Optional
+
+DEFAULT_PROFILE = "balanced"
+
+
+@dataclass(frozen=True)
+class TranscriptionProfile:
+    """
+    A named speed/quality trade-off for batch transcription.
+
+    beam_size 1 is greedy decoding. batch_size > 0 decodes VAD segments in
+    parallel batches through faster-whisper's BatchedInferencePipeline.
+    cpu_threads 0 leaves the CTranslate2 default (all cores).
+    """
+    name: str
+    model_size: str
+    compute_type: str
+    beam_size: int
+    batch_size: int = 0
+    cpu_threads: int = 0
+
+    @property
+    def model_key(self) -> str:
+        """Registry name for the model this profile needs; profiles with equal settings share it"""
+        return f"whisper:{self.model_size}:{self.compute_type}:{self.cpu_threads}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def build_profiles(config: Dict[str, Any]) -> Dict[str, TranscriptionProfile]:
+    """
+    Built-in fast/balanced/accurate profiles, with overrides from config.
+
+    balanced follows the model_size/compute_type keys shared with LiveTranscriber.
+    Entries under transcription_profiles either override fields of a built-in
+    profile or define a new one (which then needs model_size, compute_type and beam_size).
+    """
+    model_size = config.get("model_size", "small")
+    compute_type = config.get("compute_type", "int8")
+    profiles = {
+        "fast": TranscriptionProfile("fast", model_size, "int8", beam_size=1, batch_size=16),
+        "balanced": TranscriptionProfile("balanced", model_size, compute_type, beam_size=5),
+        "accurate": TranscriptionProfile("accurate", "medium", "int8_float32", beam_size=5),
+    }
+
+    for name, overrides in (config.get("transcription_profiles") or {}).items():
+        if name in profiles:
+            profiles[name] = replace(profiles[name], **overrides)
+        else:
+            profiles[name] = TranscriptionProfile(name=name, **overrides)
+    return profiles
+
+
+def resolve_profile(profiles: Dict[str, TranscriptionProfile], name: Optional[str],
+                    default: str = DEFAULT_PROFILE) -> TranscriptionProfile:
+    name = name or default
+    try:
+        return profiles[name]
+    except KeyError:
+        raise ValueError(f"Unknown transcription profile '{name}'. Expected one of {sorted(profiles)}")
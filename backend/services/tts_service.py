@@ -1,23 +1,77 @@
 import os
 import json
 import logging
+import threading
+from collections import OrderedDict
 import numpy as np
 import torch
 import librosa
-from pydub import AudioSegment
+import soundfile as sf
 from typing import Dict, List, Optional, Tuple
 from TTS.api import TTS
 
+from services.audio_buffer import AudioBuffer
+from services.model_registry import model_registry
+from services.render_cache import RenderCache, hash_speaker_sample, make_render_key
+from services.timeline import AudioTimeline, TimelineEdit
+from services.transcript_store import find_transcript, load_transcript
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+XTTS_MODEL_NAME = "tts_models/multilingual/multi-dataset/xtts_v2"
+DEFAULT_LANGUAGE = "en"
+
+# Timeline strategies for process_full_transcript_editing
+RENDER_MODE_SEGMENTS = "v2"        # rebuild the timeline from original gaps + cloned clips
+RENDER_MODE_OVERLAY = "overlay"    # silence each edited span and overlay the clip (v1)
+RENDER_MODE_COMPARE = "compare"    # render both for side-by-side debugging; needs debug=True
+RENDER_MODES = (RENDER_MODE_SEGMENTS, RENDER_MODE_OVERLAY, RENDER_MODE_COMPARE)
+
+
+def _load_xtts_model():
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    return TTS(XTTS_MODEL_NAME).to(device)
+
+
+model_registry.register("xtts", _load_xtts_model)
+
+
+class SpeakerLatentCache:
+    """Process-wide LRU of xTTS conditioning latents, keyed by speaker reference WAV hash"""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sample_hash: str):
+        with self._lock:
+            latents = self._entries.get(sample_hash)
+            if latents is not None:
+                self._entries.move_to_end(sample_hash)
+            return latents
+
+    def put(self, sample_hash: str, latents):
+        with self._lock:
+            self._entries[sample_hash] = latents
+            self._entries.move_to_end(sample_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# Shared across service instances so a speaker's reference audio is encoded once per process
+speaker_latent_cache = SpeakerLatentCache()
+
 class VoiceCloningTTSService:
     """Voice cloning TTS service using xTTS for generating audio from edited transcripts"""
     
-    def __init__(self, assets_dir: str = None):
+    def __init__(self, assets_dir: str = None, audio: Optional[AudioBuffer] = None):
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self.tts_model = None
         self.speaker_voice_samples = {}
+        self._speaker_sample_hashes = {}
         
         # Set up paths - use absolute paths
         if assets_dir is None:
@@ -30,9 +84,15 @@ class VoiceCloningTTSService:
         self.original_audio_path = os.path.join(self.assets_dir, "audio", "extracted_audio.wav")
         self.speaker_audio_dir = os.path.join(self.assets_dir, "speaker_audio")
         self.transcripts_dir = os.path.join(self.assets_dir, "users_segements")
+        # Session audio decoded at analysis time; the WAV is only read when this is missing
+        self.audio = audio
+        self._timeline = None
           # Also check the alternative speaker_audio location in backend root
         backend_dir = os.path.dirname(self.assets_dir)
         self.alt_speaker_audio_dir = os.path.join(backend_dir, "speaker_audio")
+
+        # Clips rendered in earlier edits of this session are reused instead of re-synthesized
+        self.render_cache = RenderCache(os.path.join(self.assets_dir, "tts_render_cache"))
         
         self._initialize_xtts_model()
         self._load_speaker_voice_samples()
@@ -40,8 +100,8 @@ class VoiceCloningTTSService:
     def _initialize_xtts_model(self):
         """Initialize xTTS model for voice cloning"""
         try:
-            # Load xTTS v2 model for multilingual voice cloning
-            self.tts_model = TTS("tts_models/multilingual/multi-dataset/xtts_v2").to(self.device)
+            # Shared xTTS v2 model for multilingual voice cloning, loaded once per process
+            self.tts_model = model_registry.get("xtts")
             logger.info("xTTS model loaded successfully on device: %s", self.device)
         except Exception as e:
             logger.error(f"Failed to load xTTS model: {e}")
@@ -73,19 +133,18 @@ class VoiceCloningTTSService:
             logger.error(f"Error loading speaker voice samples: {e}")
     
     def load_transcript_data(self, edited_transcript_path: str = None, original_transcript_path: str = None):
-        """Load both edited and original transcript JSON files"""
+        """Load the edited transcript JSON and the original transcript (without words, which diffing doesn't use)"""
         try:
             # Use default paths if not provided
             if not edited_transcript_path:
                 edited_transcript_path = os.path.join(self.transcripts_dir, "transcript-edited.json")
             if not original_transcript_path:
-                original_transcript_path = os.path.join(self.transcripts_dir, "transcript.json")
+                original_transcript_path = find_transcript(self.transcripts_dir)
             
             with open(edited_transcript_path, 'r', encoding='utf-8') as f:
                 edited_data = json.load(f)
             
-            with open(original_transcript_path, 'r', encoding='utf-8') as f:
-                original_data = json.load(f)
+            original_data = load_transcript(original_transcript_path, words=False)
             
             logger.info(f"Loaded transcripts: {len(edited_data.get('segments', []))} edited segments, {len(original_data.get('segments', []))} original segments")
             return edited_data, original_data
@@ -121,97 +180,152 @@ class VoiceCloningTTSService:
         logger.info(f"Found {len(differences)} transcript differences")
         return differences
     
-    def generate_cloned_speech(self, text: str, speaker_id: str, output_path: str = None) -> str:
-        """Generate speech using xTTS voice cloning for specific speaker"""
-        if self.tts_model is None:
-            raise RuntimeError("TTS model is not initialized. Cannot generate cloned speech.")
-            
-        if speaker_id not in self.speaker_voice_samples:
-            raise ValueError(f"Voice sample for speaker {speaker_id} not found. Available speakers: {list(self.speaker_voice_samples.keys())}")
-        
-        try:
-            speaker_sample_path = self.speaker_voice_samples[speaker_id]
-            
-            if not output_path:
-                output_path = f"generated_{speaker_id}_{hash(text) % 100000}.wav"
-            
-            # Generate speech with xTTS voice cloning
-            self.tts_model.tts_to_file(
-                text=text,
-                speaker_wav=speaker_sample_path,
-                file_path=output_path,
-                language="en"
+    def _speaker_sample_hash(self, speaker_id: str) -> str:
+        if speaker_id not in self._speaker_sample_hashes:
+            self._speaker_sample_hashes[speaker_id] = hash_speaker_sample(self.speaker_voice_samples[speaker_id])
+        return self._speaker_sample_hashes[speaker_id]
+
+    def _speaker_latents(self, xtts, speaker_id: str):
+        """Conditioning latents and speaker embedding for a speaker, computed once per reference WAV"""
+        sample_hash = self._speaker_sample_hash(speaker_id)
+        latents = speaker_latent_cache.get(sample_hash)
+        if latents is None:
+            logger.info(f"Computing conditioning latents for {speaker_id}")
+            latents = xtts.get_conditioning_latents(
+                audio_path=[self.speaker_voice_samples[speaker_id]],
+                gpt_cond_len=xtts.config.gpt_cond_len,
+                gpt_cond_chunk_len=xtts.config.gpt_cond_chunk_len,
+                max_ref_length=xtts.config.max_ref_len,
+                sound_norm_refs=xtts.config.sound_norm_refs,
             )
-            
-            logger.info(f"Generated cloned speech for {speaker_id}: {output_path}")
-            return output_path
-            
-        except Exception as e:
-            logger.error(f"Error generating cloned speech for {speaker_id}: {e}")
-            raise
+            speaker_latent_cache.put(sample_hash, latents)
+        return latents
+
+    def synthesize_batch(self, requests: List[Tuple[str, str]],
+                         language: str = DEFAULT_LANGUAGE) -> List[Tuple[np.ndarray, int]]:
+        """
+        Synthesize (text, speaker_id) pairs and return (float32 samples, sample_rate) per pair.
+
+        Earlier renders come from the render cache; the rest are generated in one pass over
+        the shared model, grouped by speaker so each speaker's latents are looked up once.
+        """
+        for _, speaker_id in requests:
+            if speaker_id not in self.speaker_voice_samples:
+                raise ValueError(f"Voice sample for speaker {speaker_id} not found. Available speakers: {list(self.speaker_voice_samples.keys())}")
+
+        keys = [make_render_key(self._speaker_sample_hash(speaker_id), text, language, XTTS_MODEL_NAME)
+                for text, speaker_id in requests]
+        rendered = {}
+        pending = {}
+        for key, (text, speaker_id) in zip(keys, requests):
+            if key in rendered or key in pending:
+                continue
+            cached = self.render_cache.get(key)
+            if cached is not None:
+                logger.info(f"Reusing cached render for {speaker_id}: '{text}'")
+                rendered[key] = cached
+            else:
+                pending[key] = (text, speaker_id)
+
+        if pending:
+            if self.tts_model is None:
+                raise RuntimeError("TTS model is not initialized. Cannot generate cloned speech.")
+
+            try:
+                # The shared model is not thread safe; hold it once for the whole batch
+                with model_registry.use("xtts"):
+                    xtts = self.tts_model.synthesizer.tts_model
+                    sample_rate = xtts.config.audio.output_sample_rate
+                    for key, (text, speaker_id) in sorted(pending.items(), key=lambda item: item[1][1]):
+                        gpt_cond_latent, speaker_embedding = self._speaker_latents(xtts, speaker_id)
+                        output = xtts.inference(
+                            text,
+                            language,
+                            gpt_cond_latent,
+                            speaker_embedding,
+                            temperature=xtts.config.temperature,
+                            length_penalty=xtts.config.length_penalty,
+                            repetition_penalty=xtts.config.repetition_penalty,
+                            top_k=xtts.config.top_k,
+                            top_p=xtts.config.top_p,
+                            enable_text_splitting=True,
+                        )
+                        samples = np.asarray(output["wav"], dtype=np.float32).reshape(-1)
+                        self.render_cache.put(key, samples, sample_rate)
+                        rendered[key] = (samples, sample_rate)
+                        logger.info(f"Generated cloned speech for {speaker_id}: {len(samples)/sample_rate:.2f}s - '{text}'")
+            except Exception as e:
+                logger.error(f"Error generating cloned speech: {e}")
+                raise
+
+        return [rendered[key] for key in keys]
+
+    def generate_cloned_speech(self, text: str, speaker_id: str,
+                               language: str = DEFAULT_LANGUAGE) -> Tuple[np.ndarray, int]:
+        """Generate speech using xTTS voice cloning for specific speaker, reusing earlier renders"""
+        return self.synthesize_batch([(text, speaker_id)], language)[0]
     
-    def create_modified_audio_timeline(self, differences: List[Dict], output_dir: str = "tts_output") -> str:
+    @staticmethod
+    def to_timeline_samples(samples: np.ndarray, clip_rate: int, sample_rate: int) -> np.ndarray:
+        """Convert a float32 clip to int16 at the timeline's sample rate"""
+        if clip_rate != sample_rate:
+            samples = librosa.resample(samples, orig_sr=clip_rate, target_sr=sample_rate)
+        return (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+
+    def synthesize_differences(self, differences: List[Dict], sample_rate: int) -> Dict[int, np.ndarray]:
+        """Synthesize every edited segment in one batch so every timeline strategy can share the clips"""
+        outputs = self.synthesize_batch([(diff["edited_text"], diff["speaker"]) for diff in differences])
+        return {
+            diff["segment_index"]: self.to_timeline_samples(samples, clip_rate, sample_rate)
+            for diff, (samples, clip_rate) in zip(differences, outputs)
+        }
+
+    def _timeline_edits(self, differences: List[Dict], timeline: AudioTimeline,
+                        clips: Optional[Dict[int, np.ndarray]]) -> List[TimelineEdit]:
+        if clips is None:
+            clips = self.synthesize_differences(differences, timeline.sample_rate)
+
+        edits = []
+        for i, diff in enumerate(sorted(differences, key=lambda x: x["start_time"])):
+            clip = clips[diff["segment_index"]]
+            logger.info(f"Segment {i+1}/{len(differences)}: {diff['start_time']:.2f}s-{diff['end_time']:.2f}s, "
+                        f"Speaker: {diff['speaker']}, cloned {len(clip)/timeline.sample_rate:.2f}s - '{diff['edited_text']}'")
+            edits.append(TimelineEdit(diff["start_time"], diff["end_time"], clip))
+        return edits
+
+    def _original_sample_rate(self) -> int:
+        """From the decoded buffer or the WAV header; no samples are read"""
+        if self.audio is not None:
+            return self.audio.sample_rate
+        return sf.info(self.original_audio_path).samplerate
+
+    def _original_timeline(self) -> AudioTimeline:
+        """The original track, built once per service and shared by every renderer"""
+        if self._timeline is None:
+            if self.audio is not None:
+                self._timeline = AudioTimeline(self.audio.to_int16(), self.audio.sample_rate)
+            else:
+                self._timeline = AudioTimeline.from_wav(self.original_audio_path)
+        return self._timeline
+
+    def create_modified_audio_timeline(self, differences: List[Dict], output_dir: str = "tts_output",
+                                       clips: Optional[Dict[int, np.ndarray]] = None) -> str:
         """Create complete audio timeline with cloned speech - simple overlay approach"""
         try:
             os.makedirs(output_dir, exist_ok=True)
             
-            # Load original audio
-            original_audio = AudioSegment.from_file(self.original_audio_path)
-            logger.info(f"Original audio duration: {len(original_audio)/1000:.2f}s")
-            
-            # Start with a copy of the original audio
-            final_audio = original_audio
-            
-            # Sort differences by start time to process in order
-            differences_sorted = sorted(differences, key=lambda x: x["start_time"])
-            
-            for i, diff in enumerate(differences_sorted):
-                start_time = diff["start_time"]
-                end_time = diff["end_time"]
-                edited_text = diff["edited_text"]
-                speaker_id = diff["speaker"]
-                
-                logger.info(f"Processing segment {i+1}/{len(differences_sorted)}: {start_time:.2f}s-{end_time:.2f}s, Speaker: {speaker_id}")
-                logger.info(f"Original text: '{diff['original_text']}'")
-                logger.info(f"Edited text: '{edited_text}'")
-                
-                # Generate cloned speech for edited text
-                cloned_audio_path = self.generate_cloned_speech(
-                    edited_text, 
-                    speaker_id, 
-                    os.path.join(output_dir, f"cloned_{diff['segment_index']}_{speaker_id}.wav")
-                )
-                
-                # Load cloned audio
-                cloned_audio = AudioSegment.from_file(cloned_audio_path)
-                logger.info(f"Cloned audio duration: {len(cloned_audio)/1000:.2f}s")
-                
-                # Calculate positions in milliseconds
-                start_ms = int(start_time * 1000)
-                end_ms = int(end_time * 1000)
-                original_segment_duration = end_ms - start_ms
-                cloned_duration = len(cloned_audio)
-                
-                logger.info(f"Original segment: {original_segment_duration}ms, Cloned: {cloned_duration}ms")
-                
-                # Method 1: Simple replacement - replace the exact time segment
-                # First, silence the original segment
-                silence = AudioSegment.silent(duration=original_segment_duration)
-                final_audio = final_audio[:start_ms] + silence + final_audio[end_ms:]
-                
-                # Then overlay the cloned audio at the same position
-                # If cloned audio is longer, it will extend beyond the original segment
-                # If shorter, it will be padded with the existing silence
-                final_audio = final_audio.overlay(cloned_audio, position=start_ms)
-                
-                logger.info(f"Replaced segment {i+1}, final audio duration now: {len(final_audio)/1000:.2f}s")
+            timeline = self._original_timeline()
+            logger.info(f"Original audio duration: {timeline.duration_sec:.2f}s")
+
+            # Silence each edited span and overlay its clip, all in one sample buffer
+            final_audio = timeline.render_overlay(self._timeline_edits(differences, timeline, clips))
             
             # Export final audio
             output_path = os.path.join(output_dir, "final_edited_audio.wav")
-            final_audio.export(output_path, format="wav")
+            timeline.export(final_audio, output_path)
             
             logger.info(f"Final audio exported: {output_path}")
-            logger.info(f"Final duration: {len(final_audio)/1000:.2f}s (Original: {len(original_audio)/1000:.2f}s)")
+            logger.info(f"Final duration: {len(final_audio)/timeline.sample_rate:.2f}s (Original: {timeline.duration_sec:.2f}s)")
             
             return output_path
             
@@ -219,93 +333,25 @@ class VoiceCloningTTSService:
             logger.error(f"Error creating modified audio timeline: {e}")
             raise
     
-    def create_modified_audio_timeline_v2(self, differences: List[Dict], output_dir: str = "tts_output") -> str:
+    def create_modified_audio_timeline_v2(self, differences: List[Dict], output_dir: str = "tts_output",
+                                          clips: Optional[Dict[int, np.ndarray]] = None) -> str:
         """Alternative method: Build timeline from scratch to preserve all content"""
         try:
             os.makedirs(output_dir, exist_ok=True)
             
-            # Load original audio
-            original_audio = AudioSegment.from_file(self.original_audio_path)
-            logger.info(f"Original audio duration: {len(original_audio)/1000:.2f}s")
-            
-            # Sort differences by start time
-            differences_sorted = sorted(differences, key=lambda x: x["start_time"])
-            
-            # Build timeline segments
-            timeline_segments = []
-            last_end_time = 0.0
-            
-            for i, diff in enumerate(differences_sorted):
-                start_time = diff["start_time"]
-                end_time = diff["end_time"]
-                
-                # Add original audio before this edit (if any gap)
-                if start_time > last_end_time:
-                    gap_start_ms = int(last_end_time * 1000)
-                    gap_end_ms = int(start_time * 1000)
-                    gap_audio = original_audio[gap_start_ms:gap_end_ms]
-                    timeline_segments.append({
-                        "audio": gap_audio,
-                        "type": "original_gap",
-                        "start": last_end_time,
-                        "end": start_time,
-                        "duration": len(gap_audio) / 1000.0
-                    })
-                    logger.info(f"Added original gap: {last_end_time:.2f}s-{start_time:.2f}s ({len(gap_audio)/1000:.2f}s)")
-                
-                # Generate and add cloned speech
-                edited_text = diff["edited_text"]
-                speaker_id = diff["speaker"]
-                
-                cloned_audio_path = self.generate_cloned_speech(
-                    edited_text, 
-                    speaker_id, 
-                    os.path.join(output_dir, f"cloned_v2_{diff['segment_index']}_{speaker_id}.wav")
-                )
-                
-                cloned_audio = AudioSegment.from_file(cloned_audio_path)
-                timeline_segments.append({
-                    "audio": cloned_audio,
-                    "type": "cloned",
-                    "start": start_time,
-                    "end": end_time,
-                    "duration": len(cloned_audio) / 1000.0,
-                    "text": edited_text
-                })
-                logger.info(f"Added cloned segment: {start_time:.2f}s-{end_time:.2f}s ({len(cloned_audio)/1000:.2f}s) - '{edited_text}'")
-                
-                last_end_time = end_time
-            
-            # Add remaining original audio after last edit
-            if last_end_time < len(original_audio) / 1000.0:
-                remaining_start_ms = int(last_end_time * 1000)
-                remaining_audio = original_audio[remaining_start_ms:]
-                timeline_segments.append({
-                    "audio": remaining_audio,
-                    "type": "original_end",
-                    "start": last_end_time,
-                    "end": len(original_audio) / 1000.0,
-                    "duration": len(remaining_audio) / 1000.0
-                })
-                logger.info(f"Added original ending: {last_end_time:.2f}s-{len(original_audio)/1000.0:.2f}s ({len(remaining_audio)/1000:.2f}s)")
-            
-            # Assemble final audio by concatenating all segments
-            final_audio = AudioSegment.empty()
-            total_expected_duration = 0.0
-            
-            for i, segment in enumerate(timeline_segments):
-                final_audio += segment["audio"]
-                total_expected_duration += segment["duration"]
-                logger.info(f"Segment {i+1}: {segment['type']} - {segment['duration']:.2f}s (cumulative: {len(final_audio)/1000:.2f}s)")
+            timeline = self._original_timeline()
+            logger.info(f"Original audio duration: {timeline.duration_sec:.2f}s")
+
+            # Original gaps and cloned clips are written once each into a preallocated buffer
+            final_audio = timeline.render_segments(self._timeline_edits(differences, timeline, clips))
             
             # Export final audio
             output_path = os.path.join(output_dir, "final_edited_audio_v2.wav")
-            final_audio.export(output_path, format="wav")
+            timeline.export(final_audio, output_path)
             
             logger.info(f"Final audio exported: {output_path}")
-            logger.info(f"Final duration: {len(final_audio)/1000:.2f}s")
-            logger.info(f"Expected duration: {total_expected_duration:.2f}s")
-            logger.info(f"Original duration: {len(original_audio)/1000:.2f}s")
+            logger.info(f"Final duration: {len(final_audio)/timeline.sample_rate:.2f}s")
+            logger.info(f"Original duration: {timeline.duration_sec:.2f}s")
             
             return output_path
             
@@ -315,8 +361,15 @@ class VoiceCloningTTSService:
     
     def process_full_transcript_editing(self, edited_transcript_path: str = None, 
                                       original_transcript_path: str = None,
-                                      output_dir: str = "tts_output") -> str:
+                                      output_dir: str = "tts_output",
+                                      render_mode: str = RENDER_MODE_SEGMENTS,
+                                      debug: bool = False) -> str:
         """Complete workflow to process transcript edits and generate final audio"""
+        if render_mode not in RENDER_MODES:
+            raise ValueError(f"Unknown render mode '{render_mode}'. Expected one of {RENDER_MODES}")
+        if render_mode == RENDER_MODE_COMPARE and not debug:
+            raise ValueError("Render mode 'compare' renders the timeline twice and is only available with debug enabled")
+
         try:
             # Load transcript data
             edited_data, original_data = self.load_transcript_data(edited_transcript_path, original_transcript_path)
@@ -327,33 +380,48 @@ class VoiceCloningTTSService:
             if not differences:
                 logger.info("No differences found between transcripts")
                 return self.original_audio_path
-              # Create modified audio using both methods for comparison
-            logger.info("Creating modified audio using overlay method...")
-            final_audio_path_v1 = self.create_modified_audio_timeline(differences, output_dir)
-            
-            logger.info("Creating modified audio using segment-building method...")
-            final_audio_path_v2 = self.create_modified_audio_timeline_v2(differences, output_dir)
-            
-            logger.info(f"Method 1 (overlay): {final_audio_path_v1}")
-            logger.info(f"Method 2 (segment-building): {final_audio_path_v2}")
+
+            # Each edited segment goes through xTTS at most once, whatever the render mode
+            clips = self.synthesize_differences(differences, self._original_sample_rate())
+            logger.info(f"Render cache: {self.render_cache.stats()}")
+
+            if render_mode == RENDER_MODE_OVERLAY:
+                logger.info("Creating modified audio using overlay method...")
+                final_audio_path = self.create_modified_audio_timeline(differences, output_dir, clips)
+            else:
+                logger.info("Creating modified audio using segment-building method...")
+                final_audio_path = self.create_modified_audio_timeline_v2(differences, output_dir, clips)
+
+                if render_mode == RENDER_MODE_COMPARE:
+                    logger.info("Creating modified audio using overlay method for comparison...")
+                    final_audio_path_v1 = self.create_modified_audio_timeline(differences, output_dir, clips)
+                    logger.info(f"Method 1 (overlay): {final_audio_path_v1}")
+                    logger.info(f"Method 2 (segment-building): {final_audio_path}")
+
             logger.info(f"Transcript editing processing complete!")
             
-            # Return the V2 method result as it preserves content better
-            return final_audio_path_v2
+            # In compare mode the V2 result is returned as it preserves content better
+            return final_audio_path
             
         except Exception as e:
             logger.error(f"Error in full transcript editing process: {e}")
             raise
 
 
-def run_voice_cloning_service():
+def run_voice_cloning_service(assets_dir: str = None, output_dir: str = "tts_output",
+                              render_mode: str = RENDER_MODE_SEGMENTS, debug: bool = False,
+                              audio: Optional[AudioBuffer] = None):
     """Main function to run the voice cloning TTS service"""
     try:
         # Initialize service
-        tts_service = VoiceCloningTTSService()
+        tts_service = VoiceCloningTTSService(assets_dir=assets_dir, audio=audio)
         
         # Process transcript editing and generate final audio
-        final_audio_path = tts_service.process_full_transcript_editing()
+        final_audio_path = tts_service.process_full_transcript_editing(
+            output_dir=output_dir,
+            render_mode=render_mode,
+            debug=debug,
+        )
         
         print(f"Voice cloning TTS processing completed!")
         print(f"Final audio with cloned voices: {final_audio_path}")
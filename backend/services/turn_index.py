@@ -0,0 +1,107 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+TURN_INDEX_FORMAT = 1
+
+
+@dataclass
+class TurnIndex:
+    """
+    Diarization turns as three parallel arrays, sorted by start time.
+
+    Turn i spans start[i]..end[i] and belongs to labels[speaker[i]]. Labels
+    are sorted, so speaker codes order the same way as the label strings.
+    max_end[i] is the latest end among turns 0..i. It never decreases, so
+    the turns that contain a time t are found with two binary searches,
+    even when turns of different speakers overlap.
+    """
+    start: np.ndarray    # float64 seconds, ascending
+    end: np.ndarray      # float64 seconds
+    speaker: np.ndarray  # int32 index into labels
+    labels: List[str]
+    report: Dict[str, Any] = field(default_factory=dict)  # diarization timings; not persisted
+    max_end: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.max_end = np.maximum.accumulate(self.end) if len(self.end) else self.end.copy()
+
+    @classmethod
+    def from_arrays(cls, starts: Sequence[float], ends: Sequence[float], speakers: Sequence[str],
+                    report: Dict[str, Any] = None) -> "TurnIndex":
+        starts = np.asarray(starts, dtype=np.float64)
+        ends = np.maximum(np.asarray(ends, dtype=np.float64), starts)
+        if len(starts):
+            labels, codes = np.unique(np.asarray(speakers, dtype=str), return_inverse=True)
+        else:
+            labels, codes = np.array([], dtype=str), np.array([], dtype=np.int64)
+        order = np.argsort(starts, kind="stable")
+        return cls(starts[order], ends[order], codes[order].astype(np.int32), labels.tolist(), report or {})
+
+    @classmethod
+    def from_turns(cls, turns: Iterable[Dict[str, Any]], report: Dict[str, Any] = None) -> "TurnIndex":
+        """From pyannote-style turn dicts with start, end and speaker"""
+        turns = list(turns)
+        return cls.from_arrays([t["start"] for t in turns], [t["end"] for t in turns],
+                               [t["speaker"] for t in turns], report)
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def speaker_labels(self) -> np.ndarray:
+        """Speaker label per turn"""
+        return np.asarray(self.labels, dtype=str)[self.speaker] if len(self) else np.array([], dtype=str)
+
+    def code(self, label: str) -> int:
+        """Speaker code of a label, or -1 when the speaker has no turns"""
+        i = int(np.searchsorted(self.labels, label)) if self.labels else 0
+        return i if i < len(self.labels) and self.labels[i] == label else -1
+
+    def overlapping(self, start: float, end: float) -> np.ndarray:
+        """Indices of turns that overlap [start, end), in start order"""
+        lo = self.max_end.searchsorted(start, side="right")
+        hi = self.start.searchsorted(end, side="left")
+        return np.flatnonzero(self.end[lo:hi] > start) + lo
+
+    def at(self, t: float) -> np.ndarray:
+        """Indices of turns that contain time t"""
+        lo = self.max_end.searchsorted(t, side="right")
+        hi = self.start.searchsorted(t, side="right")
+        return np.flatnonzero(self.end[lo:hi] > t) + lo
+
+    def speakers_at(self, t: float) -> List[str]:
+        return [self.labels[code] for code in np.unique(self.speaker[self.at(t)])]
+
+    def for_speaker(self, label: str) -> np.ndarray:
+        """Turn indices of one speaker, in time order"""
+        return np.flatnonzero(self.speaker == self.code(label))
+
+    def intervals(self) -> Dict[str, List[Tuple[float, float]]]:
+        """(start, end) turns per speaker, in time order"""
+        order = np.argsort(self.speaker, kind="stable")
+        bounds = np.searchsorted(self.speaker[order], np.arange(len(self.labels) + 1))
+        starts, ends = self.start[order].tolist(), self.end[order].tolist()
+        return {label: list(zip(starts[lo:hi], ends[lo:hi]))
+                for label, lo, hi in zip(self.labels, bounds[:-1].tolist(), bounds[1:].tolist())}
+
+    def durations(self) -> Dict[str, float]:
+        """Seconds of speech per speaker (overlapping turns of one speaker count twice, like the raw turns)"""
+        totals = np.bincount(self.speaker, weights=self.end - self.start, minlength=len(self.labels))
+        return {label: float(total) for label, total in zip(self.labels, totals)}
+
+    def counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.speaker, minlength=len(self.labels))
+        return {label: int(count) for label, count in zip(self.labels, counts)}
+
+    def save(self, path: str):
+        """Write the turns to a binary .npz (no pickled objects)"""
+        np.savez(path, format=np.int32(TURN_INDEX_FORMAT), start=self.start, end=self.end, speaker=self.speaker,
+                 labels=np.asarray(self.labels, dtype=str))
+
+    @classmethod
+    def load(cls, path: str) -> "TurnIndex":
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["format"]) != TURN_INDEX_FORMAT:
+                raise ValueError(f"Unsupported turn index format {int(data['format'])} in {path}")
+            return cls(data["start"], data["end"], data["speaker"], data["labels"].tolist())
@@ -0,0 +1,179 @@
+import bisect
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from services.ring_buffer import AudioRingBuffer
+
+
+class FrameVAD:
+    """
+    WebRTC-style per-frame speech detector on short-time energy and zero crossings.
+
+    The threshold rides snr_db above an adaptive noise floor. A steady noisy room
+    raises the bar, and a quiet room lowers it, down to min_energy, for soft speakers.
+    Frames that barely clear it but cross zero like broadband hiss are rejected.
+    """
+
+    def __init__(self, snr_db: float = 6.0, min_energy: float = 0.001, max_zcr: float = 0.4,
+                 floor_rise: float = 0.005):
+        self.ratio = 10 ** (snr_db / 20)
+        self.min_energy = min_energy
+        self.max_zcr = max_zcr
+        self.floor_rise = floor_rise
+        self.noise_floor: Optional[float] = None
+
+    def threshold(self) -> float:
+        return max(self.min_energy, (self.noise_floor or 0.0) * self.ratio)
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        rms = float(np.sqrt(np.mean(frame * frame)))
+        zcr = float(np.count_nonzero(np.diff(np.signbit(frame)))) / len(frame)
+        if self.noise_floor is None:
+            self.noise_floor = rms
+
+        threshold = self.threshold()
+        speech = rms > threshold and (zcr < self.max_zcr or rms > 2 * threshold)
+        if not speech:
+            # Fall to a quieter frame at once, but rise only slowly (seconds of sustained noise),
+            # so soft syllables between louder ones don't drag the floor up mid-utterance
+            if rms < self.noise_floor:
+                self.noise_floor = rms
+            else:
+                self.noise_floor += self.floor_rise * (rms - self.noise_floor)
+        return speech
+
+
+class VADGate:
+    """
+    Frame-level gate between an audio source and the live transcription ring buffer.
+
+    Only speech reaches the buffer. An utterance starts after start_frames
+    consecutive speech frames, with preroll_ms of audio before it. It ends
+    hangover_ms after the last speech frame. Everything else is counted and
+    dropped before the decoder ever sees it. Utterances are separated by
+    pad_ms of silence so Whisper still hears a pause. source_time() maps
+    buffer positions back to the original stream timeline.
+
+    write() has the ring buffer's signature, so audio sources can feed
+    either one.
+    """
+
+    def __init__(self, sink: AudioRingBuffer, sample_rate: int = 16000, frame_ms: int = 30,
+                 start_frames: int = 3, hangover_ms: int = 300, preroll_ms: int = 200, pad_ms: int = 100,
+                 vad: Optional[FrameVAD] = None):
+        self.sink = sink
+        self.sample_rate = sample_rate
+        self.frame = int(sample_rate * frame_ms / 1000)
+        self.start_frames = start_frames
+        self.hangover_frames = max(int(hangover_ms / frame_ms), 1)
+        self.preroll = deque(maxlen=max(int(preroll_ms / frame_ms), start_frames))
+        self.pad = np.zeros(int(sample_rate * pad_ms / 1000), dtype=np.float32)
+        self.vad = vad or FrameVAD()
+
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._source_pos = 0  # samples seen from the source, including dropped ones
+        self._in_speech = False
+        self._speech_run = 0
+        self._silence_run = 0
+        self._lock = threading.Lock()
+        self._ring_marks = [0]
+        self._source_marks = [0]
+        self._next_source = 0  # source position that continues the last forwarded sample
+
+        self.frames_total = 0
+        self.frames_speech = 0
+        self.frames_skipped = 0
+        self.utterances = 0
+
+    @property
+    def in_speech(self) -> bool:
+        return self._in_speech
+
+    def _forward(self, audio: np.ndarray, deadline: Optional[float], source_start: int) -> int:
+        # Only discontinuities need a mark: a new utterance, or audio after the sink
+        # (under backpressure) took part of a write; frames inside an utterance follow on directly
+        if source_start != self._next_source:
+            ring_position = self.sink.write_position
+            if ring_position == self._ring_marks[-1]:
+                # Nothing reached the ring since the last mark; it starts here instead
+                self._source_marks[-1] = source_start
+            else:
+                self._ring_marks.append(ring_position)
+                self._source_marks.append(source_start)
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+        accepted = self.sink.write(audio, timeout=timeout)
+        self._next_source = source_start + accepted
+        return accepted
+
+    def _open_utterance(self, deadline: Optional[float]):
+        self._in_speech = True
+        self.utterances += 1
+        frames = list(self.preroll)
+        self.preroll.clear()
+        start = frames[0][0]
+        if self.utterances > 1:
+            self._forward(self.pad, deadline, start - len(self.pad))
+        self._forward(np.concatenate([f for _, f in frames]), deadline, start)
+        # The preroll was counted as skipped while it waited; it was sent after all
+        self.frames_skipped -= len(frames)
+
+    def write(self, samples: np.ndarray, timeout: Optional[float] = None) -> int:
+        """
+        Classify samples frame by frame and forward speech; returns the samples consumed (all of them).
+        timeout bounds the whole call, however many frames are forwarded.
+        """
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        received = len(samples)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            if len(self._pending):
+                samples = np.concatenate([self._pending, samples])
+            n_frames = len(samples) // self.frame
+            self._pending = samples[n_frames * self.frame:].copy()
+
+            for i in range(n_frames):
+                frame = samples[i * self.frame:(i + 1) * self.frame]
+                position = self._source_pos
+                self._source_pos += self.frame
+                self.frames_total += 1
+                speech = self.vad.is_speech(frame)
+                self.frames_speech += speech
+
+                if self._in_speech:
+                    self._forward(frame, deadline, position)
+                    self._silence_run = 0 if speech else self._silence_run + 1
+                    if self._silence_run >= self.hangover_frames:
+                        self._in_speech = False
+                        self._speech_run = 0
+                    continue
+
+                self.frames_skipped += 1
+                self.preroll.append((position, frame.copy()))
+                self._speech_run = self._speech_run + 1 if speech else 0
+                if self._speech_run >= self.start_frames:
+                    self._silence_run = 0
+                    self._open_utterance(deadline)
+        return received
+
+    def source_time(self, buffer_sec: float) -> float:
+        """Seconds into the source stream for a position (in seconds) in the gated buffer"""
+        position = int(round(buffer_sec * self.sample_rate))
+        i = bisect.bisect_right(self._ring_marks, position) - 1
+        return (self._source_marks[i] + position - self._ring_marks[i]) / self.sample_rate
+
+    def stats(self) -> Dict[str, Any]:
+        frame_sec = self.frame / self.sample_rate
+        return {
+            "frames_total": self.frames_total,
+            "frames_speech": self.frames_speech,
+            "frames_skipped": self.frames_skipped,
+            "skipped_sec": self.frames_skipped * frame_sec,
+            "skipped_ratio": self.frames_skipped / self.frames_total if self.frames_total else 0.0,
+            "utterances": self.utterances,
+            "noise_floor": self.vad.noise_floor,
+            "threshold": self.vad.threshold(),
+        }
@@ -0,0 +1,161 @@
+import os
+import time
+import uuid
+import shutil
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+from services.audio_buffer import AudioBuffer
+from services.transcript_stats import TranscriptStats
+from services.transcript_store import TRANSCRIPT_STORE_FILE, find_transcript
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Workspace:
+    """
+    Session-scoped directory holding everything one analysis/edit session writes.
+
+    The layout mirrors the shared assests/ tree (audio/, speaker_audio/,
+    users_segements/, tts_output/), so services that take an assets_dir
+    work unchanged when pointed at a workspace root.
+    """
+    id: str
+    root: str
+    created_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+    video_path: Optional[str] = None
+    active: int = 0
+    lock: threading.RLock = field(default_factory=threading.RLock, repr=False)
+    # Decoded audio shared by the analysis stages; None once the analysis is done (unless memory-mapped),
+    # after a restart or on a cache hit, when edits read the saved WAV instead
+    audio: Optional[AudioBuffer] = field(default=None, repr=False)
+    # Statistics of the current transcript, refreshed incrementally on edits; rebuilt from disk when None
+    stats: Optional[TranscriptStats] = field(default=None, repr=False)
+
+    @property
+    def audio_path(self) -> str:
+        return os.path.join(self.root, "audio", "extracted_audio.wav")
+
+    @property
+    def audio_pcm_path(self) -> str:
+        """Raw float32 spill file backing a memory-mapped AudioBuffer for long media"""
+        return os.path.join(self.root, "audio", "extracted_audio.f32")
+
+    @property
+    def speaker_audio_dir(self) -> str:
+        return os.path.join(self.root, "speaker_audio")
+
+    @property
+    def transcripts_dir(self) -> str:
+        return os.path.join(self.root, "users_segements")
+
+    @property
+    def transcript_path(self) -> str:
+        """Columnar transcript store; JSON is exported from it on demand"""
+        return os.path.join(self.transcripts_dir, TRANSCRIPT_STORE_FILE)
+
+    @property
+    def saved_transcript_path(self) -> str:
+        """The transcript to read: the store, or transcript.json in sessions analysed before it existed"""
+        return find_transcript(self.transcripts_dir)
+
+    @property
+    def turns_path(self) -> str:
+        """Diarization turns (TurnIndex) saved next to the transcript"""
+        return os.path.join(self.transcripts_dir, "diarization.npz")
+
+    @property
+    def edited_transcript_path(self) -> str:
+        return os.path.join(self.transcripts_dir, "transcript-edited.json")
+
+    @property
+    def tts_output_dir(self) -> str:
+        return os.path.join(self.root, "tts_output")
+
+    def ensure_dirs(self):
+        for path in (os.path.dirname(self.audio_path), self.speaker_audio_dir, self.transcripts_dir, self.tts_output_dir):
+            os.makedirs(path, exist_ok=True)
+
+    def touch(self):
+        self.last_used = time.time()
+
+
+class WorkspaceManager:
+    """Creates, looks up and garbage-collects per-session workspaces"""
+
+    def __init__(self, root_dir: str, idle_ttl_sec: float = 7200.0,
+                 on_remove: Optional[Callable[[Workspace], None]] = None):
+        self.root_dir = root_dir
+        self.idle_ttl_sec = idle_ttl_sec
+        # Called for every workspace garbage collection deletes, to let go of what it held
+        self.on_remove = on_remove
+        self._workspaces: Dict[str, Workspace] = {}
+        self._lock = threading.Lock()
+        os.makedirs(root_dir, exist_ok=True)
+        self._load_existing()
+
+    def _load_existing(self):
+        # Sessions survive a restart; their idle clock restarts from the directory mtime
+        for name in os.listdir(self.root_dir):
+            path = os.path.join(self.root_dir, name)
+            if os.path.isdir(path):
+                mtime = os.path.getmtime(path)
+                self._workspaces[name] = Workspace(id=name, root=path, created_at=mtime, last_used=mtime)
+
+    def create(self, pinned: bool = False) -> Workspace:
+        """New empty workspace; pinned ones are spared by garbage collection until release()"""
+        self.collect_garbage()
+        workspace_id = uuid.uuid4().hex
+        workspace = Workspace(id=workspace_id, root=os.path.join(self.root_dir, workspace_id), active=int(pinned))
+        workspace.ensure_dirs()
+        with self._lock:
+            self._workspaces[workspace_id] = workspace
+        logger.info(f"[Workspace] Created session {workspace_id}")
+        return workspace
+
+    def get(self, workspace_id: str) -> Optional[Workspace]:
+        workspace = self._workspaces.get(workspace_id)
+        if workspace is not None:
+            workspace.touch()
+        return workspace
+
+    def pin(self, workspace: Workspace):
+        """Keep a workspace from being garbage-collected until the matching release()"""
+        with self._lock:
+            workspace.active += 1
+        workspace.touch()
+
+    def release(self, workspace: Workspace):
+        with self._lock:
+            workspace.active -= 1
+        workspace.touch()
+
+    @contextmanager
+    def use(self, workspace: Workspace):
+        """Mark a workspace busy so garbage collection leaves it alone"""
+        self.pin(workspace)
+        try:
+            yield workspace
+        finally:
+            self.release(workspace)
+
+    def collect_garbage(self) -> int:
+        """Delete workspaces that are idle for longer than idle_ttl_sec"""
+        cutoff = time.time() - self.idle_ttl_sec
+        with self._lock:
+            expired = [w for w in self._workspaces.values() if w.active == 0 and w.last_used < cutoff]
+            for workspace in expired:
+                del self._workspaces[workspace.id]
+
+        for workspace in expired:
+            shutil.rmtree(workspace.root, ignore_errors=True)
+            if self.on_remove is not None:
+                self.on_remove(workspace)
+            logger.info(f"[Workspace] Removed idle session {workspace.id}")
+        return len(expired)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Services are imported as `services.x`, with the backend directory as the working root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
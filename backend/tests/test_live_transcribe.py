@@ -0,0 +1,274 @@
+"""
+Live transcription fed from WAV files and raw PCM instead of a microphone.
+
+ToneWhisper stands in for the Whisper model: every tone burst in the audio
+it is given is one word, named by its pitch. Because the words are known
+ahead of time, the tests can check the committed text and the mapping of
+word times back to the source stream, through the VAD gate.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from services.livetranscribe import LiveModelPool, LiveSession, LiveSettings, WavFileSource
+from services.ring_buffer import AudioRingBuffer, BACKPRESSURE, DROP_OLDEST
+from services.streaming_decoder import FINAL, PARTIAL, StreamingDecoder
+from services.vad_gate import VADGate
+
+SAMPLE_RATE = 16000
+BASE_HZ = 300.0
+STEP_HZ = 100.0
+WORD_SEC = 0.4
+# Two utterances: word gaps are shorter than the VAD hangover, the pause between them is not
+UTTERANCES = [4, 4]
+WORD_GAP_SEC = 0.25
+PAUSE_SEC = 1.5
+LEAD_SEC = 0.5
+
+
+def make_speech():
+    """Tone-burst "speech" and the (name, start, end) of every word in it"""
+    parts, words = [np.zeros(int(LEAD_SEC * SAMPLE_RATE), dtype=np.float32)], []
+    position = len(parts[0])
+    t = np.arange(int(WORD_SEC * SAMPLE_RATE)) / SAMPLE_RATE
+    for u, n_words in enumerate(UTTERANCES):
+        if u:
+            parts.append(np.zeros(int(PAUSE_SEC * SAMPLE_RATE), dtype=np.float32))
+            position += len(parts[-1])
+        for i in range(n_words):
+            if i:
+                parts.append(np.zeros(int(WORD_GAP_SEC * SAMPLE_RATE), dtype=np.float32))
+                position += len(parts[-1])
+            k = len(words)
+            parts.append((0.3 * np.sin(2 * np.pi * (BASE_HZ + STEP_HZ * k) * t)).astype(np.float32))
+            words.append((f"w{k}", position / SAMPLE_RATE, (position + len(t)) / SAMPLE_RATE))
+            position += len(t)
+    parts.append(np.zeros(int(LEAD_SEC * SAMPLE_RATE), dtype=np.float32))
+    return np.concatenate(parts), words
+
+
+class ToneWhisper:
+    """WhisperModel stand-in: one word per run of loud 10 ms frames, named by its zero-crossing pitch"""
+
+    def __init__(self, decode_sec: float = 0.0):
+        self.decode_sec = decode_sec
+
+    def transcribe(self, audio, **kwargs):
+        time.sleep(self.decode_sec)
+        frame = SAMPLE_RATE // 100
+        n = len(audio) // frame
+        loud = np.sqrt(np.mean(np.square(audio[:n * frame].reshape(n, frame)), axis=1)) > 0.05
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], loud.astype(np.int8), [0]))))
+        words = []
+        for start, end in zip(edges[::2], edges[1::2]):
+            if end - start < 5:
+                continue  # under 50 ms of a burst is too little to name it
+            chunk = audio[start * frame:end * frame]
+            pitch = np.count_nonzero(np.diff(np.signbit(chunk))) / 2 / (len(chunk) / SAMPLE_RATE)
+            words.append(SimpleNamespace(start=start * frame / SAMPLE_RATE, end=end * frame / SAMPLE_RATE,
+                                         word=f" w{round((pitch - BASE_HZ) / STEP_HZ)}"))
+        return iter([SimpleNamespace(words=words)]), None
+
+
+@pytest.fixture(scope="module")
+def speech():
+    return make_speech()
+
+
+@pytest.fixture
+def speech_wav(tmp_path, speech):
+    path = str(tmp_path / "speech.wav")
+    sf.write(path, speech[0], SAMPLE_RATE)
+    return path
+
+
+def final_words(events):
+    return [word for event in events if event.kind == FINAL for word in event.words]
+
+
+def assert_words_match(words, expected):
+    assert [word["word"].strip() for word in words] == [name for name, _, _ in expected]
+    for word, (name, start, end) in zip(words, expected):
+        # Times are on the source timeline, silence the VAD dropped included
+        assert abs(word["start"] - start) < 0.05, name
+        assert abs(word["end"] - end) < 0.05, name
+
+
+def test_wav_session_commits_every_word_in_order(speech, speech_wav):
+    events = []
+    session = LiveSession(LiveModelPool(ToneWhisper()), LiveSettings(), on_event=events.append,
+                          overflow_policy=BACKPRESSURE).start()
+    WavFileSource(speech_wav).stream(session.sink, session.stop_event, SAMPLE_RATE)
+    stats = session.stop()
+
+    _, expected = speech
+    assert_words_match(final_words(events), expected)
+    assert session.text == " ".join(name for name, _, _ in expected)
+    finals = [event for event in events if event.kind == FINAL]
+    assert all(a.end <= b.start for a, b in zip(finals, finals[1:]))
+    # stop() commits the pending hypothesis and then clears the partial
+    assert events[-1].kind == PARTIAL and events[-1].text == ""
+    assert stats["vad"]["utterances"] == len(UTTERANCES)
+    assert stats["buffer"]["rejected"] == 0 and stats["buffer"]["dropped"] == 0
+    assert stats["decoder"]["committed_words"] == len(expected)
+
+
+def test_sessions_share_one_model_pool(speech, speech_wav):
+    pool = LiveModelPool(ToneWhisper(decode_sec=0.01), workers=1)
+    results = [[] for _ in range(3)]
+    sessions = [LiveSession(pool, LiveSettings(step_sec=0.5), on_event=events.append,
+                            overflow_policy=BACKPRESSURE).start() for events in results]
+    source = WavFileSource(speech_wav, block_sec=0.05)
+    feeders = [threading.Thread(target=source.stream, args=(s.sink, s.stop_event, SAMPLE_RATE)) for s in sessions]
+    for feeder in feeders:
+        feeder.start()
+    for feeder in feeders:
+        feeder.join()
+    stats = [session.stop() for session in sessions]
+
+    _, expected = speech
+    for events in results:
+        assert_words_match(final_words(events), expected)
+    assert pool.stats()["decodes"] == sum(s["decoder"]["decodes"] for s in stats)
+
+
+def test_vad_time_map_survives_rejected_audio():
+    # Each sample's value encodes its source position, so the map can be checked sample by sample
+    n = SAMPLE_RATE * 20
+    samples = (0.01 + np.arange(n) * 1e-7).astype(np.float32)
+    samples[:SAMPLE_RATE // 2] = 0
+    samples[5 * SAMPLE_RATE:6 * SAMPLE_RATE] = 0
+    ring = AudioRingBuffer(SAMPLE_RATE, BACKPRESSURE)
+    gate = VADGate(ring, SAMPLE_RATE)
+
+    checked = 0
+    for k, i in enumerate(range(0, n, 4800)):
+        gate.write(samples[i:i + 4800], timeout=0)
+        if k % 7 == 6:
+            first, tail = ring.read_position, ring.drain()
+            for j in np.flatnonzero(tail)[::97]:
+                source_position = round((float(tail[j]) - 0.01) * 1e7)
+                assert round(gate.source_time((first + j) / SAMPLE_RATE) * SAMPLE_RATE) == source_position
+                checked += 1
+    assert ring.rejected_samples > 0
+    assert checked > 100
+
+
+def test_decoder_window_survives_overwrites_during_decode(speech):
+    # A slow decode under drop_oldest: the producer laps the whole ring while the model reads its window
+    samples, _ = speech
+    ring = AudioRingBuffer(SAMPLE_RATE * 2, DROP_OLDEST)
+    ring.write(samples[:len(samples) // 2])
+    tone = ToneWhisper()
+
+    class LappingWhisper:
+        def transcribe(self, audio, **kwargs):
+            before = np.array(audio)
+            ring.write(np.ones(ring.capacity, dtype=np.float32))
+            assert np.array_equal(audio, before)
+            return tone.transcribe(audio)
+
+    decoder = StreamingDecoder(LappingWhisper(), SAMPLE_RATE)
+    assert decoder.step(ring, final=True)
+    assert decoder.stats.decodes == 1
+
+
+# /ws/live-transcribe
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    """main, imported in a scratch directory with the example config (it creates assests/ where it runs)"""
+    workdir = tmp_path_factory.mktemp("server")
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    shutil.copyfile(os.path.join(backend_dir, "config-example.yaml"), workdir / "config.yaml")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        import main
+    finally:
+        os.chdir(cwd)
+    return main
+
+
+@pytest.fixture
+def client(server, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    pool = LiveModelPool(ToneWhisper(), workers=2)
+    monkeypatch.setattr(server.model_registry, "get", lambda name: pool)
+    return TestClient(server.app)
+
+
+def pcm_blocks(samples, block_sec=0.1):
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+    block = int(block_sec * SAMPLE_RATE) * 2
+    return [pcm[i:i + block] for i in range(0, len(pcm), block)]
+
+
+def stream_and_stop(ws, samples):
+    for block in pcm_blocks(samples):
+        ws.send_bytes(block)
+    ws.send_text(json.dumps({"type": "stop"}))
+    messages = []
+    while not messages or messages[-1]["type"] != "done":
+        messages.append(ws.receive_json())
+    return messages
+
+
+def test_websocket_streams_events_then_done(server, client, speech):
+    samples, expected = speech
+    with client.websocket_connect("/ws/live-transcribe") as ws:
+        session = ws.receive_json()
+        assert session["type"] == "session" and session["sample_rate"] == SAMPLE_RATE
+        assert session["session_id"] in server.live_sessions
+        messages = stream_and_stop(ws, samples)
+
+    done = messages[-1]
+    assert {m["type"] for m in messages[:-1]} <= {PARTIAL, FINAL}
+    words = [word for m in messages if m["type"] == FINAL for word in m["words"]]
+    assert_words_match(words, expected)
+    assert done["session_id"] == session["session_id"]
+    assert done["text"] == " ".join(name for name, _, _ in expected)
+    assert done["stats"]["decoder"]["committed_words"] == len(expected)
+    assert done["stats"]["buffer"]["rejected"] == 0
+    assert session["session_id"] not in server.live_sessions
+
+
+def test_websocket_reports_overflow(server, client, monkeypatch, speech):
+    # A slow model behind a one-second buffer, and no time to wait for room: audio must be refused
+    slow = LiveModelPool(ToneWhisper(decode_sec=0.3))
+    monkeypatch.setattr(server.model_registry, "get", lambda name: slow)
+    monkeypatch.setattr(server, "LIVE_SETTINGS", LiveSettings(step_sec=0.25, max_window_sec=0.5, buffer_sec=1.0))
+    monkeypatch.setattr(server, "LIVE_WRITE_TIMEOUT", 0)
+    samples, _ = speech
+    with client.websocket_connect("/ws/live-transcribe") as ws:
+        ws.receive_json()
+        messages = stream_and_stop(ws, np.tile(samples, 3))
+
+    overflows = [m for m in messages if m["type"] == "overflow"]
+    assert overflows and all(m["rejected_samples"] > 0 for m in overflows)
+    assert sum(m["rejected_samples"] for m in overflows) == messages[-1]["stats"]["buffer"]["rejected"]
+
+
+def test_websocket_refuses_sessions_over_the_cap(server, client, monkeypatch, speech):
+    from starlette.websockets import WebSocketDisconnect
+
+    monkeypatch.setattr(server, "LIVE_MAX_SESSIONS", 1)
+    samples, expected = speech
+    with client.websocket_connect("/ws/live-transcribe") as first:
+        first.receive_json()
+        with pytest.raises(WebSocketDisconnect) as refused:
+            with client.websocket_connect("/ws/live-transcribe") as second:
+                second.receive_json()
+        assert refused.value.code == 1013
+        # The open session is unaffected
+        assert stream_and_stop(first, samples)[-1]["text"] == " ".join(name for name, _, _ in expected)
+    assert not server.live_sessions
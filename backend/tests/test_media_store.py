@@ -0,0 +1,46 @@
+"""
+MediaStore eviction never removes a file a caller still holds.
+"""
+import asyncio
+import os
+
+from services.media_store import MediaStore
+
+
+async def one_chunk(data):
+    yield data
+
+
+def ingest_all(store, payloads):
+    async def run():
+        return await asyncio.gather(*[store.ingest_stream(one_chunk(data), ".mp4") for data in payloads])
+    return asyncio.run(run())
+
+
+def test_ingested_media_stays_until_released(tmp_path):
+    store = MediaStore(str(tmp_path), max_size_bytes=2500)
+    # Five concurrent 1000-byte uploads into a 2500-byte store: each one's eviction runs while the others land
+    stored = ingest_all(store, [bytes([i]) * 1000 for i in range(5)])
+    assert all(os.path.exists(media.path) for media in stored)
+
+    for media in stored[:4]:
+        store.release(media.path)
+    store.evict()
+    # Unpinned files go until the store fits; the pinned one is never a candidate
+    remaining = [media for media in stored if os.path.exists(media.path)]
+    assert stored[4] in remaining
+    assert sum(media.size_bytes for media in remaining) <= 2500
+
+
+def test_reingest_pins_the_existing_file_again(tmp_path):
+    store = MediaStore(str(tmp_path), max_size_bytes=1500)
+    first, = ingest_all(store, [b"a" * 1000])
+    again, = ingest_all(store, [b"a" * 1000])
+    assert again.already_stored and again.path == first.path
+
+    store.release(first.path)
+    ingest_all(store, [b"b" * 1000])
+    assert os.path.exists(first.path)  # the second holder still has it
+    store.release(again.path)
+    store.evict()
+    assert not os.path.exists(first.path)
@@ -0,0 +1,104 @@
+"""
+Speaker turns: every labelled word counted once, and no second of one speaker's audio counted twice.
+"""
+import numpy as np
+import pytest
+
+from benchmarks.bench_speaker_turns import make_synthetic_transcript
+from services.speaker_segmentation import SpeakerSegmentationService
+from services.speaker_turns import JOIN_GAP_SEC, build_speaker_turns
+
+
+def union_sec(intervals, gap=0.0):
+    """Length of the union of (start, end) intervals, treating gaps up to `gap` as covered"""
+    total, current = 0.0, None
+    for start, end in sorted(intervals):
+        if current is not None and start <= current[1] + gap:
+            current[1] = max(current[1], end)
+        else:
+            if current is not None:
+                total += current[1] - current[0]
+            current = [start, end]
+    return total + (current[1] - current[0] if current else 0.0)
+
+
+def speaker_words(transcript):
+    words = {}
+    for segment in transcript["segments"]:
+        for word in segment["words"]:
+            words.setdefault(word["speaker"], []).append(word)
+    return words
+
+
+@pytest.fixture(scope="module")
+def transcript():
+    return make_synthetic_transcript(20_000)
+
+
+@pytest.fixture(scope="module")
+def turns(transcript):
+    return build_speaker_turns(transcript["segments"])
+
+
+def test_turns_of_one_speaker_never_overlap(turns):
+    for speaker_id in turns.speakers:
+        idx = turns.for_speaker(speaker_id)
+        assert np.all(turns.start[idx][1:] > turns.end[idx][:-1]), speaker_id
+
+
+def test_turns_cover_each_speakers_words_once(transcript, turns):
+    for speaker_id, words in speaker_words(transcript).items():
+        idx = turns.for_speaker(speaker_id)
+        covered = float(np.sum(turns.end[idx] - turns.start[idx]))
+        expected = union_sec([(w["start"], w["end"]) for w in words], gap=JOIN_GAP_SEC)
+        assert covered == pytest.approx(expected, rel=1e-9), speaker_id
+
+
+def test_every_word_is_in_exactly_one_turn(transcript, turns):
+    seen = [id(word) for i in range(len(turns)) for word in turns.words(i)]
+    assert len(seen) == len(set(seen))
+    assert set(seen) == {id(word) for segment in transcript["segments"] for word in segment["words"]}
+    for i in range(len(turns)):
+        speakers = {word["speaker"] for word in turns.words(i)}
+        assert speakers == {turns.speakers[turns.speaker[i]]}
+
+
+def test_texts_match_turn_by_turn_text(turns):
+    assert turns.texts() == [turns.text(i) for i in range(len(turns))]
+
+
+def test_interleaved_and_unlabelled_units():
+    # SPEAKER_01 talks over SPEAKER_00; one word has no speaker of its own, one segment has no words
+    segments = [
+        {"start": 0.0, "end": 2.0, "speaker": "SPEAKER_00", "text": "a b c", "words": [
+            {"start": 0.0, "end": 0.5, "word": " a", "speaker": "SPEAKER_00"},
+            {"start": 0.6, "end": 1.0, "word": " x", "speaker": "SPEAKER_01"},
+            {"start": 1.05, "end": 1.5, "word": " b"},
+            {"start": 1.55, "end": 2.0, "word": " ", "speaker": "SPEAKER_00"},
+        ]},
+        {"start": 2.05, "end": 3.0, "speaker": "SPEAKER_01", "text": " no words "},
+        {"start": 3.5, "end": 4.0, "text": "nobody"},
+    ]
+    turns = build_speaker_turns(segments)
+
+    assert turns.speakers == ["SPEAKER_00", "SPEAKER_01"]
+    assert turns.texts() == [turns.text(i) for i in range(len(turns))] == ["a", "b", "x", "no words"]
+    assert turns.start.tolist() == [0.0, 1.05, 0.6, 2.05]
+    assert turns.end.tolist() == [0.5, 2.0, 1.0, 3.0]
+    assert [len(turns.words(i)) for i in range(len(turns))] == [1, 2, 1, 0]
+    assert turns.durations() == pytest.approx({"SPEAKER_00": 1.45, "SPEAKER_01": 1.35})
+
+
+def test_extract_speaker_segments_follows_the_turns(tmp_path, transcript):
+    service = SpeakerSegmentationService(assets_dir=str(tmp_path))
+    segments = service.extract_speaker_segments(transcript)
+    turns = service.speaker_turns
+
+    assert list(segments) == turns.speakers
+    for speaker_id, speaker_segments in segments.items():
+        idx = turns.for_speaker(speaker_id)
+        assert [s.start_time for s in speaker_segments] == turns.start[idx].tolist()
+        assert [s.end_time for s in speaker_segments] == turns.end[idx].tolist()
+        assert [s.text for s in speaker_segments] == [turns.text(i) for i in idx]
+        assert [s.words for s in speaker_segments] == [turns.words(i) for i in idx]
+        assert all(s.speaker_id == speaker_id for s in speaker_segments)
@@ -0,0 +1,43 @@
+"""
+StageGraph failure handling: a failing stage stops its siblings, and run() outlives all of them.
+"""
+import time
+
+import pytest
+
+from services.stage_graph import StageGraph
+
+
+def test_failure_stops_running_siblings_before_run_returns():
+    graph = StageGraph(max_workers=3)
+    sibling_checks, sibling_exit = [], []
+
+    def failing(_):
+        time.sleep(0.05)
+        raise ValueError("transcribe failed")
+
+    def long_running(_):
+        # Like the transcribe loop: work in steps, with a check between them
+        try:
+            for _ in range(200):
+                time.sleep(0.01)
+                sibling_checks.append(time.perf_counter())
+                graph.check()
+        finally:
+            sibling_exit.append(time.perf_counter())
+
+    graph.add("source", lambda _: 1)
+    graph.add("fails", failing, after=["source"])
+    graph.add("slow", long_running, after=["source"])
+    graph.add("never", lambda _: pytest.fail("dependent of a failed stage ran"), after=["fails", "slow"])
+
+    with pytest.raises(ValueError, match="transcribe failed"):
+        graph.run()
+    returned = time.perf_counter()
+
+    # The sibling stopped at a check well before its 2 s of work, and run() waited for it
+    assert sibling_exit and sibling_exit[0] <= returned
+    assert len(sibling_checks) < 100
+    report = graph.report()["stages"]
+    assert report["never"]["ran"] is False
+
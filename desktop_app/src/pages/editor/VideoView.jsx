@@ -85,7 +85,11 @@ const VideoView = () => {
       const response = await fetch('/api/edit-transcript/', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ segments: updatedSegments, lip_sync: !!options.lipSync })
+        body: JSON.stringify({
+          segments: updatedSegments,
+          lip_sync: !!options.lipSync,
+          session_id: transcription?.session_id
+        })
       })
       if (!response.ok) {
         throw new Error(`HTTP error! Status: ${response.status}`)